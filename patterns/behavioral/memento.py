@@ -3,10 +3,39 @@ Behavioral Pattern: Memento
 
 Captures and externalizes an object's internal state so that it can be restored later,
 without violating encapsulation. Useful for undo mechanisms.
+
+`TextEditor` and `History` are the minimal teaching version. `write` rebuilds the whole
+string on every call, each `Memento` holds a full copy of the document, and `History`
+never forgets anything. That is quadratic for appends and O(document) per undo step.
+
+`PieceTableEditor` is the production variant:
+
+* The text lives in a piece table. Inserted text goes into its own immutable buffer and
+  the document is a list of (buffer, start, length) pieces, so an edit never copies
+  existing text.
+* `save()` returns a `DeltaMemento` holding only the edits since the last save
+  (position, deleted text, inserted text). `checkpoint()` returns a full `Checkpoint`,
+  which is just the piece list: it references the buffers instead of copying them.
+* `BoundedHistory` keeps at most `limit` steps in memory. Older steps are dropped or,
+  with `spill_dir`, pickled to a temporary file and read back when undo reaches them.
+  It takes a checkpoint every `checkpoint_every` steps so that `rewind` can jump back
+  many steps at once instead of reverting them one by one.
+
+Undo and redo therefore cost O(edit size + pieces), never O(document). Run with
+`--benchmark` to time undo/redo on a 100 MB document.
 """
 
 from __future__ import annotations
-from typing import List
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
 
 # Memento
 class Memento:
@@ -44,6 +73,376 @@ class History:
     def undo(self) -> Memento:
         return self._history.pop()
 
+
+class Piece(NamedTuple):
+    """A run of `length` characters starting at `start` in buffer number `buffer`."""
+    buffer: int
+    start: int
+    length: int
+
+
+class PieceTable:
+    """A text sequence stored as pieces of append-only buffers."""
+
+    def __init__(self, text: str = "") -> None:
+        self._buffers: List[str] = [text]
+        self._pieces: List[Piece] = [Piece(0, 0, len(text))] if text else []
+        self._length = len(text)
+        self._cursor = (0, 0)  # (piece index, its offset in the document) near the last edit
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _split(self, position: int) -> int:
+        """Make a piece boundary at position and return the index of the piece starting there."""
+        if position == self._length:
+            return len(self._pieces)  # appending: no search needed
+        # Walk from the last edit rather than from the start: edits cluster around a cursor
+        index, start = self._cursor
+        while start > position:
+            index -= 1
+            start -= self._pieces[index].length
+        while start + self._pieces[index].length <= position:
+            start += self._pieces[index].length
+            index += 1
+        piece, offset = self._pieces[index], position - start
+        if offset:
+            self._pieces[index:index + 1] = [
+                Piece(piece.buffer, piece.start, offset),
+                Piece(piece.buffer, piece.start + offset, piece.length - offset),
+            ]
+            index += 1
+        self._cursor = (index, position)
+        return index
+
+    def insert(self, position: int, text: str) -> None:
+        """Insert text before position."""
+        if not 0 <= position <= self._length:
+            raise IndexError(f"position {position} out of range 0..{self._length}")
+        if not text:
+            return
+        self._buffers.append(text)
+        index = self._split(position)
+        self._pieces.insert(index, Piece(len(self._buffers) - 1, 0, len(text)))
+        self._length += len(text)
+        self._cursor = (index, position)
+
+    def delete(self, position: int, length: int) -> str:
+        """Remove length characters starting at position and return them."""
+        if position < 0 or length < 0 or position + length > self._length:
+            raise IndexError(f"range {position}+{length} out of range 0..{self._length}")
+        if not length:
+            return ""
+        first = self._split(position)
+        last = self._split(position + length)
+        removed = self._pieces[first:last]
+        del self._pieces[first:last]
+        self._length -= length
+        self._cursor = (first, position)
+        return "".join(self._buffers[p.buffer][p.start:p.start + p.length] for p in removed)
+
+    def text(self) -> str:
+        """The whole document, built on demand."""
+        return "".join(self._buffers[p.buffer][p.start:p.start + p.length] for p in self._pieces)
+
+    def snapshot(self) -> Tuple[Tuple[Piece, ...], int]:
+        """The piece list and length; valid for as long as this table exists."""
+        return tuple(self._pieces), self._length
+
+    def restore(self, pieces: Tuple[Piece, ...], length: int) -> None:
+        """Return to a state taken by snapshot()."""
+        self._pieces = list(pieces)
+        self._length = length
+        self._cursor = (0, 0)
+
+
+class Edit(NamedTuple):
+    """One change: `deleted` was replaced by `inserted` at `position`."""
+    position: int
+    deleted: str
+    inserted: str
+
+
+@dataclass(frozen=True)
+class DeltaMemento:
+    """The edits made between two saves, oldest first."""
+    edits: Tuple[Edit, ...]
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """A full state of a PieceTableEditor, sharing its buffers."""
+    pieces: Tuple[Piece, ...]
+    length: int
+
+
+class PieceTableEditor:
+    """Originator backed by a piece table, saving deltas instead of full copies."""
+
+    def __init__(self, text: str = "") -> None:
+        self._table = PieceTable(text)
+        self._pending: List[Edit] = []
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def write(self, text: str) -> None:
+        """Append text at the end of the document."""
+        self.insert(len(self._table), text)
+
+    def insert(self, position: int, text: str) -> None:
+        """Insert text before position."""
+        self._table.insert(position, text)
+        self._pending.append(Edit(position, "", text))
+
+    def delete(self, position: int, length: int) -> str:
+        """Delete length characters at position and return them."""
+        deleted = self._table.delete(position, length)
+        self._pending.append(Edit(position, deleted, ""))
+        return deleted
+
+    def save(self) -> DeltaMemento:
+        """The edits since the previous save."""
+        memento = DeltaMemento(tuple(self._pending))
+        self._pending.clear()
+        return memento
+
+    def checkpoint(self) -> Checkpoint:
+        """The full current state, in O(pieces)."""
+        return Checkpoint(*self._table.snapshot())
+
+    def restore(self, memento: Checkpoint) -> None:
+        """Return to a checkpoint, discarding unsaved edits."""
+        self._table.restore(memento.pieces, memento.length)
+        self._pending.clear()
+
+    def revert(self, memento: DeltaMemento) -> None:
+        """Undo the edits in a delta memento; it must be the latest one applied."""
+        if self._pending:
+            raise RuntimeError("Unsaved edits; save() them before reverting.")
+        for position, deleted, inserted in reversed(memento.edits):
+            self._table.delete(position, len(inserted))
+            self._table.insert(position, deleted)
+
+    def reapply(self, memento: DeltaMemento) -> None:
+        """Redo the edits in a delta memento."""
+        if self._pending:
+            raise RuntimeError("Unsaved edits; save() them before reapplying.")
+        for position, deleted, inserted in memento.edits:
+            self._table.delete(position, len(deleted))
+            self._table.insert(position, inserted)
+
+    def get_content(self) -> str:
+        return self._table.text()
+
+
+class BoundedHistory:
+    """
+    Caretaker for PieceTableEditor: undo/redo of saved steps, at most `limit` in memory.
+
+    Steps beyond the limit are discarded, or spilled to a temporary file in `spill_dir`.
+    """
+
+    def __init__(self, limit: Optional[int] = 1000, spill_dir: Optional[str] = None,
+                 checkpoint_every: int = 50) -> None:
+        self.limit = limit
+        self.checkpoint_every = checkpoint_every
+        self.version = 0  # number of steps currently applied
+        self._undo: Deque[DeltaMemento] = deque()
+        self._redo: List[DeltaMemento] = []
+        self._checkpoints: Dict[int, Checkpoint] = {}
+        self._spill = tempfile.TemporaryFile(dir=spill_dir) if spill_dir is not None else None
+        self._spilled: List[int] = []  # file offsets, oldest first
+
+    def __len__(self) -> int:
+        """Number of steps that can be undone."""
+        return len(self._undo) + len(self._spilled)
+
+    def record(self, editor: PieceTableEditor) -> None:
+        """Save the editor's latest edits as one undoable step."""
+        memento = editor.save()
+        if not memento.edits:
+            return
+        self._redo.clear()
+        for version in [v for v in self._checkpoints if v > self.version]:
+            del self._checkpoints[version]  # those states can no longer be redone
+        self._undo.append(memento)
+        self.version += 1
+        if self.version % self.checkpoint_every == 0:
+            self._checkpoints[self.version] = editor.checkpoint()
+        if self.limit is not None and len(self._undo) > self.limit:
+            self._evict()
+
+    def _evict(self) -> None:
+        oldest = self._undo.popleft()
+        if self._spill is not None:
+            self._spilled.append(self._spill.seek(0, os.SEEK_END))
+            pickle.dump(oldest, self._spill, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            floor = self.version - len(self._undo)
+            for version in [v for v in self._checkpoints if v < floor]:
+                del self._checkpoints[version]
+
+    def _pop_undo(self) -> DeltaMemento:
+        if self._undo:
+            return self._undo.pop()
+        if not self._spilled:
+            raise RuntimeError("No actions to undo.")
+        offset = self._spilled.pop()
+        self._spill.seek(offset)
+        memento = pickle.load(self._spill)
+        self._spill.truncate(offset)
+        return memento
+
+    def undo(self, editor: PieceTableEditor) -> None:
+        """Revert the most recent step."""
+        memento = self._pop_undo()
+        editor.revert(memento)
+        self._redo.append(memento)
+        self.version -= 1
+
+    def redo(self, editor: PieceTableEditor) -> None:
+        """Reapply the most recently undone step."""
+        if not self._redo:
+            raise RuntimeError("No actions to redo.")
+        memento = self._redo.pop()
+        editor.reapply(memento)
+        self._undo.append(memento)
+        self.version += 1
+        if self.limit is not None and len(self._undo) > self.limit:
+            self._evict()
+
+    def rewind(self, editor: PieceTableEditor, steps: int) -> None:
+        """Undo `steps` steps, jumping to the nearest checkpoint on the way."""
+        if steps > len(self):
+            raise RuntimeError(f"Only {len(self)} actions to undo.")
+        target = self.version - steps
+        nearest = min((v for v in self._checkpoints if target <= v <= self.version), default=None)
+        if nearest is not None and nearest < self.version:
+            if editor._pending:  # pylint: disable=protected-access
+                raise RuntimeError("Unsaved edits; save() them before rewinding.")
+            while self.version > nearest:
+                self._redo.append(self._pop_undo())
+                self.version -= 1
+            editor.restore(self._checkpoints[nearest])
+        while self.version > target:
+            self.undo(editor)
+
+    def close(self) -> None:
+        """Delete the spill file, if any."""
+        if self._spill is not None:
+            self._spill.close()
+
+
+def benchmark_undo(size_mb: int = 100, steps: int = 1000) -> Dict[str, Dict[str, float]]:
+    """
+    Time for `steps` small edits on a `size_mb` MB document, undoing them all and
+    redoing them all, plus the memory allocated while editing (the document excluded).
+    Edits cluster around a cursor, as typing does. The full-copy editor runs 5 steps.
+    """
+    document = "x" * (size_mb * 1_000_000)
+    results = {}
+
+    tracemalloc.start()  # the document itself is allocated before tracing starts
+    editor, history = PieceTableEditor(document), BoundedHistory(limit=None)
+    cursor = len(document) // 2
+    start = time.perf_counter()
+    for i in range(steps):
+        if i % 100 == 0:
+            cursor = 1000 + (i * 7919 * 104729) % (len(editor) - 2000)  # jump elsewhere now and then
+        editor.insert(cursor, "edit")
+        cursor += 4
+        if i % 3 == 0:
+            cursor -= 10
+            editor.delete(cursor, 10)  # backspace
+        history.record(editor)
+    edited = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(steps):
+        history.undo(editor)
+    undone = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(steps):
+        history.redo(editor)
+    redone = time.perf_counter() - start
+    results[f"PieceTableEditor ({steps} steps)"] = {
+        "edit ms": edited * 1000, "undo ms": undone * 1000, "redo ms": redone * 1000,
+        "MiB": memory / 2**20,
+    }
+
+    copies = 5
+    tracemalloc.start()
+    plain, plain_history = TextEditor(), History()
+    plain.write(document)
+    start = time.perf_counter()
+    for _ in range(copies):
+        plain_history.backup(plain.save())
+        plain.write("edit")
+    edited = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for _ in range(copies):
+        plain.restore(plain_history.undo())
+    undone = time.perf_counter() - start
+    tracemalloc.stop()
+    results[f"TextEditor ({copies} steps)"] = {
+        "edit ms": edited * 1000, "undo ms": undone * 1000, "redo ms": float("nan"),
+        "MiB": memory / 2**20,
+    }
+    return results
+
+
+class TestPieceTableEditor(unittest.TestCase):
+    """Test cases for the piece-table editor and its bounded history."""
+
+    def _edited(self, history: BoundedHistory) -> Tuple[PieceTableEditor, List[str]]:
+        editor = PieceTableEditor("Hello world")
+        states = [editor.get_content()]
+        for step in range(12):
+            editor.insert(step % len(editor), str(step))
+            if step % 2:
+                editor.delete(0, 2)
+            history.record(editor)
+            states.append(editor.get_content())
+        return editor, states
+
+    def test_undo_redo_round_trip(self):
+        """Every undo restores the previous state and redo replays it."""
+        history = BoundedHistory(limit=None, checkpoint_every=4)
+        editor, states = self._edited(history)
+        for expected in reversed(states[:-1]):
+            history.undo(editor)
+            self.assertEqual(editor.get_content(), expected)
+        for expected in states[1:]:
+            history.redo(editor)
+            self.assertEqual(editor.get_content(), expected)
+
+    def test_rewind_uses_checkpoints(self):
+        """Rewinding across checkpoints lands on the same state as single undos."""
+        history = BoundedHistory(limit=None, checkpoint_every=4)
+        editor, states = self._edited(history)
+        history.rewind(editor, 9)
+        self.assertEqual(editor.get_content(), states[3])
+        history.redo(editor)
+        self.assertEqual(editor.get_content(), states[4])
+
+    def test_limit_discards_or_spills(self):
+        """Without spilling only `limit` steps remain; with spilling all of them do."""
+        history = BoundedHistory(limit=3)
+        self._edited(history)
+        self.assertEqual(len(history), 3)
+        with tempfile.TemporaryDirectory() as spill_dir:
+            history = BoundedHistory(limit=3, spill_dir=spill_dir)
+            editor, states = self._edited(history)
+            while len(history):
+                history.undo(editor)
+            self.assertEqual(editor.get_content(), states[0])
+            with self.assertRaises(RuntimeError):
+                history.undo(editor)
+            history.close()
+
 # Example usage
 if __name__ == "__main__":
     editor = TextEditor()
@@ -56,4 +455,26 @@ if __name__ == "__main__":
     print("Current content:", editor.get_content())
 
     editor.restore(history.undo())
-    print("After undo:", editor.get_content())
\ No newline at end of file
+    print("After undo:", editor.get_content())
+
+    piece_editor = PieceTableEditor("Hello, ")
+    steps = BoundedHistory(limit=100)
+    piece_editor.write("world!")
+    steps.record(piece_editor)
+    piece_editor.delete(0, 5)
+    piece_editor.insert(0, "Goodbye")
+    steps.record(piece_editor)
+    print("\nPiece table content:", piece_editor.get_content())
+    steps.undo(piece_editor)
+    print("After undo:", piece_editor.get_content())
+    steps.redo(piece_editor)
+    print("After redo:", piece_editor.get_content())
+
+    if "--benchmark" in sys.argv:
+        print("\nSmall edits on a 100 MB document:")
+        for name, figures in benchmark_undo().items():
+            print(f"  {name:<30} edit {figures['edit ms']:9.1f} ms  undo {figures['undo ms']:8.1f} ms  "
+                  f"redo {figures['redo ms']:8.1f} ms  allocated {figures['MiB']:8.2f} MiB")
+
+    # Unit Tests (argv without --benchmark, which unittest would reject)
+    unittest.main(argv=sys.argv[:1])
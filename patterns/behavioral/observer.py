@@ -4,11 +4,61 @@ Behavioral Pattern: Observer
 Defines a one-to-many dependency so that when one object changes state,
 all its dependents are notified and updated automatically.
 Common in event-driven systems.
+
+`Subject` is the minimal teaching version: `notify` calls every observer in turn on the
+publisher's thread, so one slow or failing observer holds up (or breaks) everything.
+`detach` is a linear `list.remove`, and the list keeps every observer alive.
+
+`EventSubject` is the production variant:
+
+* Subscriptions are weak references, keyed by a token. `detach` is two dict deletions,
+  and an observer that is garbage collected unsubscribes itself.
+* Each subscriber is assigned to one of `lanes` worker threads. `notify` only queues
+  the message per lane and returns a `Delivery`, so the publisher never waits on
+  observers. Each lane delivers messages in order, and exceptions are caught per
+  observer and passed to `on_error`.
+* A synchronous `update` cannot be interrupted, so `timeout` is enforced by moving any
+  observer that takes longer than that into a quarantine lane, from its next message
+  on. Slow observers then delay only each other. Messages already queued for it on its
+  old lane are handed to the quarantine lane, so it still gets them in order, one at a
+  time. The time is wall-clock and includes waiting for the GIL, so keep `timeout`
+  well above `sys.getswitchinterval()` times the number of lanes.
+* The timeout is measured once `update` returns, so an observer that never returns
+  is never quarantined: it stalls its lane (or the quarantine lane) for good.
+  `Delivery.wait(timeout)` and `close(timeout)` bound how long the publisher waits on one.
+* Each lane keeps a tuple snapshot of its subscribers, rebuilt only after attach or
+  detach, so `notify` costs O(lanes) rather than O(subscribers) on the publisher.
+
+`TopicSubject` adds routing on top of `EventSubject`:
+
+* `publish(topic, message)` reaches only the matching subscriptions. The index keeps
+  exact topics in a dict and wildcard patterns (`sensor.*.temp`, `sensor.#`) in a trie
+  of topic segments, so routing costs O(segments + matches), not O(subscribers).
+* `subscribe(..., where=predicate)` narrows a subscription further. The predicate runs
+  only for messages whose topic already matched.
+* With `coalesce=True`, published messages are buffered per subscription, and each
+  `flush()` (one per tick) sends every subscription one `update` with the list of its
+  messages.
+
+Run with `--benchmark` for throughput, slow-observer and detach figures at 10k subscribers,
+and for topic routing against broadcast-and-filter.
 """
 
 from __future__ import annotations
+import contextlib
+import io
+import itertools
+import queue
+import random
+import sys
+import threading
+import time
+import unittest
+import weakref
 from abc import ABC, abstractmethod
-from typing import List
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 # Observer interface
 class Observer(ABC):
@@ -42,6 +92,763 @@ class ConcreteObserver(Observer):
     def update(self, message: str) -> None:
         print(f"{self._name} received update: {message}")
 
+
+@dataclass
+class DeliveryReport:
+    """Outcome of one notify() across all subscribers."""
+    delivered: int = 0
+    failed: int = 0
+    slow: int = 0  # took longer than the subject's timeout (and were quarantined)
+    pending_lanes: int = 0  # lanes still delivering when the report was taken
+
+
+class Delivery:
+    """Tracks one message as the lanes deliver it."""
+
+    def __init__(self, lanes: int) -> None:
+        self._remaining = lanes
+        self._report = DeliveryReport()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if not lanes:
+            self._done.set()
+
+    def _forwarded(self) -> None:
+        # One of the message's deliveries was handed to another lane, which reports it separately
+        with self._lock:
+            self._remaining += 1
+
+    def _lane_finished(self, delivered: int, failed: int, slow: int) -> None:
+        with self._lock:
+            self._report.delivered += delivered
+            self._report.failed += failed
+            self._report.slow += slow
+            self._remaining -= 1
+            if not self._remaining:
+                self._done.set()
+
+    def done(self) -> bool:
+        """True once every lane has delivered the message."""
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> DeliveryReport:
+        """Wait up to timeout for delivery to finish and report how far it got."""
+        self._done.wait(timeout)
+        with self._lock:
+            report = DeliveryReport(**vars(self._report))
+            report.pending_lanes = self._remaining
+        return report
+
+
+class _Lane:
+    """A worker thread delivering messages, in order, to its subscribers."""
+
+    def __init__(self, subject: EventSubject, name: str) -> None:
+        self.members: Dict[int, weakref.ref] = {}
+        self.snapshot: Optional[Tuple[Tuple[int, weakref.ref], ...]] = ()
+        self.queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self.moving: Dict[int, _Handoff] = {}  # token -> handoff, for tokens quarantined from this lane
+        self.thread = threading.Thread(target=subject._run_lane, args=(self,), name=name, daemon=True)
+        self.thread.start()
+
+
+class _Handoff:
+    """Messages for a quarantined token that were still queued on its old lane."""
+
+    def __init__(self, token: int) -> None:
+        self.token = token
+        # Filled by the old lane until it reaches the handoff in its queue
+        self.backlog: List[Tuple[weakref.ref, Any, Delivery]] = []
+        # Newer messages the quarantine lane holds back until the backlog is complete
+        self.parked: List[Tuple[weakref.ref, Any, Delivery]] = []
+
+
+_STOP = object()
+
+
+class EventSubject:
+    """A subject with weak subscriptions and concurrent, fault-isolated delivery."""
+
+    def __init__(self, lanes: int = 4, timeout: float = 0.1,
+                 on_error: Optional[Callable[[Any, Exception], None]] = None) -> None:
+        self.timeout = timeout
+        self.on_error = on_error
+        self._lock = threading.Lock()
+        self._tokens = itertools.count()
+        self._by_observer: Dict[int, int] = {}  # id(observer) -> token
+        self._key_of: Dict[int, int] = {}  # token -> id(observer), for attach()ed observers
+        self._lane_of: Dict[int, _Lane] = {}  # token -> lane
+        # Tokens of collected observers. Weakref callbacks can run at any allocation, even
+        # while _lock is held, so they only queue the token; _purge() removes it later.
+        self._dead: Deque[int] = deque()
+        self._lanes = [_Lane(self, f"observer-lane-{i}") for i in range(lanes)]
+        self._quarantine = _Lane(self, "observer-quarantine")
+        self._quarantine_stopping = False
+        self._closed = False
+
+    def __enter__(self) -> EventSubject:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge()
+            return len(self._lane_of)
+
+    def attach(self, observer: Observer) -> int:
+        """Subscribe observer (weakly) and return its token; attaching twice is a no-op."""
+        with self._lock:
+            self._purge()
+            token = self._by_observer.get(id(observer))
+            if token is not None:
+                return token
+            token = next(self._tokens)
+            key = id(observer)
+            lane = self._lanes[token % len(self._lanes)]
+            lane.members[token] = weakref.ref(observer, lambda _ref: self._dead.append(token))
+            lane.snapshot = None
+            self._by_observer[key] = token
+            self._key_of[token] = key
+            self._lane_of[token] = lane
+            return token
+
+    def detach(self, observer: Observer) -> None:
+        """Unsubscribe observer in O(1)."""
+        with self._lock:
+            self._purge()
+            token = self._by_observer.get(id(observer))
+            if token is None:
+                raise ValueError("Observer is not attached.")
+            self._remove(token)
+
+    def _purge(self) -> None:
+        # Called with _lock held
+        while self._dead:
+            self._remove(self._dead.popleft())
+
+    def _remove(self, token: int) -> None:
+        # Called with _lock held
+        lane = self._lane_of.pop(token, None)
+        if lane is None:
+            return
+        if lane.members.pop(token, None) is not None:
+            lane.snapshot = None
+        key = self._key_of.pop(token, None)
+        # The id may already belong to a new observer if this one was collected
+        if key is not None and self._by_observer.get(key) == token:
+            del self._by_observer[key]
+
+    def _quarantine_token(self, token: int) -> None:
+        with self._lock:
+            lane = self._lane_of.get(token)
+            if lane is None or lane is self._quarantine:
+                return
+            ref = lane.members.pop(token, None)
+            if ref is not None:  # topic subscriptions are routed per message, not lane members
+                self._quarantine.members[token] = ref
+                lane.snapshot = self._quarantine.snapshot = None
+            self._lane_of[token] = self._quarantine
+            # Queues are only written with _lock held, so everything ahead of the handoff on
+            # the old lane is backlog, and the quarantine lane sees the handoff before any
+            # message queued for the token from now on. The old lane passes the handoff on
+            # again once it reaches it, which completes the backlog.
+            handoff = lane.moving[token] = _Handoff(token)
+            lane.queue.put(handoff)
+            self._quarantine.queue.put(handoff)
+
+    def notify(self, message: Any) -> Delivery:
+        """Queue message for every subscriber and return at once."""
+        if self._closed:
+            raise RuntimeError("Subject is closed.")
+        with self._lock:
+            self._purge()
+            batches = []
+            for lane in (*self._lanes, self._quarantine):
+                if lane.snapshot is None:
+                    lane.snapshot = tuple(lane.members.items())
+                if lane.snapshot:
+                    batches.append((lane, lane.snapshot))
+            delivery = Delivery(len(batches))
+            for lane, members in batches:
+                lane.queue.put((((token, ref, message) for token, ref in members), delivery))
+        return delivery
+
+    def _run_lane(self, lane: _Lane) -> None:
+        while True:
+            item = lane.queue.get()
+            if item is _STOP:
+                # A handoff queued behind the stop has its whole backlog already
+                for handoff in lane.moving.values():
+                    self._quarantine.queue.put(handoff)
+                return
+            if isinstance(item, _Handoff):
+                self._hand_off(lane, item)
+                continue
+            targets, delivery = item
+            delivered = failed = slow = 0
+            for token, ref, message in targets:
+                handoff = lane.moving.get(token)
+                if handoff is not None:
+                    # Backlog on the old lane, or held back on the quarantine lane until it arrives
+                    delivery._forwarded()  # pylint: disable=protected-access
+                    (handoff.parked if lane is self._quarantine else handoff.backlog).append((ref, message, delivery))
+                    continue
+                counts = self._deliver(token, ref, message)
+                delivered += counts[0]
+                failed += counts[1]
+                slow += counts[2]
+            delivery._lane_finished(delivered, failed, slow)  # pylint: disable=protected-access
+
+    def _hand_off(self, lane: _Lane, handoff: _Handoff) -> None:
+        if lane is not self._quarantine:
+            # The old lane reached the end of the backlog: pass it on
+            del lane.moving[handoff.token]
+            self._quarantine.queue.put(handoff)
+        elif lane.moving.get(handoff.token) is not handoff:
+            # First sight: hold the token's messages without blocking the other observers
+            lane.moving[handoff.token] = handoff
+        else:
+            del lane.moving[handoff.token]
+            for ref, message, delivery in (*handoff.backlog, *handoff.parked):
+                delivery._lane_finished(*self._deliver(handoff.token, ref, message))  # pylint: disable=protected-access
+
+    def _deliver(self, token: int, ref: weakref.ref, message: Any) -> Tuple[int, int, int]:
+        """Call one observer; returns (delivered, failed, slow)."""
+        observer = ref()
+        if observer is None:
+            return 0, 0, 0
+        delivered = failed = slow = 0
+        start = time.perf_counter()
+        try:
+            observer.update(message)
+            delivered = 1
+        except Exception as e:  # pylint: disable=broad-except
+            failed = 1
+            if self.on_error is not None:
+                self.on_error(observer, e)
+        if time.perf_counter() - start > self.timeout:
+            slow = 1
+            self._quarantine_token(token)
+        return delivered, failed, slow
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Deliver everything already queued, then stop the lanes. Returns False if timeout
+        expired first, with an observer still inside update(); call again to keep waiting.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def join(lane: _Lane) -> bool:
+            lane.thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            return not lane.thread.is_alive()
+
+        if not self._closed:
+            self._closed = True
+            with self._lock:
+                for lane in self._lanes:
+                    lane.queue.put(_STOP)
+        if not all([join(lane) for lane in self._lanes]):
+            return False
+        # Only now, as the lanes may still have been handing observers to quarantine
+        if not self._quarantine_stopping:
+            self._quarantine_stopping = True
+            self._quarantine.queue.put(_STOP)
+        return join(self._quarantine)
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """One observer's interest in a topic pattern, optionally narrowed by a predicate."""
+    token: int
+    ref: weakref.ref
+    pattern: str
+    where: Optional[Callable[[Any], bool]] = None
+
+
+class _TopicNode:
+    """A trie node: one topic segment of the wildcard patterns."""
+    __slots__ = ("children", "subscriptions")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TopicNode] = {}
+        self.subscriptions: Dict[int, Subscription] = {}
+
+
+def _segments(pattern: str) -> List[str]:
+    segments = pattern.split(".")
+    if "#" in segments[:-1]:
+        raise ValueError(f"'#' may only be the last segment: {pattern!r}")
+    return segments
+
+
+class TopicSubject(EventSubject):
+    """
+    An EventSubject whose published messages reach only the matching subscriptions.
+
+    Patterns are dot-separated; `*` matches one segment and a trailing `#` zero or more.
+    With `coalesce=True`, `publish` only buffers, and each `flush()` (call it once per tick)
+    delivers one list of that tick's messages to every subscription that matched any.
+    """
+
+    def __init__(self, lanes: int = 4, timeout: float = 0.1,
+                 on_error: Optional[Callable[[Any, Exception], None]] = None,
+                 coalesce: bool = False) -> None:
+        super().__init__(lanes, timeout, on_error)
+        self.coalesce = coalesce
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._exact: Dict[str, Dict[int, Subscription]] = {}
+        self._trie = _TopicNode()
+        self._pending: Dict[int, Tuple[weakref.ref, List[Any]]] = {}  # token -> (ref, messages)
+
+    def subscribe(self, observer: Observer, pattern: str,
+                  where: Optional[Callable[[Any], bool]] = None) -> int:
+        """Subscribe observer (weakly) to a topic pattern and return the subscription's token."""
+        segments = _segments(pattern)
+        with self._lock:
+            self._purge()
+            token = next(self._tokens)
+            ref = weakref.ref(observer, lambda _ref: self._dead.append(token))
+            subscription = Subscription(token, ref, pattern, where)
+            if "*" in segments or "#" in segments:
+                node = self._trie
+                for segment in segments:
+                    node = node.children.setdefault(segment, _TopicNode())
+                node.subscriptions[token] = subscription
+            else:
+                self._exact.setdefault(pattern, {})[token] = subscription
+            self._subscriptions[token] = subscription
+            self._lane_of[token] = self._lanes[token % len(self._lanes)]
+            return token
+
+    def unsubscribe(self, token: int) -> None:
+        """Remove a subscription; O(1) for exact topics, O(segments) for wildcards."""
+        with self._lock:
+            self._purge()
+            self._remove(token)
+
+    def _remove(self, token: int) -> None:
+        # Called with _lock held
+        super()._remove(token)
+        subscription = self._subscriptions.pop(token, None)
+        if subscription is None:
+            return
+        self._pending.pop(token, None)
+        bucket = self._exact.get(subscription.pattern)
+        if bucket is not None and token in bucket:
+            del bucket[token]
+            if not bucket:
+                del self._exact[subscription.pattern]
+            return
+        segments = subscription.pattern.split(".")
+        path = [self._trie]
+        for segment in segments:
+            path.append(path[-1].children[segment])
+        del path[-1].subscriptions[token]
+        # Prune the nodes left without subscriptions or children
+        for parent, segment, node in reversed(list(zip(path, segments, path[1:]))):
+            if node.subscriptions or node.children:
+                break
+            del parent.children[segment]
+
+    def match(self, topic: str) -> List[Subscription]:
+        """The subscriptions whose pattern matches topic, ignoring predicates."""
+        with self._lock:
+            self._purge()
+            found = list(self._exact.get(topic, {}).values())
+            nodes = [self._trie]
+            for segment in topic.split("."):
+                following = []
+                for node in nodes:
+                    rest = node.children.get("#")
+                    if rest is not None:
+                        found.extend(rest.subscriptions.values())
+                    for key in (segment, "*"):
+                        child = node.children.get(key)
+                        if child is not None:
+                            following.append(child)
+                nodes = following
+                if not nodes:
+                    return found
+            for node in nodes:
+                found.extend(node.subscriptions.values())
+                rest = node.children.get("#")  # '#' also matches zero segments
+                if rest is not None:
+                    found.extend(rest.subscriptions.values())
+            return found
+
+    def _accepts(self, subscription: Subscription, observer: Observer, message: Any) -> bool:
+        if subscription.where is None:
+            return True
+        try:
+            return bool(subscription.where(message))
+        except Exception as e:  # pylint: disable=broad-except
+            if self.on_error is not None:
+                self.on_error(observer, e)
+            return False
+
+    def publish(self, topic: str, message: Any) -> Optional[Delivery]:
+        """
+        Route message to the subscriptions matching topic. Returns its Delivery, or None
+        when coalescing (the next flush() delivers it).
+        """
+        if self._closed:
+            raise RuntimeError("Subject is closed.")
+        accepted = [
+            subscription for subscription in self.match(topic)
+            if (observer := subscription.ref()) is not None and self._accepts(subscription, observer, message)
+        ]
+        targets: Dict[_Lane, List[Tuple[int, weakref.ref, Any]]] = {}
+        with self._lock:
+            for subscription in accepted:
+                token = subscription.token
+                if token not in self._subscriptions:
+                    continue  # unsubscribed meanwhile
+                if self.coalesce:
+                    self._pending.setdefault(token, (subscription.ref, []))[1].append(message)
+                else:
+                    targets.setdefault(self._lane_of[token], []).append((token, subscription.ref, message))
+            return None if self.coalesce else self._enqueue(targets)
+
+    def flush(self) -> Delivery:
+        """Deliver each coalescing subscription's buffered messages as one list."""
+        if self._closed:
+            raise RuntimeError("Subject is closed.")
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            targets: Dict[_Lane, List[Tuple[int, weakref.ref, Any]]] = {}
+            for token, (ref, messages) in pending.items():
+                lane = self._lane_of.get(token)
+                if lane is not None:
+                    targets.setdefault(lane, []).append((token, ref, messages))
+            return self._enqueue(targets)
+
+    def _enqueue(self, targets: Dict[_Lane, List[Tuple[int, weakref.ref, Any]]]) -> Delivery:
+        # Called with _lock held, like every other write to the lane queues
+        delivery = Delivery(len(targets))
+        for lane, items in targets.items():
+            lane.queue.put((items, delivery))
+        return delivery
+
+
+class CountingObserver(Observer):
+    """Counts messages without printing; optionally slow."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.received = 0
+
+    def update(self, message: str) -> None:
+        if self.delay:
+            time.sleep(self.delay)
+        self.received += 1
+
+
+def benchmark_subjects(subscribers: int = 10_000, messages: int = 50, slow_delay: float = 0.1) -> Dict[str, Dict[str, float]]:
+    """
+    At `subscribers` observers: deliveries per second; with one observer sleeping
+    `slow_delay` seconds per message, the publisher's time per notify and the time until
+    the other observers have 10 messages; and the time to detach everyone in random order.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    quiet = contextlib.redirect_stdout(io.StringIO())  # Subject prints on every call
+
+    for label in ("Subject", "EventSubject"):
+        observers = [CountingObserver() for _ in range(subscribers)]
+        slow_observer = CountingObserver(slow_delay)
+        subject: Any = Subject() if label == "Subject" else EventSubject(timeout=slow_delay / 2)
+        with quiet:
+            for observer in observers:
+                subject.attach(observer)
+
+            start = time.perf_counter()
+            deliveries = [subject.notify(f"message {i}") for i in range(messages)]
+            if label == "EventSubject":
+                for delivery in deliveries:
+                    delivery.wait()
+            throughput = subscribers * messages / (time.perf_counter() - start)
+
+            subject.attach(slow_observer)
+            warm_up = subject.notify("warm-up")  # lets EventSubject spot and quarantine the slow observer
+            if label == "EventSubject":
+                warm_up.wait()
+            expected = observers[0].received + 10
+            start = time.perf_counter()
+            for i in range(10):
+                subject.notify(f"slow {i}")
+            publish_ms = (time.perf_counter() - start) / 10 * 1000
+            while min(observer.received for observer in observers) < expected:
+                time.sleep(0.001)
+            fast_ms = (time.perf_counter() - start) * 1000
+            subject.detach(slow_observer)
+
+            start = time.perf_counter()
+            for observer in random.Random(0).sample(observers, len(observers)):
+                subject.detach(observer)
+            detach_ms = (time.perf_counter() - start) * 1000
+        if label == "EventSubject":
+            subject.close()
+        results[label] = {
+            "deliveries/s": throughput, "notify ms (slow observer)": publish_ms,
+            "10 messages to the rest ms": fast_ms, "detach all ms": detach_ms,
+        }
+    return results
+
+
+class TopicFilterObserver(CountingObserver):
+    """Receives every (topic, payload) broadcast and keeps only its own topic's."""
+
+    def __init__(self, topic: str) -> None:
+        super().__init__()
+        self.topic = topic
+        self.calls = 0
+
+    def update(self, message: Tuple[str, Any]) -> None:
+        self.calls += 1
+        if message[0] == self.topic:
+            self.received += 1
+
+
+def benchmark_routing(subscribers: int = 10_000, messages: int = 2000, burst: int = 100) -> Dict[str, Dict[str, float]]:
+    """
+    Microseconds per published message and update calls made, with `subscribers` observers
+    each interested in one sensor: broadcast-and-filter against topic routing. Then
+    10 ticks of `burst` messages to 1000 subscribers, with and without coalescing.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    rng = random.Random(0)
+    topics = [f"sensor.{i}.temp" for i in range(subscribers)]
+
+    broadcast_messages = messages // 20  # every broadcast calls all subscribers
+    filters = [TopicFilterObserver(topic) for topic in topics]
+    with EventSubject() as broadcast:
+        for observer in filters:
+            broadcast.attach(observer)
+        start = time.perf_counter()
+        deliveries = [broadcast.notify((rng.choice(topics), i)) for i in range(broadcast_messages)]
+        for delivery in deliveries:
+            delivery.wait()
+        elapsed = time.perf_counter() - start
+    results[f"broadcast + filter ({broadcast_messages} msgs)"] = {
+        "us/message": elapsed / broadcast_messages * 1e6, "update calls": sum(o.calls for o in filters),
+    }
+
+    observers = [CountingObserver() for _ in range(subscribers + 20)]
+    with TopicSubject() as routed:
+        for observer, topic in zip(observers, topics):
+            routed.subscribe(observer, topic)
+        for observer in observers[subscribers:subscribers + 10]:
+            routed.subscribe(observer, "sensor.*.temp")
+        for observer in observers[subscribers + 10:]:
+            routed.subscribe(observer, "sensor.#")
+        start = time.perf_counter()
+        deliveries = [routed.publish(rng.choice(topics), i) for i in range(messages)]
+        for delivery in deliveries:
+            delivery.wait()
+        elapsed = time.perf_counter() - start
+    results[f"topic routing ({messages} msgs)"] = {
+        "us/message": elapsed / messages * 1e6, "update calls": sum(o.received for o in observers),
+    }
+
+    for coalesce in (False, True):
+        observers = [CountingObserver() for _ in range(1000)]
+        with TopicSubject(coalesce=coalesce) as ticking:
+            for i, observer in enumerate(observers):
+                ticking.subscribe(observer, f"room.{i % 10}.#")
+            start = time.perf_counter()
+            for tick in range(10):
+                deliveries = [ticking.publish(f"room.{j % 10}.light", (tick, j)) for j in range(burst)]
+                if coalesce:
+                    deliveries = [ticking.flush()]
+                for delivery in deliveries:
+                    delivery.wait()
+            elapsed = time.perf_counter() - start
+        results[f"{'coalesced' if coalesce else 'per message'} ({10 * burst} msgs)"] = {
+            "us/message": elapsed / (10 * burst) * 1e6, "update calls": sum(o.received for o in observers),
+        }
+    return results
+
+
+class _Scripted(Observer):
+    """Records messages; sleeps for, or blocks on an Event before, the scripted ones."""
+
+    def __init__(self, script: Dict[Any, Any]) -> None:
+        self.script = script
+        self.seen: List[Any] = []
+        self._arrived = threading.Condition()
+
+    def update(self, message: Any) -> None:
+        pause = self.script.get(message)
+        if isinstance(pause, threading.Event):
+            pause.wait()
+        elif pause:
+            time.sleep(pause)
+        with self._arrived:
+            self.seen.append(message)
+            self._arrived.notify_all()
+
+    def reached(self, message: Any, timeout: float = 10.0) -> bool:
+        """Wait until message has been delivered; generous, as CI machines can be slow."""
+        with self._arrived:
+            return self._arrived.wait_for(lambda: message in self.seen, timeout)
+
+
+class TestEventSubject(unittest.TestCase):
+    """Test cases for EventSubject."""
+
+    def test_delivers_in_order_and_isolates_errors(self):
+        """Every observer gets every message in order, despite a failing observer."""
+        class Recorder(Observer):
+            def __init__(self) -> None:
+                self.seen: List[int] = []
+
+            def update(self, message: int) -> None:
+                self.seen.append(message)
+
+        class Failing(Observer):
+            def update(self, message: int) -> None:
+                raise RuntimeError("boom")
+
+        errors = []
+        recorders = [Recorder() for _ in range(10)]
+        failing = Failing()
+        with EventSubject(lanes=3, on_error=lambda observer, e: errors.append(e)) as subject:
+            for observer in (*recorders, failing):
+                subject.attach(observer)
+            reports = [subject.notify(i) for i in range(20)]
+        self.assertTrue(all(r.seen == list(range(20)) for r in recorders))
+        self.assertEqual((reports[-1].wait().delivered, reports[-1].wait().failed), (10, 1))
+        self.assertEqual(len(errors), 20)
+
+    def test_weak_subscriptions_and_detach(self):
+        """Collected observers unsubscribe themselves; detach is immediate."""
+        with EventSubject() as subject:
+            kept, dropped = CountingObserver(), CountingObserver()
+            subject.attach(kept)
+            subject.attach(dropped)
+            del dropped
+            self.assertEqual(len(subject), 1)
+            subject.detach(kept)
+            self.assertEqual(subject.notify("nobody").wait().delivered, 0)
+            with self.assertRaises(ValueError):
+                subject.detach(kept)
+
+    def test_slow_observer_is_quarantined(self):
+        """After one slow delivery, a slow observer no longer delays its lane."""
+        release = threading.Event()
+        slow = _Scripted({"first": 0.1, "second": release})
+        fast = _Scripted({})
+        with EventSubject(lanes=1, timeout=0.05) as subject:
+            subject.attach(slow)
+            subject.attach(fast)
+            self.assertEqual(subject.notify("first").wait().slow, 1)
+            subject.notify("second")
+            # The slow observer is blocked on its second message, yet the fast one gets it
+            self.assertTrue(fast.reached("second"))
+            self.assertEqual(slow.seen, ["first"])
+            release.set()
+        self.assertEqual(slow.seen, ["first", "second"])
+
+    def test_hung_observer_only_stalls_its_own_lane(self):
+        """A quarantine handoff behind a hung observer doesn't hold up other quarantined ones."""
+        release = threading.Event()
+        resident = _Scripted({"warm-up": 0.1})  # quarantined first
+        moving = _Scripted({1: 0.1})  # quarantined while message 2 waits behind it
+        hung = _Scripted({2: release})  # then never returns from message 2
+        subject = EventSubject(lanes=1, timeout=0.05)
+        subject.attach(resident)
+        subject.notify("warm-up").wait()
+        subject.attach(moving)
+        subject.attach(hung)
+        subject.notify(1)
+        stalled = subject.notify(2)
+        subject.notify(3)
+        self.assertTrue(resident.reached(3))
+        self.assertGreater(stalled.wait(timeout=0.05).pending_lanes, 0)
+        self.assertFalse(subject.close(timeout=0.05))
+        release.set()
+        self.assertTrue(subject.close())
+        self.assertEqual([moving.seen, hung.seen, resident.seen[1:]], [[1, 2, 3]] * 3)
+
+    def test_quarantine_keeps_order(self):
+        """Messages queued before a quarantine still arrive in order, one call at a time."""
+        class SlowRecorder(Observer):
+            def __init__(self) -> None:
+                self.seen: List[int] = []
+                self.active = self.overlaps = 0
+
+            def update(self, message: int) -> None:
+                self.active += 1
+                self.overlaps += self.active > 1
+                time.sleep(0.06)
+                self.seen.append(message)
+                self.active -= 1
+
+        recorder = SlowRecorder()
+        with EventSubject(lanes=1, timeout=0.05) as subject:
+            subject.attach(recorder)
+            reports = [subject.notify(i) for i in range(6)]
+        self.assertEqual(recorder.seen, list(range(6)))
+        self.assertEqual(recorder.overlaps, 0)
+        self.assertTrue(all(report.done() for report in reports))
+        self.assertEqual(sum(report.wait().delivered for report in reports), 6)
+
+class TestTopicSubject(unittest.TestCase):
+    """Test cases for TopicSubject."""
+
+    def test_matching(self):
+        """Exact topics, '*' for one segment and a trailing '#' for zero or more."""
+        with TopicSubject() as subject:
+            observer = CountingObserver()
+            patterns = ["a.b.c", "a.*.c", "a.#", "#", "*.b", "a.b.c.#"]
+            tokens = {subject.subscribe(observer, pattern): pattern for pattern in patterns}
+
+            def matched(topic: str) -> List[str]:
+                return sorted(tokens[s.token] for s in subject.match(topic))
+
+            self.assertEqual(matched("a.b.c"), ["#", "a.#", "a.*.c", "a.b.c", "a.b.c.#"])
+            self.assertEqual(matched("a"), ["#", "a.#"])
+            self.assertEqual(matched("x.b"), ["#", "*.b"])
+            with self.assertRaises(ValueError):
+                subject.subscribe(observer, "a.#.c")
+
+    def test_predicates_and_unsubscribe(self):
+        """Predicates filter matching messages; unsubscribed and collected observers get nothing."""
+        kept, dropped = CountingObserver(), CountingObserver()
+        with TopicSubject() as subject:
+            token = subject.subscribe(kept, "sensor.*", where=lambda reading: reading > 20)
+            subject.subscribe(dropped, "sensor.kitchen")
+            del dropped
+            self.assertEqual(len(subject.match("sensor.kitchen")), 1)
+            subject.publish("sensor.kitchen", 25).wait()
+            subject.publish("sensor.kitchen", 15).wait()
+            subject.unsubscribe(token)
+            self.assertEqual(subject.publish("sensor.kitchen", 30).wait().delivered, 0)
+            self.assertEqual(subject._trie.children, {})  # pylint: disable=protected-access
+        self.assertEqual(kept.received, 1)
+
+    def test_coalescing(self):
+        """Each flush delivers one list per subscription with that tick's messages in order."""
+        class Recorder(Observer):
+            def __init__(self) -> None:
+                self.batches: List[List[int]] = []
+
+            def update(self, message: List[int]) -> None:
+                self.batches.append(message)
+
+        recorder = Recorder()
+        with TopicSubject(coalesce=True) as subject:
+            subject.subscribe(recorder, "ticks.#")
+            self.assertIsNone(subject.publish("ticks.a", 1))
+            subject.publish("other", 99)
+            subject.publish("ticks.b", 2)
+            subject.flush().wait()
+            subject.publish("ticks", 3)
+            subject.flush().wait()
+        self.assertEqual(recorder.batches, [[1, 2], [3]])
+
+
 # Example usage
 if __name__ == "__main__":
     subject = Subject()
@@ -56,3 +863,27 @@ if __name__ == "__main__":
 
     subject.detach(observer1)
     subject.notify("Another change occurred.")
+
+    print("\nEventSubject:")
+    with EventSubject(lanes=1) as events:
+        events.attach(observer1)
+        events.attach(observer2)
+        print(events.notify("Delivered on worker lanes.").wait())
+
+    print("\nTopicSubject:")
+    with TopicSubject(lanes=1) as topics:
+        topics.subscribe(observer1, "orders.*.created")
+        topics.subscribe(observer2, "orders.#", where=lambda order: order["total"] > 100)
+        topics.publish("orders.eu.created", {"id": 1, "total": 50}).wait()
+        topics.publish("orders.us.created", {"id": 2, "total": 500}).wait()
+
+    if "--benchmark" in sys.argv:
+        print("\n10,000 subscribers, one of them taking 100 ms per message:")
+        for name, figures in benchmark_subjects().items():
+            print(f"  {name:<13} " + "  ".join(f"{key} {value:,.1f}" for key, value in figures.items()))
+        print("\nRouting to 10,000 single-sensor subscribers, then bursts to 1000 subscribers:")
+        for name, figures in benchmark_routing().items():
+            print(f"  {name:<34} {figures['us/message']:10.1f} us/message  {figures['update calls']:10,.0f} update calls")
+
+    # Unit Tests (argv without --benchmark, which unittest would reject)
+    unittest.main(argv=sys.argv[:1])
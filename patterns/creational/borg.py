@@ -3,7 +3,33 @@ borg.py
 
 The Borg (Monostate) pattern in Python. This design allows multiple instances of a 
 class to share the same state, unlike Singleton which restricts instantiation.
+
+`Borg` shares its `__dict__` only within one interpreter, so every worker process ends
+up with its own copy. `SharedBorg` keeps a small fixed-schema state in
+`multiprocessing.shared_memory` instead, so instances in every process see one state:
+
+* The state is a `struct` record behind an 8-byte sequence counter (a seqlock).
+  Writers take a cross-process lock, make the counter odd, write the record, and make
+  it even again. Readers take no lock: they copy the record and retry if the counter
+  was odd or changed meanwhile, so they always get a consistent snapshot.
+* Reads are a memory copy instead of a round trip to a `Manager()` server process.
+  Run with `--benchmark` to compare the two.
+
+Caveat: Python exposes no memory barriers. The seqlock relies on each counter update
+and record copy being a single store, and on the platform keeping stores in order,
+which holds on x86-64 and for CPython's memoryview copies in practice.
 """
+import itertools
+import multiprocessing
+import struct
+import sys
+import time
+import unittest
+from multiprocessing import shared_memory
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+# Seqlock read retries before a reader starts yielding the CPU between attempts
+SPIN_ATTEMPTS = 100
 
 class Borg:
     """
@@ -40,6 +66,257 @@ class AppConfig(Borg):
         print(f"Debug: {self.debug}, Theme: {self.theme}, Version: {self.version}")
 
 
+class SharedBorg:
+    """
+    Borg whose shared state lives in shared memory, visible to every process.
+
+    Subclasses declare the state as `_schema = {"field": struct_code}` (e.g. "?" for a
+    bool, "q" for an int, "d" for a float, "16s" for a UTF-8 string of up to 16 bytes)
+    and `_defaults` for its initial values. One process calls `create()`; forked
+    children inherit the segment, and spawned ones call `attach(*handle())`.
+    """
+    _schema: ClassVar[Dict[str, str]] = {}
+    _defaults: ClassVar[Dict[str, Any]] = {}
+    # Per class, per process: the attached segment, writer lock and record layout
+    _segment: ClassVar[Optional[shared_memory.SharedMemory]] = None
+    _lock: ClassVar[Any] = None
+    _record: ClassVar[Optional[struct.Struct]] = None
+
+    _SEQ = struct.Struct("Q")
+
+    @classmethod
+    def _layout(cls) -> struct.Struct:
+        return struct.Struct("=" + "".join(cls._schema.values()))
+
+    @classmethod
+    def create(cls, name: Optional[str] = None, lock: Any = None) -> str:
+        """
+        Allocate and initialise the shared state; returns the segment name. Pass a lock
+        from the multiprocessing context the workers will be started with.
+        """
+        record = cls._layout()
+        segment = shared_memory.SharedMemory(name=name, create=True, size=cls._SEQ.size + record.size)
+        cls._segment, cls._record = segment, record
+        cls._lock = lock or multiprocessing.Lock()
+        cls._SEQ.pack_into(segment.buf, 0, 0)
+        record.pack_into(segment.buf, cls._SEQ.size, *cls._encode(dict(cls._defaults)))
+        return segment.name
+
+    @classmethod
+    def handle(cls) -> Tuple[str, Any]:
+        """Segment name and writer lock, to pass to a spawned process's attach()."""
+        return cls._segment.name, cls._lock
+
+    @classmethod
+    def attach(cls, name: str, lock: Any) -> None:
+        """Attach this process to a segment created elsewhere."""
+        try:
+            # Python 3.13+: don't let this process's resource tracker unlink the segment
+            segment = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            segment = shared_memory.SharedMemory(name=name)
+        cls._segment, cls._lock, cls._record = segment, lock, cls._layout()
+
+    @classmethod
+    def destroy(cls) -> None:
+        """Release the segment; call once, from the creating process, when all are done."""
+        if cls._segment is not None:
+            cls._segment.close()
+            cls._segment.unlink()
+            cls._segment = None
+
+    @classmethod
+    def _encode(cls, values: Dict[str, Any]) -> list:
+        encoded = []
+        for field, code in cls._schema.items():
+            value = values[field]
+            if code.endswith("s"):
+                value = value.encode("utf-8")
+                if len(value) > int(code[:-1] or 1):
+                    raise ValueError(f"{field} is longer than its {code} field")
+            encoded.append(value)
+        return encoded
+
+    @classmethod
+    def _decode(cls, raw: tuple) -> Dict[str, Any]:
+        return {
+            field: value.rstrip(b"\0").decode("utf-8") if code.endswith("s") else value
+            for (field, code), value in zip(cls._schema.items(), raw)
+        }
+
+    def __init__(self) -> None:
+        if type(self)._segment is None:
+            raise RuntimeError(f"{type(self).__name__}.create() or attach() must be called first")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """A consistent copy of the whole state, without taking the lock."""
+        cls = type(self)
+        buf, seq, offset = cls._segment.buf, cls._SEQ, cls._SEQ.size
+        for attempt in itertools.count():
+            if attempt >= SPIN_ATTEMPTS:
+                time.sleep(0)  # a writer is slow or descheduled: yield instead of spinning
+            before = seq.unpack_from(buf, 0)[0]
+            if before & 1:  # a write is in progress
+                continue
+            raw = cls._record.unpack_from(buf, offset)
+            if seq.unpack_from(buf, 0)[0] == before:
+                return cls._decode(raw)
+        raise AssertionError("unreachable")
+
+    def update(self, **changes: Any) -> None:
+        """Atomically change one or more fields."""
+        cls = type(self)
+        unknown = set(changes) - set(cls._schema)
+        if unknown:
+            raise AttributeError(f"Not in the shared schema: {', '.join(sorted(unknown))}")
+        buf, seq, offset = cls._segment.buf, cls._SEQ, cls._SEQ.size
+        with cls._lock:
+            version = seq.unpack_from(buf, 0)[0]
+            current = cls._decode(cls._record.unpack_from(buf, offset))
+            current.update(changes)
+            # Pack before making the counter odd, so a value that doesn't fit the field
+            # raises here and readers never see a write that will not finish
+            payload = cls._record.pack(*cls._encode(current))
+            seq.pack_into(buf, 0, version + 1)
+            buf[offset:offset + len(payload)] = payload
+            seq.pack_into(buf, 0, version + 2)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names not found normally, i.e. the shared fields
+        if name in type(self)._schema:
+            return self.snapshot()[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in type(self)._schema:
+            self.update(**{name: value})
+        else:
+            super().__setattr__(name, value)
+
+
+class SharedAppConfig(SharedBorg):
+    """AppConfig whose state is shared by every process attached to it."""
+    _schema = {"debug": "?", "theme": "16s", "version": "8s"}
+    _defaults = {"debug": False, "theme": "light", "version": "1.0"}
+
+    def set_config(self, debug: bool, theme: str):
+        """Update config settings in one atomic write."""
+        self.update(debug=debug, theme=theme)
+
+    def show_config(self):
+        """Display current configuration."""
+        state = self.snapshot()
+        print(f"Debug: {state['debug']}, Theme: {state['theme']}, Version: {state['version']}")
+
+
+def _dark_mode_worker(name: str, lock: Any) -> None:
+    """Runs in a spawned process: attach and change the shared config."""
+    SharedAppConfig.attach(name, lock)
+    SharedAppConfig().set_config(debug=True, theme="dark")
+    SharedAppConfig._segment.close()
+
+
+class _Counters(SharedBorg):
+    """Every write keeps left == right and label == f"n{left}", so a torn read shows."""
+    _schema = {"left": "q", "right": "q", "label": "8s"}
+    _defaults = {"left": 0, "right": 0, "label": "n0"}
+
+
+def _count_up(name: str, lock: Any, rounds: int) -> None:
+    """Runs in a spawned process: rewrite the whole _Counters record rounds times."""
+    _Counters.attach(name, lock)
+    counters = _Counters()
+    for i in range(1, rounds + 1):
+        counters.update(left=i, right=i, label=f"n{i % 10_000}")
+    _Counters._segment.close()
+
+
+def benchmark_reads(reads: int = 20_000) -> Dict[str, float]:
+    """Microseconds per read: seqlock shared memory versus a Manager().dict() proxy."""
+    SharedAppConfig.create()
+    config = SharedAppConfig()
+    results = {}
+    try:
+        with multiprocessing.Manager() as manager:
+            proxy = manager.dict(SharedAppConfig._defaults)
+            timings = {
+                "SharedBorg attribute": lambda: config.theme,
+                "SharedBorg snapshot": config.snapshot,
+                "Manager().dict() item": lambda: proxy["theme"],
+                "Manager().dict() copy": proxy.copy,
+            }
+            for label, read in timings.items():
+                start = time.perf_counter()
+                for _ in range(reads):
+                    read()
+                results[label] = (time.perf_counter() - start) / reads * 1e6
+    finally:
+        SharedAppConfig.destroy()
+    return results
+
+
+class TestSharedBorg(unittest.TestCase):
+    """Test cases for the shared-memory seqlock state."""
+
+    def tearDown(self):
+        SharedAppConfig.destroy()
+        _Counters.destroy()
+
+    def test_instances_share_state(self):
+        """Every instance reads and writes one state; the class must be set up first."""
+        with self.assertRaises(RuntimeError):
+            SharedAppConfig()
+        SharedAppConfig.create()
+        first, second = SharedAppConfig(), SharedAppConfig()
+        first.set_config(debug=True, theme="dark")
+        second.version = "2.0"
+        self.assertEqual(first.snapshot(), {"debug": True, "theme": "dark", "version": "2.0"})
+        self.assertEqual(second.theme, "dark")
+
+    def test_state_is_shared_across_processes(self):
+        """A write from a spawned process is visible here."""
+        spawn = multiprocessing.get_context("spawn")
+        SharedAppConfig.create(lock=spawn.Lock())
+        worker = spawn.Process(target=_dark_mode_worker, args=SharedAppConfig.handle())
+        worker.start()
+        worker.join()
+        self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(SharedAppConfig().snapshot()["theme"], "dark")
+
+    def test_rejected_writes_leave_state_and_counter_intact(self):
+        """Oversized, unpackable and unknown values raise without a half-finished write."""
+        _Counters.create()
+        counters = _Counters()
+        counters.update(left=1, right=1, label="n1")
+        before = counters.snapshot()
+        with self.assertRaises(ValueError):
+            counters.update(label="far too long")
+        with self.assertRaises(struct.error):
+            counters.update(left="not a number")
+        with self.assertRaises(AttributeError):
+            counters.update(middle=1)
+        seq = _Counters._SEQ.unpack_from(_Counters._segment.buf, 0)[0]
+        self.assertEqual(seq % 2, 0)
+        self.assertEqual(counters.snapshot(), before)
+
+    def test_readers_never_see_torn_writes(self):
+        """Snapshots taken while another process writes are always whole records."""
+        spawn = multiprocessing.get_context("spawn")
+        name = _Counters.create(lock=spawn.Lock())
+        writer = spawn.Process(target=_count_up, args=(name, _Counters._lock, 20_000))
+        counters = _Counters()
+        writer.start()
+        reads = 0
+        while writer.is_alive() or not reads:
+            state = counters.snapshot()
+            self.assertEqual(state["left"], state["right"])
+            self.assertEqual(state["label"], f"n{state['left'] % 10_000}")
+            reads += 1
+        writer.join()
+        self.assertEqual(writer.exitcode, 0)
+        self.assertEqual(counters.left, 20_000)
+
+
 # === Demonstration ===
 
 def main():
@@ -63,10 +340,34 @@ def main():
     print(f"\nAre config1 and config2 the same object? {'Yes' if config1 is config2 else 'No'}")
     print(f"Do they share the same state? {'Yes' if config1.__dict__ is config2.__dict__ else 'No'}")
 
+    print("\nShared-memory Borg across processes:")
+    spawn = multiprocessing.get_context("spawn")
+    name = SharedAppConfig.create(lock=spawn.Lock())
+    try:
+        shared = SharedAppConfig()
+        shared.show_config()
+        worker = spawn.Process(
+            target=_dark_mode_worker, args=SharedAppConfig.handle()
+        )
+        worker.start()
+        worker.join()
+        print(f"After a separate process (pid {worker.pid}) updated segment {name}:")
+        shared.show_config()
+    finally:
+        SharedAppConfig.destroy()
+
+    if "--benchmark" in sys.argv:
+        print("\nRead latency (microseconds per read):")
+        for label, micros in benchmark_reads().items():
+            print(f"  {label:<24} {micros:8.2f}")
+
 
 if __name__ == "__main__":
     main()
 
+    # Unit Tests (argv without --benchmark, which unittest would reject)
+    unittest.main(argv=sys.argv[:1])
+
 # Sample Output:
 # 🔁 Borg Pattern Demonstration 🔁
 
@@ -83,3 +384,8 @@ if __name__ == "__main__":
 
 # Are config1 and config2 the same object? No
 # Do they share the same state? Yes
+
+# Shared-memory Borg across processes:
+# Debug: False, Theme: light, Version: 1.0
+# After a separate process (pid 12345) updated segment psm_1a2b3c4d:
+# Debug: True, Theme: dark, Version: 1.0
@@ -5,10 +5,57 @@ Demonstrates the Lazy Evaluation pattern in Python using a custom @lazy_property
 This pattern is useful when you want to delay the evaluation of a resource-intensive
 property until it is actually accessed.
 
+`lazy_property` is the teaching version: it wraps a `property`, so every access (even
+after caching) runs `hasattr` and `getattr` through the descriptor, and two threads
+reading it for the first time can both compute it.
+
+`lazy_attribute` is the production version, a non-data descriptor:
+
+* The first access computes the value and stores it in the instance `__dict__`
+  under the same name. Because the descriptor defines no `__set__`, later reads find the
+  instance attribute first and never call into the descriptor again.
+* Computation happens at most once per instance, even with many threads reading at
+  the same time. The lock is per instance, so unrelated objects never wait on each other.
+* Classes with `__slots__` use `lazy_slot` and declare a `_lazy_<name>` slot to hold
+  the value.
+* `async_lazy_attribute` (and `async_lazy_slot`) do the same for `async def` producers. Concurrent awaiters
+  share one task, and a failed computation is retried on the next access. The task is
+  created on the running loop, so the attribute must be read inside a coroutine.
+* `invalidate(obj, "name")` (or `del obj.name`) drops a cached value so it is recomputed.
+
+`ReportGenerator` computes its summary with `SummaryStats`, which reads the data once.
+It takes any iterable, including a generator that yields chunks, so the data never has
+to be fully in memory. NumPy arrays are reduced with vectorized calls. Partial results
+merge, so chunks can be summarised in parallel across a process pool.
+
+Run with `--benchmark` for microbenchmarks against `functools.cached_property` and
+of the summary strategies.
 """
 
+import asyncio
+import contextlib
+import functools
+import io
+import itertools
+import os
+import sys
+import threading
 import time
+import timeit
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from functools import wraps
+from types import MemberDescriptorType
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; SummaryStats works on any iterable without it
+    np = None
+
+T = TypeVar("T")
+_MISSING = object()
 
 def lazy_property(func):
     """
@@ -32,6 +79,261 @@ def lazy_property(func):
     return wrapper
 
 
+class lazy_attribute(Generic[T]):  # pylint: disable=invalid-name
+    """
+    Non-data descriptor computing a value once per instance, on first access.
+
+    Usage:
+        @lazy_attribute
+        def expensive_computation(self): ...
+    """
+
+    def __init__(self, func: Callable[[Any], T]) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+        # Guards _pending, which maps id(instance) -> the lock of a computation in progress
+        self._guard = threading.Lock()
+        self._pending: Dict[int, threading.Lock] = {}
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        if not owner.__dictoffset__:
+            raise TypeError(
+                f"{owner.__name__} instances have no __dict__ to cache {name!r} in: "
+                f"declare a '_lazy_{name}' slot and use lazy_slot instead"
+            )
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> T:
+        if instance is None:
+            return self  # type: ignore[return-value]
+        # Only reached before the value exists: afterwards the instance __dict__ shadows it
+        return self._compute(instance)
+
+    def _load(self, instance: Any) -> Any:
+        return instance.__dict__.get(self.name, _MISSING)
+
+    def _store(self, instance: Any, value: Any) -> None:
+        instance.__dict__[self.name] = value
+
+    def _produce(self, instance: Any) -> Any:
+        return self.func(instance)
+
+    def _compute(self, instance: Any) -> T:
+        key = id(instance)
+        with self._guard:
+            lock = self._pending.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                # Another thread may have finished while this one waited for the lock
+                value = self._load(instance)
+                if value is _MISSING:
+                    value = self._produce(instance)
+                    self._store(instance, value)
+                return value
+        finally:
+            with self._guard:
+                if self._pending.get(key) is lock:
+                    del self._pending[key]
+
+    def invalidate(self, instance: Any) -> None:
+        """Drop the cached value of instance; the next access recomputes it."""
+        instance.__dict__.pop(self.name, None)
+
+
+class lazy_slot(lazy_attribute):  # pylint: disable=invalid-name
+    """
+    lazy_attribute for classes with __slots__, caching the value in a `_lazy_<name>` slot.
+
+    Slotted instances have no __dict__ to shadow the descriptor, so every read comes
+    through it anyway; that makes it free to be a data descriptor handling `del obj.name`.
+    """
+
+    _slot: MemberDescriptorType
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        for klass in owner.__mro__:
+            member = klass.__dict__.get(f"_lazy_{name}")
+            if isinstance(member, MemberDescriptorType):
+                self._slot = member
+                return
+        raise TypeError(f"{owner.__name__} has no '_lazy_{name}' slot to cache {name!r} in")
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> T:
+        if instance is None:
+            return self  # type: ignore[return-value]
+        try:
+            return self._slot.__get__(instance, owner)
+        except AttributeError:
+            return self._compute(instance)
+
+    def __delete__(self, instance: Any) -> None:
+        self._slot.__delete__(instance)
+
+    def _load(self, instance: Any) -> Any:
+        try:
+            return self._slot.__get__(instance, type(instance))
+        except AttributeError:
+            return _MISSING
+
+    def _store(self, instance: Any, value: Any) -> None:
+        self._slot.__set__(instance, value)
+
+    def invalidate(self, instance: Any) -> None:
+        """Drop the cached value of instance; the next access recomputes it."""
+        try:
+            self._slot.__delete__(instance)
+        except AttributeError:
+            pass
+
+
+class async_lazy_attribute(lazy_attribute):  # pylint: disable=invalid-name
+    """
+    lazy_attribute for coroutine producers: `await obj.name` runs the coroutine once.
+
+    The cached value is the task, so concurrent and later awaiters all await the same
+    result. A task that fails or is cancelled is dropped so the next access retries.
+    """
+
+    def _produce(self, instance: Any) -> "asyncio.Task":
+        # Raises RuntimeError outside a coroutine, before the coroutine object is created
+        task = asyncio.get_running_loop().create_task(self.func(instance))
+
+        def forget_failure(done: "asyncio.Future") -> None:
+            if done.cancelled() or done.exception() is not None:
+                if self._load(instance) is done:
+                    self.invalidate(instance)
+
+        task.add_done_callback(forget_failure)
+        return task
+
+
+class async_lazy_slot(lazy_slot, async_lazy_attribute):  # pylint: disable=invalid-name
+    """async_lazy_attribute caching its task in a `_lazy_<name>` slot."""
+
+
+def invalidate(instance: Any, *names: str) -> None:
+    """Drop the cached lazy values of instance (all of them if no names are given)."""
+    for klass in type(instance).__mro__:
+        for name, attr in vars(klass).items():
+            if isinstance(attr, lazy_attribute) and (not names or name in names):
+                attr.invalidate(instance)
+
+
+# ============================
+# Single-pass summary statistics
+# ============================
+
+# Items pulled from an iterable per batch: large enough that the C builtins do the work,
+# small enough that a batch is a negligible amount of memory
+BATCH_SIZE = 65_536
+
+
+@dataclass
+class SummaryStats:
+    """
+    Count, minimum, maximum and total of a stream of numbers, built in one pass.
+
+    Partial results from separate chunks combine with merge(), in any order.
+    """
+    count: int = 0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    total: float = 0
+
+    def add_batch(self, batch: List[float]) -> "SummaryStats":
+        """Fold an in-memory batch into the running statistics."""
+        if len(batch):
+            # The stream is read once; each in-memory batch then takes three C-level passes,
+            # which is several times faster than one Python loop tracking all three values
+            if np is not None and isinstance(batch, np.ndarray):
+                low, high = batch.min().item(), batch.max().item()
+                if batch.dtype.kind in "iu" and len(batch) * max(abs(low), abs(high)) >= 2 ** 63:
+                    # A 64-bit sum could wrap around: add exact Python ints instead
+                    total = sum(batch.tolist())
+                else:
+                    total = batch.sum().item()
+            else:
+                low, high, total = min(batch), max(batch), sum(batch)
+            self.merge(SummaryStats(len(batch), low, high, total))
+        return self
+
+    def update(self, data: Iterable[float]) -> "SummaryStats":
+        """Consume an iterable once, BATCH_SIZE items at a time."""
+        if np is not None and isinstance(data, np.ndarray):
+            return self.add_batch(data.ravel())
+        if isinstance(data, (list, tuple)):
+            # Already in memory: the C builtins beat copying it into batches
+            return self.add_batch(data)
+        iterator = iter(data)
+        while True:
+            batch = list(itertools.islice(iterator, BATCH_SIZE))
+            if not batch:
+                return self
+            self.add_batch(batch)
+
+    def merge(self, other: "SummaryStats") -> "SummaryStats":
+        """Combine another partial result into this one."""
+        if other.count:
+            self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+            self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+            self.count += other.count
+            self.total += other.total
+        return self
+
+    @classmethod
+    def of(cls, data: Iterable[float]) -> "SummaryStats":
+        """Statistics of one iterable or array."""
+        return cls().update(data)
+
+    @classmethod
+    def of_chunks(cls, chunks: Iterable[Iterable[float]]) -> "SummaryStats":
+        """Statistics of a stream of chunks (lists, arrays or iterables), one at a time."""
+        stats = cls()
+        for chunk in chunks:
+            stats.update(chunk)
+        return stats
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The report's summary fields."""
+        return {
+            "total": self.count,
+            "min": self.minimum,
+            "max": self.maximum,
+            "average": self.total / self.count if self.count else None,
+        }
+
+
+def chunked(data: Iterable[float], size: int = BATCH_SIZE) -> Iterator[List[float]]:
+    """Split any iterable into lists of at most size items."""
+    iterator = iter(data)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parallel_summary(chunks: Iterable[Iterable[float]], workers: Optional[int] = None) -> SummaryStats:
+    """
+    Summarise chunks in a process pool and merge the partial results. At most two
+    chunks per worker are in flight, so a chunk generator is never drained ahead of time.
+    """
+    stats = SummaryStats()
+    workers = workers or os.cpu_count() or 1
+    window = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(SummaryStats.of, chunk))
+            if len(pending) >= window:
+                stats.merge(pending.pop(0).result())
+        for future in pending:
+            stats.merge(future.result())
+    return stats
+
+
 # ============================
 # Lazy Evaluation Example Class
 # ============================
@@ -42,7 +344,8 @@ class ReportGenerator:
     Lazy evaluation is used so the report is not computed until needed.
     """
 
-    def __init__(self, data: list):
+    def __init__(self, data: Iterable[float]):
+        # Any iterable works: a list, a NumPy array, or a generator read only once
         self.data = data
 
     @lazy_property
@@ -51,12 +354,7 @@ class ReportGenerator:
         Simulates a time-consuming operation.
         """
         time.sleep(2)  # Simulate heavy computation
-        return {
-            "total": len(self.data),
-            "min": min(self.data),
-            "max": max(self.data),
-            "average": sum(self.data) / len(self.data)
-        }
+        return SummaryStats.of(self.data).as_dict()
 
     def show_summary(self):
         """Displays the report summary."""
@@ -65,6 +363,282 @@ class ReportGenerator:
             print(f" - {key.capitalize()}: {value}")
 
 
+class Dataset:
+    """Example using the production descriptor, including a slotted and an async value."""
+    __slots__ = ("values", "_lazy_total", "__dict__")
+
+    def __init__(self, values: list):
+        self.values = values
+
+    @lazy_slot
+    def total(self) -> int:
+        """Stored in the _lazy_total slot."""
+        print("🔄 Computing 'total'...")
+        return sum(self.values)
+
+    @lazy_attribute
+    def maximum(self) -> int:
+        """Stored in the instance __dict__; later reads bypass the descriptor."""
+        print("🔄 Computing 'maximum'...")
+        return max(self.values)
+
+    @async_lazy_attribute
+    async def remote_count(self) -> int:
+        """Pretend to fetch the count from a remote service."""
+        print("🔄 Fetching 'remote_count'...")
+        await asyncio.sleep(0.01)
+        return len(self.values)
+
+
+def benchmark_summary(size: int = 1_000_000, repeat: int = 3) -> Dict[str, float]:
+    """Milliseconds to summarise `size` numbers with each strategy (best of `repeat`)."""
+    numbers = list(range(1, size + 1))
+
+    def four_passes():
+        return {"total": len(numbers), "min": min(numbers), "max": max(numbers),
+                "average": sum(numbers) / len(numbers)}
+
+    strategies = {
+        "four passes over a list": four_passes,
+        "SummaryStats over a list": lambda: SummaryStats.of(numbers),
+        "SummaryStats over a generator": lambda: SummaryStats.of(x for x in range(1, size + 1)),
+        "SummaryStats over chunks": lambda: SummaryStats.of_chunks(chunked(range(1, size + 1))),
+        "process pool over chunks": lambda: parallel_summary(chunked(range(1, size + 1), size // 8)),
+    }
+    if np is not None:
+        array = np.arange(1, size + 1)
+        strategies["SummaryStats over a NumPy array"] = lambda: SummaryStats.of(array)
+    return {
+        label: min(timeit.repeat(run, number=1, repeat=repeat)) * 1000
+        for label, run in strategies.items()
+    }
+
+
+def benchmark(number: int = 1_000_000) -> Dict[str, float]:
+    """Nanoseconds per cached read, and how many computations 16 racing threads trigger."""
+
+    class Plain:
+        def __init__(self):
+            self.value = 1
+
+    class Legacy:
+        @lazy_property
+        def value(self):
+            return 1
+
+    class Cached:
+        @functools.cached_property
+        def value(self):
+            return 1
+
+    class Lazy:
+        @lazy_attribute
+        def value(self):
+            return 1
+
+    class SlottedLazy:
+        __slots__ = ("_lazy_value",)
+
+        @lazy_slot
+        def value(self):
+            return 1
+
+    results = {}
+    for label, cls in (
+        ("plain attribute", Plain),
+        ("lazy_property", Legacy),
+        ("functools.cached_property", Cached),
+        ("lazy_attribute", Lazy),
+        ("lazy_slot", SlottedLazy),
+    ):
+        obj = cls()
+        obj.value  # pylint: disable=pointless-statement
+        seconds = timeit.timeit("obj.value", globals={"obj": obj}, number=number)
+        results[f"read: {label}"] = seconds / number * 1e9
+
+    for label, decorator in (("functools.cached_property", functools.cached_property), ("lazy_attribute", lazy_attribute)):
+        calls = []
+
+        def slow(self, calls=calls):
+            calls.append(1)
+            time.sleep(0.01)
+            return 1
+
+        obj = type("Racy", (), {"value": decorator(slow)})()
+        barrier = threading.Barrier(16)
+
+        def reader(obj=obj, barrier=barrier):
+            barrier.wait()
+            obj.value  # pylint: disable=pointless-statement
+
+        threads = [threading.Thread(target=reader) for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        results[f"computations with 16 racing threads: {label}"] = len(calls)
+    return results
+
+
+class TestLazyAttribute(unittest.TestCase):
+    """Test cases for lazy_attribute, lazy_slot and their async variants."""
+
+    def test_computed_once_under_concurrent_access(self):
+        """Sixteen threads reading a new value at once trigger a single computation."""
+        for decorator, slots in ((lazy_attribute, ("__dict__",)), (lazy_slot, ("_lazy_value",))):
+            calls = []
+
+            def slow(self, calls=calls):
+                calls.append(1)
+                time.sleep(0.01)
+                return object()
+
+            obj = type("Racy", (), {"__slots__": slots, "value": decorator(slow)})()
+            barrier = threading.Barrier(16)
+            seen = []
+
+            def reader(obj=obj, barrier=barrier, seen=seen):
+                barrier.wait()
+                seen.append(obj.value)
+
+            threads = [threading.Thread(target=reader) for _ in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(calls), 1)
+            self.assertTrue(all(value is seen[0] for value in seen))
+
+    def test_slot_storage_and_deletion(self):
+        """lazy_slot caches in its slot; del and invalidate() force a recomputation."""
+        calls = []
+
+        class Slotted:
+            __slots__ = ("_lazy_value",)
+
+            @lazy_slot
+            def value(self):
+                calls.append(1)
+                return len(calls)
+
+        obj = Slotted()
+        self.assertEqual((obj.value, obj.value), (1, 1))
+        self.assertEqual(Slotted._lazy_value.__get__(obj), 1)  # pylint: disable=protected-access,no-member
+        del obj.value
+        self.assertEqual(obj.value, 2)
+        invalidate(obj, "value")
+        self.assertEqual(obj.value, 3)
+        del obj.value
+        with self.assertRaises(AttributeError):
+            del obj.value
+
+    def test_dict_storage_and_deletion(self):
+        """lazy_attribute caches in the instance __dict__, where del and invalidate() clear it."""
+        dataset = Dataset([1, 2])
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(dataset.maximum, 2)
+            self.assertIn("maximum", vars(dataset))
+            dataset.values.append(5)
+            del dataset.maximum
+            self.assertEqual(dataset.maximum, 5)
+            dataset.values.append(7)
+            invalidate(dataset)
+            self.assertEqual(dataset.maximum, 7)
+
+    def test_missing_storage_is_a_type_error(self):
+        """A slotted class without the _lazy_<name> slot (or a __dict__) is rejected at definition."""
+        def define(decorator):
+            class Broken:  # pylint: disable=unused-variable
+                __slots__ = ()
+
+                @decorator
+                def value(self):
+                    return 1
+
+        for decorator in (lazy_attribute, lazy_slot):
+            # Python < 3.12 wraps errors raised by __set_name__ in a RuntimeError
+            with self.assertRaises((TypeError, RuntimeError)) as caught:
+                define(decorator)
+            error = caught.exception
+            error = error if isinstance(error, TypeError) else error.__cause__
+            self.assertIsInstance(error, TypeError)
+            self.assertIn("'_lazy_value'", str(error))
+
+    def test_async_failure_is_retried(self):
+        """Concurrent awaiters share one task; a failed task is dropped and the next read retries."""
+        attempts = []
+
+        class Remote:
+            __slots__ = ("_lazy_count",)
+
+            @async_lazy_slot
+            async def count(self):
+                attempts.append(1)
+                await asyncio.sleep(0)
+                if len(attempts) == 1:
+                    raise ConnectionError("flaky")
+                return 42
+
+        remote = Remote()
+
+        async def scenario():
+            results = await asyncio.gather(remote.count, remote.count, return_exceptions=True)
+            self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+            return await asyncio.gather(remote.count, remote.count)
+
+        self.assertEqual(asyncio.run(scenario()), [42, 42])
+        self.assertEqual(len(attempts), 2)
+        # The task needs a running loop, so a first read outside a coroutine fails cleanly
+        with self.assertRaises(RuntimeError):
+            Remote().count  # pylint: disable=expression-not-assigned
+        self.assertEqual(len(attempts), 2)
+
+
+class TestSummaryStats(unittest.TestCase):
+    """Test cases for the single-pass summary and its parallel merge."""
+
+    def test_empty_input(self):
+        """No data gives a zero count and no min, max or average, whatever the input type."""
+        for data in ([], (), iter([]), (n for n in ())):
+            stats = SummaryStats.of(data)
+            self.assertEqual(stats, SummaryStats())
+            self.assertEqual(stats.as_dict(), {"total": 0, "min": None, "max": None, "average": None})
+        self.assertEqual(SummaryStats.of([2, 1]).merge(SummaryStats()), SummaryStats(2, 1, 2, 3))
+
+    def test_streaming_matches_builtins(self):
+        """Generators spanning several batches, chunks and lists all give the same result."""
+        numbers = [(n * 7919) % 10_007 - 5000 for n in range(2 * BATCH_SIZE + 5)]
+        expected = SummaryStats(len(numbers), min(numbers), max(numbers), sum(numbers))
+        self.assertEqual(SummaryStats.of(numbers), expected)
+        self.assertEqual(SummaryStats.of(n for n in numbers), expected)
+        self.assertEqual(SummaryStats.of_chunks(chunked(iter(numbers), 1000)), expected)
+
+    def test_merge_in_any_order(self):
+        """Partial results merge to the whole, in any order."""
+        parts = [[5, 3], [], [9, -1, 4], [0]]
+        merged = SummaryStats()
+        for part in reversed(parts):
+            merged.merge(SummaryStats.of(part))
+        self.assertEqual(merged, SummaryStats.of([n for part in parts for n in part]))
+
+    @unittest.skipIf(np is None, "requires NumPy")
+    def test_numpy_fast_path_and_overflow(self):
+        """Arrays of any shape are reduced exactly, including integer sums beyond 64 bits."""
+        grid = np.arange(12, dtype=np.float64).reshape(3, 4)
+        self.assertEqual(SummaryStats.of(grid), SummaryStats(12, 0.0, 11.0, 66.0))
+        big = np.full(4, 2 ** 62, dtype=np.int64)
+        self.assertEqual(SummaryStats.of(big).total, 4 * 2 ** 62)
+        self.assertEqual(SummaryStats.of(np.array([2 ** 64 - 1, 1], dtype=np.uint64)).total, 2 ** 64)
+        self.assertEqual(SummaryStats.of(np.array([-(2 ** 63), -1], dtype=np.int64)).total, -(2 ** 63) - 1)
+        self.assertIsInstance(SummaryStats.of(np.arange(5, dtype=np.int8)).total, int)
+
+    def test_parallel_summary(self):
+        """A process pool over chunks matches the serial summary."""
+        numbers = range(10_000)
+        self.assertEqual(parallel_summary(chunked(numbers, 1000), workers=2), SummaryStats.of(numbers))
+        self.assertEqual(parallel_summary(iter([]), workers=1), SummaryStats())
+
+
 # ============================
 # Demonstration
 # ============================
@@ -72,7 +646,7 @@ class ReportGenerator:
 def main():
     print("🐢 Lazy Evaluation Pattern Demo 🐢\n")
 
-    numbers = list(range(1, 1_000_001))  # Large dataset
+    numbers = (n for n in range(1, 1_000_001))  # Large dataset, streamed rather than held in memory
     report = ReportGenerator(numbers)
 
     print("Step 1: Object created, report not yet generated.")
@@ -84,9 +658,33 @@ def main():
     print("\nStep 3: Accessing the summary again (should be cached)...")
     report.show_summary()
 
+    print("\nStep 4: The production descriptor (slots, __dict__, async, invalidation)...")
+    dataset = Dataset([3, 1, 4, 1, 5])
+    print(f"Total: {dataset.total}, again: {dataset.total}")
+    print(f"Maximum: {dataset.maximum}, cached in __dict__: {'maximum' in dataset.__dict__}")
+    dataset.values.append(9)
+    invalidate(dataset, "maximum")
+    print(f"Maximum after invalidation: {dataset.maximum}")
+
+    async def read_remote():
+        return await asyncio.gather(dataset.remote_count, dataset.remote_count)
+
+    print(f"Remote count (two concurrent awaits, one fetch): {asyncio.run(read_remote())}")
+
 
 if __name__ == "__main__":
     main()
+    if "--benchmark" in sys.argv:
+        print("\nMicrobenchmarks:")
+        for name, figure in benchmark().items():
+            shown = f"{figure:8.1f} ns" if name.startswith("read") else f"{figure:8.0f}"
+            print(f"  {name:<58} {shown}")
+        print("\nSummary of one million numbers (ms):")
+        for name, millis in benchmark_summary().items():
+            print(f"  {name:<34} {millis:8.1f}")
+
+    # Unit Tests (argv without --benchmark, which unittest would reject)
+    unittest.main(argv=sys.argv[:1])
 
 
 # 🐢 Lazy Evaluation Pattern Sample Output 🐢
@@ -3,10 +3,39 @@ Creational Pattern: Singleton
 
 Ensures that only one instance of a class exists and provides a global point of access to it.
 This implementation uses a metaclass to enforce the singleton behavior.
+
+`SingletonMeta` is the minimal teaching version. Its check-then-set on `_instances` is not
+atomic, so two threads can both see "no instance yet" and each build one, and a child
+created by `os.fork()` silently inherits the parent's instances (including any locks or
+sockets they hold).
+
+`ThreadSafeSingletonMeta` is the production variant:
+
+* Double-checked locking with one lock per class, so creating one singleton never blocks
+  lookups of another.
+* A lock-free fast path: once the instance exists, a call is a single attribute read.
+* A fork hook (`os.register_at_fork`) that gives every forked child fresh locks and drops
+  the instances, so each process builds its own.
+* Scopes chosen per class: `scope="process"` (the default, one instance per process) or
+  `scope="thread"` (one instance per thread, no locking at all).
+
+Run with `--benchmark` to compare lookup cost under 32-thread contention.
 """
 
 from __future__ import annotations
-from typing import Any
+
+import os
+import sys
+import threading
+import time
+import unittest
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+PROCESS = "process"
+THREAD = "thread"
+SCOPES = (PROCESS, THREAD)
+
 
 class SingletonMeta(type):
     """A metaclass that creates a Singleton class."""
@@ -18,6 +47,71 @@ class SingletonMeta(type):
             cls._instances[cls] = instance
         return cls._instances[cls]
 
+
+class ThreadSafeSingletonMeta(type):
+    """
+    A thread-safe, fork-aware singleton metaclass.
+
+    Each class gets its own lock, instance slot and thread-local store. Pick the scope
+    with a class keyword: `class Cache(metaclass=ThreadSafeSingletonMeta, scope="thread")`.
+    """
+
+    # Every class built by this metaclass, so the fork hook can reset them all
+    _classes: "weakref.WeakSet[ThreadSafeSingletonMeta]" = weakref.WeakSet()
+
+    def __new__(mcs, name, bases, namespace, scope: Optional[str] = None, **kwargs):
+        if scope is not None and scope not in SCOPES:
+            raise ValueError(f"scope must be one of {SCOPES}, got {scope!r}")
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        # Without the keyword, a subclass keeps its parent's scope
+        cls._scope = scope if scope is not None else getattr(cls, "_scope", PROCESS)
+        cls._lock = threading.Lock()
+        cls._instance = None
+        cls._local = threading.local()
+        mcs._classes.add(cls)
+        return cls
+
+    def __init__(cls, name, bases, namespace, scope: Optional[str] = None, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+
+    def __call__(cls, *args, **kwargs):
+        if cls._scope == THREAD:
+            instance = getattr(cls._local, "instance", None)
+            if instance is None:
+                instance = cls._local.instance = super().__call__(*args, **kwargs)
+            return instance
+
+        # Fast path: no lock once the instance exists. Reading one attribute is atomic,
+        # and the instance is published only after __init__ has finished.
+        instance = cls._instance
+        if instance is not None:
+            return instance
+        with cls._lock:
+            # Second check: another thread may have won the race while we waited
+            if cls._instance is None:
+                cls._instance = super().__call__(*args, **kwargs)
+            return cls._instance
+
+    def reset_instance(cls) -> None:
+        """Drop this class's instance(s), e.g. between tests."""
+        with cls._lock:
+            cls._instance = None
+            cls._local = threading.local()
+
+    @classmethod
+    def _after_fork_in_child(mcs) -> None:
+        # Only the forking thread survives in the child; a lock held by any other
+        # thread would never be released, so replace the locks rather than reuse them.
+        for cls in list(mcs._classes):
+            cls._lock = threading.Lock()
+            cls._instance = None
+            cls._local = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=ThreadSafeSingletonMeta._after_fork_in_child)
+
+
 class Singleton(metaclass=SingletonMeta):
     """
     Example singleton class.
@@ -36,6 +130,149 @@ class Singleton(metaclass=SingletonMeta):
         """Returns the current value."""
         return self.value
 
+
+class Configuration(metaclass=ThreadSafeSingletonMeta):
+    """Example process-wide singleton built with the thread-safe metaclass."""
+
+    def __init__(self) -> None:
+        self.settings: Dict[str, Any] = {"debug": False}
+
+
+class RequestContext(metaclass=ThreadSafeSingletonMeta, scope=THREAD):
+    """Example per-thread singleton: each thread sees its own instance."""
+
+    def __init__(self) -> None:
+        self.thread_name = threading.current_thread().name
+
+
+def _count_instances(meta: type, threads: int = 32, init_delay: float = 0.001) -> int:
+    """Create a class whose __init__ is slow, call it from many threads at once, count instances."""
+    created = []
+
+    def __init__(self) -> None:
+        time.sleep(init_delay)  # widen the race window between check and set
+        created.append(self)
+
+    cls = meta("Racy", (), {"__init__": __init__})
+    barrier = threading.Barrier(threads)
+
+    def worker() -> None:
+        barrier.wait()
+        cls()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return len(created)
+
+
+def benchmark_contention(threads: int = 32, lookups: int = 20_000) -> Dict[str, float]:
+    """
+    Nanoseconds per singleton lookup with `threads` threads hammering an existing instance.
+
+    Compares the unsafe metaclass, the double-checked lock-free fast path, and a lock taken
+    on every call, which is the naive way to make the original thread-safe.
+    """
+
+    class AlwaysLockedMeta(type):
+        """Thread-safe but takes the lock on every call."""
+        _instances: Dict[type, Any] = {}
+        _lock = threading.Lock()
+
+        def __call__(cls, *args, **kwargs):
+            with cls._lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super().__call__(*args, **kwargs)
+                return cls._instances[cls]
+
+    results = {}
+    for label, meta in (
+        ("SingletonMeta (unsafe)", SingletonMeta),
+        ("lock on every call", AlwaysLockedMeta),
+        ("ThreadSafeSingletonMeta", ThreadSafeSingletonMeta),
+    ):
+        cls: Callable[[], Any] = meta(f"Bench{len(results)}", (), {})
+        cls()  # create up front: the benchmark measures lookups
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(target=cls) -> None:
+            barrier.wait()
+            for _ in range(lookups):
+                target()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for t in workers:
+            t.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+        results[label] = elapsed / (threads * lookups) * 1e9
+    return results
+
+
+class TestThreadSafeSingleton(unittest.TestCase):
+    """Test cases for ThreadSafeSingletonMeta."""
+
+    def test_single_instance_under_contention(self):
+        """32 threads racing through a slow __init__ create exactly one instance."""
+        self.assertEqual(_count_instances(ThreadSafeSingletonMeta), 1)
+
+    def test_subclasses_have_their_own_instance(self):
+        """A subclass is a separate singleton, not the parent's instance."""
+        class Child(Configuration):
+            pass
+        self.assertIs(Child(), Child())
+        self.assertIsNot(Child(), Configuration())
+
+    def test_thread_scope(self):
+        """Each thread gets its own RequestContext; repeated calls in a thread agree."""
+        seen = {}
+
+        def worker(name: str) -> None:
+            seen[name] = (RequestContext(), RequestContext())
+
+        workers = [threading.Thread(target=worker, args=(f"t{i}",), name=f"t{i}") for i in range(4)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        self.assertTrue(all(a is b for a, b in seen.values()))
+        self.assertEqual(len({id(a) for a, _ in seen.values()}), 4)
+
+    def test_subclass_inherits_scope(self):
+        """A subclass without a scope keyword keeps its parent's scope."""
+        class Child(RequestContext):
+            pass
+        self.assertEqual(Child._scope, THREAD)  # pylint: disable=protected-access
+
+    def test_invalid_scope(self):
+        """Unknown scopes are rejected when the class is defined."""
+        with self.assertRaises(ValueError):
+            ThreadSafeSingletonMeta("Bad", (), {}, scope="galaxy")
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_fork_child_gets_fresh_instance(self):
+        """A forked child builds its own instance instead of reusing the parent's."""
+        parent = Configuration()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # child
+            os.close(read_fd)
+            fresh = Configuration() is not parent and Configuration() is Configuration()
+            os.write(write_fd, b"1" if fresh else b"0")
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as pipe:
+            result = pipe.read()
+        os.waitpid(pid, 0)
+        self.assertEqual(result, b"1")
+        self.assertIs(Configuration(), parent)
+
+
 # Example usage
 if __name__ == "__main__":
     a = Singleton()
@@ -47,3 +284,16 @@ if __name__ == "__main__":
     assert a is b
     print(f"Singleton value from 'a': {a.get_value()}")  # Output: 2
     print(f"Singleton value from 'b': {b.get_value()}")  # Output: 2
+
+    # The minimal metaclass can create several instances when threads race
+    print(f"Instances created by 32 racing threads: "
+          f"SingletonMeta={_count_instances(SingletonMeta)}, "
+          f"ThreadSafeSingletonMeta={_count_instances(ThreadSafeSingletonMeta)}")
+
+    if "--benchmark" in sys.argv:
+        print("\nLookup cost with 32 threads contending (ns per call):")
+        for name, ns in benchmark_contention().items():
+            print(f"  {name:<26} {ns:8.1f}")
+
+    # Unit Tests (argv without --benchmark, which unittest would reject)
+    unittest.main(argv=sys.argv[:1])
@@ -3,16 +3,58 @@ Structural Pattern: Flyweight
 
 Minimizes memory usage by sharing as much data as possible with similar objects.
 Used when many objects share common state that can be externalized.
+
+`FlyweightFactory` is the teaching version: it keeps every flyweight forever and prints
+on each lookup. `BoundedFlyweightFactory` is meant for real workloads with many distinct
+intrinsic states:
+
+* Retention policy `"weak"` keeps a flyweight only while something still uses it;
+  `"lru"` keeps at most `maxsize` of them, evicting the least recently used.
+* Get-or-create runs under a lock, so concurrent threads never build duplicates.
+* Hit, miss and eviction counters show whether the cache is sized well.
+
+`Flyweight` uses `__slots__`, which drops the per-instance `__dict__`. Run with
+`--benchmark` to measure the memory of one million objects with tracemalloc.
+
+Even with slots, one client object per item costs far more than the data it holds.
+`ExtrinsicColumns` stores the extrinsic state column-wise instead: each field is an
+`array` (viewed as a NumPy array when NumPy is installed), and a small integer
+column refers to the shared flyweight. Operations run over whole columns in batches
+instead of once per object.
 """
 
-from typing import Dict
+import gc
+import operator
+import sys
+import threading
+import time
+import tracemalloc
+import unittest
+import weakref
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the columns fall back to plain arrays
+    np = None
 
 class Flyweight:
     """The shared Flyweight object containing intrinsic (shared) state."""
 
+    # No per-instance __dict__; __weakref__ lets the weak policy reference instances
+    __slots__ = ("_shared_state", "__weakref__")
+
     def __init__(self, shared_state: str) -> None:
         self._shared_state = shared_state
 
+    @property
+    def shared_state(self) -> str:
+        """The intrinsic state this flyweight shares."""
+        return self._shared_state
+
     def operation(self, unique_state: str) -> None:
         print(f"Flyweight: Shared [{self._shared_state}] | Unique [{unique_state}]")
 
@@ -36,6 +78,412 @@ class FlyweightFactory:
         for key in self._flyweights:
             print(f" - {key}")
 
+
+@dataclass
+class FactoryStats:
+    """Cache counters of a BoundedFlyweightFactory."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class BoundedFlyweightFactory:
+    """
+    Thread-safe flyweight factory with bounded memory.
+
+    policy="weak": entries disappear once no client holds the flyweight.
+    policy="lru":  at most maxsize entries; the least recently used is evicted.
+    """
+
+    POLICIES = ("weak", "lru")
+
+    def __init__(self, policy: str = "weak", maxsize: int = 1024) -> None:
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}, got {policy!r}")
+        if policy == "lru" and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.policy = policy
+        self.maxsize = maxsize
+        # Reentrant: a weakref callback may fire in the thread that holds the lock
+        self._lock = threading.RLock()
+        self._lru: "OrderedDict[str, Flyweight]" = OrderedDict()
+        self._weak: Dict[str, weakref.ref] = {}
+        self._stats = FactoryStats()
+
+    def get_flyweight(self, shared_state: str) -> Flyweight:
+        """Return the flyweight for shared_state, creating it at most once at a time."""
+        with self._lock:
+            if self.policy == "lru":
+                flyweight = self._lru.get(shared_state)
+                if flyweight is not None:
+                    self._lru.move_to_end(shared_state)
+                    self._stats.hits += 1
+                    return flyweight
+                flyweight = self._lru[shared_state] = Flyweight(shared_state)
+                self._stats.misses += 1
+                if len(self._lru) > self.maxsize:
+                    self._lru.popitem(last=False)
+                    self._stats.evictions += 1
+                return flyweight
+
+            ref = self._weak.get(shared_state)
+            flyweight = ref() if ref is not None else None
+            if flyweight is not None:
+                self._stats.hits += 1
+                return flyweight
+            flyweight = Flyweight(shared_state)
+            self._weak[shared_state] = weakref.ref(flyweight, self._evicted(shared_state))
+            self._stats.misses += 1
+            return flyweight
+
+    def _evicted(self, key: str):
+        def callback(ref: weakref.ref) -> None:
+            with self._lock:
+                # The key may already point at a newer flyweight
+                if self._weak.get(key) is ref:
+                    del self._weak[key]
+                    self._stats.evictions += 1
+        return callback
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._lru) if self.policy == "lru" else len(self._weak)
+
+    def stats(self) -> FactoryStats:
+        """A snapshot of the counters and current cache size."""
+        with self._lock:
+            return FactoryStats(self._stats.hits, self._stats.misses, self._stats.evictions, len(self))
+
+
+class UnsharedCar:
+    """Baseline without flyweights: every object carries its own copy of the shared data."""
+
+    def __init__(self, model: str, plate: str) -> None:
+        self.model = model
+        self.plate = plate
+
+
+class Car:
+    """A client object: a reference to a shared flyweight plus its own extrinsic state."""
+    __slots__ = ("flyweight", "plate")
+
+    def __init__(self, flyweight: Flyweight, plate: str) -> None:
+        self.flyweight = flyweight
+        self.plate = plate
+
+
+class ExtrinsicColumns:
+    """
+    Column store of extrinsic state for many items sharing a few flyweights.
+
+    Declare the fields with array typecodes, e.g.
+    `ExtrinsicColumns(factory, plate="L", km="d")`. Row i's flyweight is
+    `flyweights[kinds[i]]`; each flyweight is looked up once, when first added.
+    """
+
+    def __init__(self, factory: Optional[BoundedFlyweightFactory] = None, **fields: str) -> None:
+        self._factory = factory or BoundedFlyweightFactory("lru", maxsize=2**16)
+        self.flyweights: List[Flyweight] = []
+        self._kind_of: Dict[str, int] = {}
+        self.kinds = array("I")
+        self._columns: Dict[str, array] = {name: array(code) for name, code in fields.items()}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def _kind(self, shared_state: str) -> int:
+        kind = self._kind_of.get(shared_state)
+        if kind is None:
+            # The store keeps its flyweights alive, so the factory never has to rebuild them
+            kind = self._kind_of[shared_state] = len(self.flyweights)
+            self.flyweights.append(self._factory.get_flyweight(shared_state))
+        return kind
+
+    def add(self, shared_state: str, **values) -> int:
+        """Append one item; returns its row number."""
+        staged = self._stage(1, {name: [value] for name, value in values.items()})
+        self._append_rows(array("I", [self._kind(shared_state)]), staged)
+        return len(self.kinds) - 1
+
+    def extend(self, shared_states: Iterable[str], **values) -> None:
+        """Append many items at once from parallel sequences of equal length."""
+        states = list(shared_states)
+        staged = self._stage(len(states), values)
+        self._append_rows(array("I", [self._kind(state) for state in states]), staged)
+
+    def _stage(self, rows: int, values: Dict[str, Iterable]) -> Dict[str, array]:
+        """Check and convert every column's new values before anything is appended."""
+        missing, extra = set(self._columns) - set(values), set(values) - set(self._columns)
+        if missing or extra:
+            raise KeyError(f"Columns must be exactly {sorted(self._columns)}; "
+                           f"missing {sorted(missing)}, unknown {sorted(extra)}")
+        staged = {}
+        for name, column in self._columns.items():
+            # Raises TypeError/OverflowError for values that don't fit the typecode
+            data = array(column.typecode, values[name])
+            if len(data) != rows:
+                raise ValueError(f"Column '{name}' has {len(data)} values for {rows} rows")
+            staged[name] = data
+        return staged
+
+    def _append_rows(self, kinds: array, staged: Dict[str, array]) -> None:
+        """Append to every column or to none of them."""
+        done = []
+        try:
+            for column, data in [(self.kinds, kinds), *((self._columns[n], d) for n, d in staged.items())]:
+                column.extend(data)
+                done.append((column, len(data)))
+        except BufferError:
+            # An array can't resize while a view of it (column(..., view=True)) is alive
+            for column, count in done:
+                del column[len(column) - count:]
+            raise BufferError("Release the views from column(view=True) before adding rows") from None
+
+    def column(self, name: str, view: bool = False):
+        """
+        A copy of a field's column ("kind" for the kinds): a NumPy array if NumPy is
+        installed, else an array. With view=True it is a zero-copy view instead, and
+        rows can't be added while the view is alive.
+        """
+        column = self.kinds if name == "kind" else self._columns[name]
+        if np is not None:
+            data = np.frombuffer(column, dtype=column.typecode)
+            return data if view else data.copy()
+        return memoryview(column) if view else array(column.typecode, column)
+
+    def row(self, index: int) -> Dict[str, object]:
+        """One item as a dict, with its flyweight."""
+        item = {name: column[index] for name, column in self._columns.items()}
+        item["flyweight"] = self.flyweights[self.kinds[index]]
+        return item
+
+    def per_flyweight(self, func: Callable[[Flyweight], float], typecode: str = "d"):
+        """
+        Broadcast func(flyweight) to every row. func runs once per distinct flyweight,
+        then a gather through the kind column expands it to one value per row.
+        """
+        table = [func(flyweight) for flyweight in self.flyweights]
+        if np is not None:
+            return np.asarray(table, dtype=typecode)[self.column("kind", view=True)]
+        return array(typecode, [table[kind] for kind in self.kinds])
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns (excluding the shared flyweights)."""
+        return sum(c.itemsize * len(c) for c in [self.kinds, *self._columns.values()])
+
+
+def _model_spec(kind: int) -> str:
+    # Stand-in for sizeable intrinsic state: a model name plus its specification text
+    return f"model-{kind:04d}:" + "spec " * 20
+
+
+def benchmark_memory(objects: int = 1_000_000, kinds: int = 1_000) -> Dict[str, Dict[str, float]]:
+    """
+    Traced memory (MiB) and build time (s) for `objects` cars over `kinds` car models,
+    with and without shared flyweights.
+    """
+    def measure(build) -> Dict[str, float]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        cars = build()
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del cars
+        return {"MiB": current / 2**20, "peak MiB": peak / 2**20, "seconds": elapsed}
+
+    def unshared():
+        # Each object builds (and so owns) its own spec string
+        return [UnsharedCar(_model_spec(i % kinds), f"P{i:07d}") for i in range(objects)]
+
+    def shared(policy: str):
+        factory = BoundedFlyweightFactory(policy, maxsize=kinds)
+        specs = [_model_spec(k) for k in range(kinds)]
+        return [Car(factory.get_flyweight(specs[i % kinds]), f"P{i:07d}") for i in range(objects)]
+
+    return {
+        "no sharing": measure(unshared),
+        "flyweights (weak)": measure(lambda: shared("weak")),
+        "flyweights (lru)": measure(lambda: shared("lru")),
+    }
+
+TOLL_PER_KM = 0.12
+
+
+def _toll_rate(flyweight: Flyweight) -> float:
+    # Intrinsic data of the model decides its rate; computed once per flyweight
+    return TOLL_PER_KM * (1 + int(flyweight.shared_state[6:10]) % 5 / 10)
+
+
+def compute_tolls(store: ExtrinsicColumns):
+    """Toll of every car in one batch: its model's rate times its km column."""
+    rate = store.per_flyweight(_toll_rate)
+    km = store.column("km", view=True)
+    if np is not None:
+        return rate * km
+    return array("d", map(operator.mul, rate, km))
+
+
+def benchmark_columns(items: int = 1_000_000, kinds: int = 1_000) -> Dict[str, Dict[str, float]]:
+    """
+    Memory (MiB, traced) and throughput (items per second) of computing a per-item toll
+    (rate of the car's model times its distance), one object per item versus columns.
+    """
+    specs = [_model_spec(k) for k in range(kinds)]
+    results = {}
+
+    tracemalloc.start()
+    factory = BoundedFlyweightFactory("lru", maxsize=kinds)
+    cars = []
+    for i in range(items):
+        car = Car(factory.get_flyweight(specs[i % kinds]), f"P{i:07d}")
+        cars.append((car, float(i % 500)))  # (object, km): extrinsic state as objects
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rates: Dict[int, float] = {}  # id(flyweight) -> toll rate, computed once per model
+
+    def toll(car: Car, km: float) -> float:
+        key = id(car.flyweight)
+        if key not in rates:
+            rates[key] = _toll_rate(car.flyweight)
+        return rates[key] * km
+
+    start = time.perf_counter()
+    tolls = [toll(car, km) for car, km in cars]
+    elapsed = time.perf_counter() - start
+    results["per-object"] = {"MiB": memory / 2**20, "items/s": items / elapsed}
+    del cars, tolls
+
+    tracemalloc.start()
+    store = ExtrinsicColumns(BoundedFlyweightFactory("lru", maxsize=kinds), plate="L", km="d")
+    store.extend([specs[i % kinds] for i in range(items)], plate=range(items), km=(float(i % 500) for i in range(items)))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    tolls = compute_tolls(store)
+    elapsed = time.perf_counter() - start
+    label = "columns (NumPy)" if np is not None else "columns (array)"
+    results[label] = {"MiB": memory / 2**20, "items/s": items / elapsed}
+    return results
+
+class TestBoundedFlyweightFactory(unittest.TestCase):
+    """Test cases for BoundedFlyweightFactory."""
+
+    def test_lru_evicts_least_recently_used_at_the_bound(self):
+        """The LRU policy never holds more than maxsize and evicts the oldest lookup."""
+        factory = BoundedFlyweightFactory("lru", maxsize=2)
+        sedan = factory.get_flyweight("Sedan")
+        factory.get_flyweight("SUV")
+        self.assertIs(factory.get_flyweight("Sedan"), sedan)  # SUV is now the oldest
+        factory.get_flyweight("Coupe")
+        self.assertEqual(len(factory), 2)
+        self.assertIs(factory.get_flyweight("Sedan"), sedan)
+        self.assertEqual(factory.stats(), FactoryStats(hits=2, misses=3, evictions=1, size=2))
+        factory.get_flyweight("SUV")  # rebuilt, evicting Coupe
+        self.assertEqual(factory.stats(), FactoryStats(hits=2, misses=4, evictions=2, size=2))
+
+    def test_weak_entries_are_released_after_gc(self):
+        """The weak policy keeps a flyweight only while a client holds it."""
+        factory = BoundedFlyweightFactory("weak")
+        truck = factory.get_flyweight("Truck")
+        self.assertIs(factory.get_flyweight("Truck"), truck)
+        self.assertEqual(factory.stats(), FactoryStats(hits=1, misses=1, evictions=0, size=1))
+        del truck
+        gc.collect()
+        self.assertEqual(factory.stats(), FactoryStats(hits=1, misses=1, evictions=1, size=0))
+        factory.get_flyweight("Truck")
+        self.assertEqual(factory.stats().misses, 2)
+
+    def test_hit_rate_and_bad_arguments(self):
+        """hit_rate is hits over lookups; unknown policies and empty LRUs are rejected."""
+        self.assertEqual(FactoryStats().hit_rate, 0.0)
+        self.assertEqual(FactoryStats(hits=3, misses=1).hit_rate, 0.75)
+        with self.assertRaises(ValueError):
+            BoundedFlyweightFactory("fifo")
+        with self.assertRaises(ValueError):
+            BoundedFlyweightFactory("lru", maxsize=0)
+
+    def test_concurrent_gets_share_one_instance(self):
+        """Threads racing for a new key all get the same flyweight, built once."""
+        for policy in BoundedFlyweightFactory.POLICIES:
+            factory = BoundedFlyweightFactory(policy)
+            barrier = threading.Barrier(16)
+            seen: List[Flyweight] = []
+
+            def lookup(factory=factory, barrier=barrier, seen=seen):
+                barrier.wait()
+                for _ in range(100):
+                    seen.append(factory.get_flyweight("Shared"))
+
+            threads = [threading.Thread(target=lookup) for _ in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertTrue(all(flyweight is seen[0] for flyweight in seen))
+            self.assertEqual((factory.stats().misses, factory.stats().hits), (1, 1599))
+
+class TestExtrinsicColumns(unittest.TestCase):
+    """Test cases for ExtrinsicColumns."""
+
+    def setUp(self):
+        self.store = ExtrinsicColumns(plate="L", km="d")
+        self.store.extend(["model-0001:Sedan", "model-0002:SUV", "model-0001:Sedan"],
+                          plate=[123, 999, 456], km=[10.0, 42.5, 7.0])
+
+    def assertConsistent(self, rows: int) -> None:
+        lengths = {len(self.store.column(name)) for name in ("kind", "plate", "km")}
+        self.assertEqual(lengths, {rows})
+        self.assertEqual(len(self.store), rows)
+
+    def test_rows_share_flyweights(self):
+        """Each distinct model becomes one flyweight; rows and tolls read through it."""
+        store = self.store
+        self.assertEqual(len(store.flyweights), 2)
+        self.assertEqual(store.add("model-0002:SUV", plate=7, km=1.0), 3)
+        row = store.row(3)
+        self.assertEqual((row["plate"], row["km"]), (7, 1.0))
+        self.assertIs(row["flyweight"], store.row(1)["flyweight"])
+        expected = [_toll_rate(store.flyweights[kind]) * km for kind, km in zip(store.kinds, [10.0, 42.5, 7.0, 1.0])]
+        self.assertEqual([round(float(t), 9) for t in compute_tolls(store)], [round(t, 9) for t in expected])
+
+    def test_bad_input_adds_no_rows(self):
+        """Missing, unknown, mistyped or misaligned values leave every column untouched."""
+        store = self.store
+        with self.assertRaises(KeyError):
+            store.add("model-0003:Van", plate=1)
+        with self.assertRaises(KeyError):
+            store.add("model-0003:Van", plate=1, km=1.0, colour="red")
+        with self.assertRaises(ValueError):
+            store.extend(["model-0003:Van"] * 2, plate=[1, 2], km=[1.0])
+        with self.assertRaises((TypeError, OverflowError)):
+            store.extend(["model-0003:Van"] * 2, plate=[1, -2], km=[1.0, 2.0])
+        with self.assertRaises(TypeError):
+            store.add("model-0003:Van", plate=1, km="far")
+        self.assertConsistent(3)
+        self.assertNotIn("model-0003:Van", [f.shared_state for f in store.flyweights])
+
+    def test_copies_and_live_views(self):
+        """column() returns a copy; while a view is alive adding fails without partial rows."""
+        store = self.store
+        copied = store.column("km")
+        copied[0] = -1.0
+        self.assertEqual(store.row(0)["km"], 10.0)
+        view = store.column("km", view=True)
+        with self.assertRaises(BufferError):
+            store.add("model-0001:Sedan", plate=1, km=1.0)
+        self.assertConsistent(3)
+        del view
+        store.add("model-0001:Sedan", plate=1, km=1.0)
+        self.assertConsistent(4)
+
 # Example usage
 if __name__ == "__main__":
     factory = FlyweightFactory()
@@ -50,3 +498,33 @@ if __name__ == "__main__":
     add_car(factory, "Sedan", "DEF-456")
 
     factory.list_flyweights()
+
+    # Bounded factories: an LRU of two models, and weak entries that vanish when unused
+    lru = BoundedFlyweightFactory("lru", maxsize=2)
+    for model in ["Sedan", "SUV", "Sedan", "Coupe", "SUV"]:
+        lru.get_flyweight(model)
+    print(f"\nLRU factory: {lru.stats()}")
+
+    weak = BoundedFlyweightFactory("weak")
+    held: Optional[Flyweight] = weak.get_flyweight("Truck")
+    weak.get_flyweight("Truck")
+    print(f"Weak factory while 'Truck' is in use: {weak.stats()}")
+    held = None
+    print(f"Weak factory after it is released:    {weak.stats()}")
+
+    # Columnar extrinsic state: tolls for a fleet in one batch
+    fleet = ExtrinsicColumns(plate="L", km="d")
+    fleet.extend(["model-0001:Sedan", "model-0002:SUV", "model-0001:Sedan"], plate=[123, 999, 456], km=[10.0, 42.5, 7.0])
+    print(f"\nColumn store: {len(fleet)} cars, {len(fleet.flyweights)} flyweights, {fleet.nbytes()} bytes of columns")
+    print(f"Tolls: {[round(float(toll), 3) for toll in compute_tolls(fleet)]}")
+
+    if "--benchmark" in sys.argv:
+        print("\nOne million cars over 1,000 models:")
+        for label, figures in benchmark_memory().items():
+            print(f"  {label:<18} {figures['MiB']:8.1f} MiB  (peak {figures['peak MiB']:.1f})  {figures['seconds']:.2f}s")
+        print("\nPer-item toll over one million cars (extrinsic state as objects vs columns):")
+        for label, figures in benchmark_columns().items():
+            print(f"  {label:<18} {figures['MiB']:8.1f} MiB  {figures['items/s']:12,.0f} items/s")
+
+    # Unit Tests (argv without --benchmark, which unittest would reject)
+    unittest.main(argv=sys.argv[:1])
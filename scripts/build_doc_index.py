@@ -1,14 +1,47 @@
 # Path: scripts/build_doc_index.py
 # pylint: disable=logging-fstring-interpolation
-"""Builds a documentation index file from all .md files in a directory."""
+"""
+Builds a documentation index from all .md files in a directory.
+
+Lessons are grouped by category and paginated into per-category sub-index pages,
+so the output stays browsable with tens of thousands of lessons. Titles come from
+each lesson's H1, read from the first few bytes of the file only. A small cache of
+per-file metadata and per-page digests lets repeat runs skip unchanged files and
+rewrite only the pages whose inputs changed.
+"""
 import argparse
+import hashlib
+import json
 import logging
+import os
+import re
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 # --- Directory setup ---
 script_dir = Path(__file__).resolve().parent
 project_root = script_dir.parent
 
+# Bytes read from the top of each lesson when looking for its H1
+HEAD_BYTES = 4096
+# Lessons listed on a single category page
+DEFAULT_PAGE_SIZE = 500
+# Categories this small are also listed directly in the root index
+DEFAULT_INLINE_LIMIT = 50
+# Sub-directory (inside docs) holding the per-category pages
+DEFAULT_PAGES_DIR = 'categories'
+CACHE_NAME = '.index_cache.json'
+CACHE_VERSION = 1
+# Cache key for the root index page (never a valid category page name)
+ROOT_KEY = '/root'
+
+H1_RE = re.compile(r'^#\s+(.+?)\s*#*\s*$', re.MULTILINE)
+CATEGORY_RE = re.compile(r'^(?P<title>.+?)\s*\((?P<category>[^()]+)\)$')
+
+# (name, title, category)
+Lesson = Tuple[str, str, str]
+
+
 def setup_logging():
     """Sets up logging with a basic configuration."""
     logging.basicConfig(
@@ -19,28 +52,231 @@ def setup_logging():
 
 logger = setup_logging()
 
-def build_index(docs_dir: Path, index_file: Path) -> None:
+
+def title_from_name(name: str) -> str:
+    """Derive a readable title from a file name (used when a lesson has no H1)."""
+    return Path(name).stem.replace('_', ' ').replace('-', ' ').title()
+
+
+def category_from_name(name: str) -> str:
+    """Derive the category from a lesson file name prefix, e.g. 'creational_borg.md'."""
+    stem = Path(name).stem
+    return stem.split('_', 1)[0].title() if '_' in stem else 'General'
+
+
+def read_heading(path: str) -> Optional[str]:
+    """Return the first H1 found in the first HEAD_BYTES of a file, or None."""
+    try:
+        with open(path, 'rb') as fh:
+            head = fh.read(HEAD_BYTES)
+    except OSError as e:
+        logger.warning(f'Could not read {path}: {e}')
+        return None
+    match = H1_RE.search(head.decode('utf-8', errors='ignore'))
+    return match.group(1) if match else None
+
+
+def describe_lesson(name: str, heading: Optional[str]) -> Tuple[str, str]:
     """
-    Scan the docs_dir for Markdown files and write an index_file
-    listing each with a relative Markdown link.
+    Split an H1 like 'The Borg Pattern (Creational)' into a title and category,
+    falling back to the file name for whatever the heading does not provide.
     """
-    md_files = sorted(
-        f for f in docs_dir.iterdir()
-        if f.is_file() and f.suffix.lower() == '.md' and f.name != index_file.name
-    )
-    lines = ['# Documentation Index', '']
-    for f in md_files:
-        rel = f.relative_to(docs_dir)
-        title = f.stem.replace('_', ' ').replace('-', ' ').title()
-        lines.append(f'- [{title}]({rel.as_posix()})')
-    content = '\n'.join(lines) + '\n'
-    index_file.write_text(content, encoding='utf-8')
-    logger.info(f'Wrote documentation index: {index_file}')
+    if not heading:
+        return title_from_name(name), category_from_name(name)
+    match = CATEGORY_RE.match(heading)
+    if match:
+        return match.group('title'), match.group('category').strip().title()
+    return heading, category_from_name(name)
+
+
+def empty_cache() -> Dict:
+    """A cache with no known files or pages."""
+    return {'version': CACHE_VERSION, 'files': {}, 'pages': {}}
+
+
+def load_cache(cache_file: Path) -> Dict:
+    """Load the index cache, returning an empty cache if missing or unusable."""
+    empty = empty_cache()
+    if not cache_file.is_file():
+        return empty
+    try:
+        cache = json.loads(cache_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        logger.warning(f'Ignoring unreadable index cache {cache_file}: {e}')
+        return empty
+    if cache.get('version') != CACHE_VERSION:
+        return empty
+    cache.setdefault('files', {})
+    cache.setdefault('pages', {})
+    return cache
+
+
+def scan_lessons(docs_dir: Path, index_file: Path, cache: Dict) -> List[Lesson]:
+    """
+    Scan docs_dir with os.scandir and return (name, title, category) per lesson.
+
+    Files whose mtime and size match the cache are not reopened; the cache is
+    updated in place and entries for deleted files are dropped.
+    """
+    cached = cache['files']
+    seen: Dict[str, list] = {}
+    lessons: List[Lesson] = []
+    reads = 0
+    with os.scandir(docs_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.lower().endswith('.md') or name == index_file.name:
+                continue
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+            hit = cached.get(name)
+            if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+                record = hit
+            else:
+                title, category = describe_lesson(name, read_heading(entry.path))
+                record = [st.st_mtime_ns, st.st_size, title, category]
+                reads += 1
+            seen[name] = record
+            lessons.append((name, record[2], record[3]))
+    cache['files'] = seen
+    logger.info(f'Scanned {len(lessons)} lessons ({reads} read, {len(lessons) - reads} cached)')
+    return lessons
+
+
+def page_name(category: str, page: int) -> str:
+    """File name of a category page; page numbers start at 1."""
+    slug = re.sub(r'[^a-z0-9]+', '-', category.lower()).strip('-') or 'general'
+    return f'{slug}.md' if page == 1 else f'{slug}-{page}.md'
+
+
+def render_category_page(
+    category: str,
+    items: List[Lesson],
+    page: int,
+    pages: int,
+    root_link: str) -> str:
+    """Render one page of a category listing. Links point back up to docs_dir."""
+    lines = [f'# {category} Lessons', '']
+    nav = [f'[Index]({root_link})']
+    if page > 1:
+        nav.append(f'[← Previous]({page_name(category, page - 1)})')
+    if page < pages:
+        nav.append(f'[Next →]({page_name(category, page + 1)})')
+    lines.append(f'Page {page} of {pages} · ' + ' · '.join(nav))
+    lines.append('')
+    for name, title, _ in items:
+        lines.append(f'- [{title}](../{name})')
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def render_root_index(
+    groups: Dict[str, List[Lesson]],
+    pages_dir: str,
+    page_size: int,
+    inline_limit: int) -> str:
+    """Render the top-level index: one section per category with its page links."""
+    total = sum(len(items) for items in groups.values())
+    lines = ['# Documentation Index', '', f'{total} lessons in {len(groups)} categories.', '']
+    for category, items in groups.items():
+        pages = max(1, -(-len(items) // page_size))
+        lines.append(f'## {category}')
+        lines.append('')
+        if len(items) <= inline_limit:
+            for name, title, _ in items:
+                lines.append(f'- [{title}]({name})')
+        else:
+            links = ', '.join(
+                f'[{n}]({pages_dir}/{page_name(category, n)})' for n in range(1, pages + 1)
+            )
+            lines.append(f'{len(items)} lessons — pages: {links}')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def write_if_changed(path: Path, digest: str, render, cache: Dict, key: str) -> bool:
+    """Render and write a page only when its input digest changed or it is missing."""
+    if cache['pages'].get(key) == digest and path.is_file():
+        return False
+    path.write_text(render(), encoding='utf-8')
+    cache['pages'][key] = digest
+    return True
+
+
+def digest_of(*parts) -> str:
+    """Stable digest of the inputs a page is rendered from."""
+    return hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def build_index(
+    docs_dir: Path,
+    index_file: Path,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    inline_limit: int = DEFAULT_INLINE_LIMIT,
+    pages_dir: str = DEFAULT_PAGES_DIR,
+    use_cache: bool = True) -> None:
+    """
+    Scan docs_dir for Markdown lessons and write index_file plus paginated
+    per-category pages under docs_dir/pages_dir. Only changed pages are written.
+    """
+    pages_path = docs_dir / pages_dir
+    pages_path.mkdir(parents=True, exist_ok=True)
+    cache_file = pages_path / CACHE_NAME
+    cache = load_cache(cache_file) if use_cache else empty_cache()
+
+    lessons = scan_lessons(docs_dir, index_file, cache)
+    groups: Dict[str, List[Lesson]] = {}
+    for lesson in sorted(lessons, key=lambda l: (l[2].lower(), l[1].lower(), l[0])):
+        groups.setdefault(lesson[2], []).append(lesson)
+
+    written = 0
+    expected = set()
+    root_link = f'../{index_file.name}'
+    for category, items in groups.items():
+        pages = max(1, -(-len(items) // page_size))
+        for page in range(1, pages + 1):
+            chunk = items[(page - 1) * page_size:page * page_size]
+            name = page_name(category, page)
+            expected.add(name)
+            digest = digest_of(category, page, pages, root_link, chunk)
+            written += write_if_changed(
+                pages_path / name,
+                digest,
+                lambda c=category, i=chunk, p=page, n=pages: render_category_page(c, i, p, n, root_link),
+                cache,
+                name,
+            )
+
+    # Remove pages left over from categories that shrank or disappeared
+    for name in list(cache['pages']):
+        if name not in expected and name != ROOT_KEY:
+            stale = pages_path / name
+            if stale.is_file():
+                stale.unlink()
+                logger.info(f'Removed stale index page: {stale}')
+            del cache['pages'][name]
+
+    summary = [(c, len(i), i if len(i) <= inline_limit else None) for c, i in groups.items()]
+    digest = digest_of(pages_dir, page_size, inline_limit, summary)
+    if write_if_changed(
+            index_file,
+            digest,
+            lambda: render_root_index(groups, pages_dir, page_size, inline_limit),
+            cache,
+            ROOT_KEY):
+        written += 1
+        logger.info(f'Wrote documentation index: {index_file}')
+
+    if use_cache:
+        cache_file.write_text(json.dumps(cache, ensure_ascii=False), encoding='utf-8')
+    logger.info(f'Index pages written: {written} of {len(expected) + 1}')
+
 
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
-        description='Build an index.md in the docs folder listing all Markdown files.'
+        description='Build an index.md in the docs folder, grouped and paginated by category.'
     )
     parser.add_argument(
         '--docs',
@@ -52,15 +288,45 @@ def main():
         default='index.md',
         help='Name of the generated index file within the docs directory'
     )
+    parser.add_argument(
+        '--page-size',
+        type=int, default=DEFAULT_PAGE_SIZE,
+        help='Lessons per category page'
+    )
+    parser.add_argument(
+        '--inline-limit',
+        type=int, default=DEFAULT_INLINE_LIMIT,
+        help='List categories with at most this many lessons directly in the root index'
+    )
+    parser.add_argument(
+        '--pages-dir',
+        default=DEFAULT_PAGES_DIR,
+        help='Sub-directory of the docs folder for per-category pages'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore the index cache and rewrite every page'
+    )
     args = parser.parse_args()
 
     docs_dir = Path(args.docs)
     if not docs_dir.is_dir():
         logger.error(f'Provided docs path is not a directory: {docs_dir}')
         return
+    if args.page_size < 1:
+        logger.error('--page-size must be at least 1')
+        return
 
     index_file = docs_dir / args.output
-    build_index(docs_dir, index_file)
+    build_index(
+        docs_dir,
+        index_file,
+        page_size=args.page_size,
+        inline_limit=args.inline_limit,
+        pages_dir=args.pages_dir,
+        use_cache=not args.no_cache,
+    )
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,93 @@
+# Path: scripts/check_startup.py
+# pylint: disable=line-too-long
+"""
+Startup regression checks for the build CLIs.
+
+Importing a build script must not load the heavy Ollama/HTTP client stack, and the
+module's own import must stay within a time budget. Each check runs in a fresh
+interpreter so results do not depend on what this process has already imported.
+
+Usage:
+    python scripts/check_startup.py
+    STARTUP_BUDGET_MS=300 python scripts/check_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+# --- Directory setup ---
+script_dir = Path(__file__).resolve().parent
+
+# CLIs that must start without the client stack
+ENTRY_POINTS = ['rag_chunker', 'generate_lessons']
+# Packages that may only be imported once a network call is made
+HEAVY_MODULES = ['ollama', 'httpx', 'pydantic']
+# Cumulative import time allowed for each entry point module, in milliseconds
+STARTUP_BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', '250'))
+# Best-of runs used for the timing check, to smooth out a cold disk cache
+TIMING_RUNS = 3
+
+
+def probe_import(module: str) -> dict:
+    """
+    Import module in a fresh interpreter with -X importtime and return
+    {'cumulative_ms': float, 'heavy': [names of HEAVY_MODULES that got imported]}.
+    """
+    code = (
+        'import json, sys\n'
+        f'sys.path.insert(0, {str(script_dir)!r})\n'
+        f'__import__({module!r})\n'
+        f'print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))\n'
+    )
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True
+    )
+    cumulative_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|', 2)
+        if name.strip() == module:
+            cumulative_us = int(cumulative)
+    return {
+        'cumulative_ms': cumulative_us / 1000,
+        'heavy': json.loads(proc.stdout.strip().splitlines()[-1]),
+    }
+
+
+class TestStartup(unittest.TestCase):
+    """The build CLIs start without importing network clients and within budget."""
+
+    def test_no_heavy_imports(self):
+        """Importing an entry point loads none of the heavy client packages."""
+        for module in ENTRY_POINTS:
+            with self.subTest(module=module):
+                self.assertEqual(probe_import(module)['heavy'], [])
+
+    def test_import_budget(self):
+        """Each entry point imports within STARTUP_BUDGET_MS (best of TIMING_RUNS)."""
+        for module in ENTRY_POINTS:
+            with self.subTest(module=module):
+                best = min(probe_import(module)['cumulative_ms'] for _ in range(TIMING_RUNS))
+                self.assertLessEqual(
+                    best, STARTUP_BUDGET_MS,
+                    f"{module} took {best:.1f} ms to import (budget {STARTUP_BUDGET_MS:.0f} ms)"
+                )
+
+    def test_help_runs_without_clients(self):
+        """--help exits cleanly even where the client packages are not installed."""
+        for module in ENTRY_POINTS:
+            with self.subTest(module=module):
+                proc = subprocess.run(
+                    [sys.executable, str(script_dir / f'{module}.py'), '--help'],
+                    capture_output=True, text=True, check=False
+                )
+                self.assertEqual(proc.returncode, 0, proc.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
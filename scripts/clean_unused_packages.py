@@ -3,12 +3,20 @@
 """
 Search a project and attempt to remove unused packages, accounting for dependencies,
 using importlib.metadata; generate cleaned requirements and removal recommendations.
+With --import-cost, rank the used distributions by the time and memory their imports cost.
 """
+import argparse
 import ast
+import codecs
+import json
+import os
+import re
 import subprocess
 import sys
 import sysconfig
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional
 import importlib.metadata as metadata
 
 
@@ -17,21 +25,150 @@ def get_installed_packages():
     return {dist.metadata['Name'].lower() for dist in metadata.distributions() if 'Name' in dist.metadata}
 
 
-def get_imported_modules(code_root: Path):
-    """Get a set of all top-level modules imported from code_root."""
+# Directory names never scanned for imports (virtualenvs, VCS and tool caches, builds)
+DEFAULT_EXCLUDES = frozenset({
+    '.git', '.hg', '.svn', '.tox', '.nox', '.venv', 'venv', 'env',
+    '__pycache__', '.mypy_cache', '.pytest_cache', '.ruff_cache',
+    'node_modules', 'site-packages', 'build', 'dist',
+})
+CACHE_VERSION = 2  # bumped when scanning changes, so stale cached results are dropped
+# Below this many uncached files a process pool costs more than it saves
+POOL_THRESHOLD = 64
+
+# An import statement can only start a line, or follow ';' or a compound statement's ':'.
+# 'from' may be followed directly by the dots of a relative import ('from.pkg import x').
+IMPORT_CANDIDATE_RE = re.compile(rb'(?:^|[;:])[ \t\f]*(?:import[ \t\f(\\]|from[ \t\f\\.])', re.MULTILINE)
+
+
+def iter_python_files(code_root: Path, excludes=DEFAULT_EXCLUDES):
+    """Yield .py files under code_root, pruning excluded and virtualenv directories."""
+    for dirpath, dirnames, filenames in os.walk(code_root):
+        dirnames[:] = [
+            d for d in dirnames
+            if d not in excludes
+            and not d.endswith('.egg-info')
+            and not os.path.exists(os.path.join(dirpath, d, 'pyvenv.cfg'))
+        ]
+        for name in filenames:
+            if name.endswith('.py'):
+                yield Path(dirpath) / name
+
+
+def _import_statements(body):
+    """Yield import nodes from a statement list without descending into expressions."""
+    stack = list(body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+            continue
+        for field in ('body', 'orelse', 'finalbody', 'handlers', 'cases'):
+            children = getattr(node, field, None)
+            if isinstance(children, list):
+                stack.extend(children)
+
+
+def scan_imports(source: bytes, filename: str = '<unknown>') -> set:
+    """
+    Return the top-level module names imported by source.
+
+    A cheap byte-level prefilter skips parsing entirely when no import statement
+    can be present; otherwise only statement nodes of the AST are visited.
+    """
+    if b'import' not in source:
+        return set()
+    # A leading BOM would stop '^' from matching an import on the first line
+    if not IMPORT_CANDIDATE_RE.search(source[3:] if source.startswith(codecs.BOM_UTF8) else source):
+        return set()
     imported_loc = set()
-    for file in code_root.rglob("*.py"):
+    tree = ast.parse(source, filename=filename)
+    for node in _import_statements(tree.body):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imported_loc.add(alias.name.split('.')[0].lower())
+        elif node.module:
+            imported_loc.add(node.module.split('.')[0].lower())
+    return imported_loc
+
+
+def _scan_file(path: str):
+    """Worker: return (path, modules, error) for one file."""
+    try:
+        with open(path, 'rb') as fh:
+            return path, sorted(scan_imports(fh.read(), path)), None
+    except Exception as e:
+        return path, [], str(e)
+
+
+def load_import_cache(cache_file: Optional[Path]) -> dict:
+    """Load the per-file import cache: {path: [mtime_ns, size, modules]}."""
+    if cache_file is None or not cache_file.is_file():
+        return {}
+    try:
+        data = json.loads(cache_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return data.get('files', {}) if data.get('version') == CACHE_VERSION else {}
+
+
+def save_import_cache(cache_file: Optional[Path], files: dict):
+    """Write the per-file import cache."""
+    if cache_file is None:
+        return
+    try:
+        cache_file.write_text(json.dumps({'version': CACHE_VERSION, 'files': files}), encoding='utf-8')
+    except OSError as e:
+        print(f"⚠️ Could not write import cache {cache_file}: {e}")
+
+
+def get_imported_modules(
+        code_root: Path,
+        excludes=DEFAULT_EXCLUDES,
+        cache_file: Optional[Path] = None,
+        jobs: Optional[int] = None):
+    """
+    Get a set of all top-level modules imported from code_root.
+
+    Files are scanned in a process pool, and results are cached per file keyed
+    by path, mtime and size so unchanged files are never re-read.
+    """
+    cached = load_import_cache(cache_file)
+    fresh = {}
+    pending = []
+    for file in iter_python_files(code_root, excludes):
+        key = str(file)
         try:
-            tree = ast.parse(file.read_text(encoding="utf-8"), filename=str(file))
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imported_loc.add(alias.name.split('.')[0].lower())
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        imported_loc.add(node.module.split('.')[0].lower())
-        except Exception as e:
+            st = file.stat()
+        except OSError as e:
             print(f"⚠️ Skipping {file}: {e}")
+            continue
+        hit = cached.get(key)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            fresh[key] = hit
+        else:
+            fresh[key] = [st.st_mtime_ns, st.st_size, []]
+            pending.append(key)
+
+    if len(pending) >= POOL_THRESHOLD and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_scan_file, pending, chunksize=32))
+    else:
+        results = [_scan_file(path) for path in pending]
+
+    reused = len(fresh) - len(pending)
+    for path, modules, error in results:
+        if error:
+            print(f"⚠️ Skipping {path}: {error}")
+            # Leave failures uncached so they are retried next run
+            del fresh[path]
+            continue
+        fresh[path][2] = modules
+
+    save_import_cache(cache_file, fresh)
+    print(f"🔎 Parsed {len(pending)} file(s), reused {reused} cached result(s)")
+    imported_loc = set()
+    for _, _, modules in fresh.values():
+        imported_loc.update(modules)
     return imported_loc
 
 
@@ -64,20 +201,28 @@ def get_all_dependencies(packages):
     return deps
 
 
-def find_unneeded_packages(imported_modules, installed_packages):
-    """Find distributions installed but not needed by imports or dependencies."""
+def get_used_distributions(imported_modules, installed_packages):
+    """Return {distribution: [modules]} for installed distributions imported directly."""
     builtin = stdlib_modules()
     # Map top-level modules to distributions
     pkg2dist = metadata.packages_distributions()
-    # Identify distributions directly used by imports
-    safe = set()
-    for mod in imported_modules:
+    lower2mod = {mod.lower(): mod for mod in pkg2dist}
+    used = {}
+    for mod in sorted(imported_modules):
         if mod in builtin:
             continue
         for dist in pkg2dist.get(mod, []):
-            safe.add(dist.lower())
-    # Filter to installed distributions
-    safe = safe & set(installed_packages)
+            dist = dist.lower()
+            # Filter to installed distributions
+            if dist in installed_packages:
+                used.setdefault(dist, []).append(lower2mod.get(mod, mod))
+    return used
+
+
+def find_unneeded_packages(imported_modules, installed_packages):
+    """Find distributions installed but not needed by imports or dependencies."""
+    # Identify distributions directly used by imports
+    safe = set(get_used_distributions(imported_modules, installed_packages))
     # Add recursive dependencies
     all_needed = set(safe)
     all_needed.update(get_all_dependencies(safe))
@@ -85,6 +230,122 @@ def find_unneeded_packages(imported_modules, installed_packages):
     return sorted(installed_packages - all_needed)
 
 
+# Written to stderr by the probe once its own imports are done
+_PROBE_MARKER = '--- import-cost probe ---'
+# Runs inside the measured interpreter: import the modules, report peak RSS growth
+_IMPORT_PROBE = f"MARKER = {_PROBE_MARKER!r}" + """
+import json, sys
+try:
+    import resource
+    def rss():
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+except ImportError:
+    def rss():
+        return 0
+before = rss()
+sys.stderr.write(MARKER + '\\n')
+sys.stderr.flush()
+for name in sys.argv[1:]:
+    __import__(name)  # importlib.import_module() would hide the top-level entry from -X importtime
+print(json.dumps({'rss_bytes': rss() - before}))
+"""
+
+
+def parse_importtime(stderr: str):
+    """
+    Parse `-X importtime` output into (module, self_us, cumulative_us, depth) rows.
+    Depth 0 marks the modules imported directly by the probe.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), max(depth, 0)))
+    return rows
+
+
+def measure_import_cost(modules, runs: int = 3):
+    """
+    Import modules in fresh interpreters with -X importtime and return the best run:
+    {'cumulative_us', 'rss_bytes', 'rows'}, or None if the import fails.
+    """
+    best = None
+    for _ in range(max(runs, 1)):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _IMPORT_PROBE, *modules],
+            capture_output=True, text=True, check=False
+        )
+        if proc.returncode != 0:
+            print(f"⚠️ Could not import {', '.join(modules)}: {proc.stderr.strip().splitlines()[-1:]}")
+            return None
+        rows = parse_importtime(proc.stderr.split(_PROBE_MARKER, 1)[-1])
+        requested = {m.split('.')[0] for m in modules}
+        cumulative = sum(c for name, _, c, depth in rows if depth == 0 and name in requested)
+        rss = json.loads(proc.stdout.strip().splitlines()[-1])['rss_bytes']
+        if best is None or cumulative < best['cumulative_us']:
+            best = {'cumulative_us': cumulative, 'rss_bytes': rss, 'rows': rows}
+    return best
+
+
+def attribute_rows(rows, module_to_dist):
+    """Roll each module's self time up to the distribution that provides it."""
+    builtin = stdlib_modules()
+    totals = {}
+    for name, self_us, _, _ in rows:
+        top = name.split('.')[0]
+        if top in module_to_dist:
+            owner = module_to_dist[top][0].lower()
+        elif top.lower() in builtin or top.startswith('_'):
+            owner = '(stdlib)'
+        else:
+            owner = '(unknown)'
+        totals[owner] = totals.get(owner, 0) + self_us
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def import_cost_report(used, runs: int = 3):
+    """
+    Measure each used distribution's import cost in isolation.
+
+    Returns report rows sorted by cumulative import time, each with the time its
+    transitive imports spent in every contributing distribution.
+    """
+    module_to_dist = metadata.packages_distributions()
+    report = []
+    for dist, modules in sorted(used.items()):
+        print(f"⏱️ Measuring {dist} ({', '.join(modules)})...")
+        cost = measure_import_cost(modules, runs)
+        if cost is None:
+            continue
+        report.append({
+            'distribution': dist,
+            'modules': modules,
+            'cumulative_ms': round(cost['cumulative_us'] / 1000, 2),
+            'rss_kib': cost['rss_bytes'] // 1024,
+            'breakdown_ms': {
+                owner: round(us / 1000, 2)
+                for owner, us in attribute_rows(cost['rows'], module_to_dist).items()
+            },
+        })
+    report.sort(key=lambda r: (r['cumulative_ms'], r['rss_kib']), reverse=True)
+    return report
+
+
+def print_import_cost_report(report, top: int = 5):
+    """Print the import-cost ranking with the heaviest contributors of each entry."""
+    print(f"\n🐢 Import cost by distribution ({len(report)}):")
+    print(f"  {'distribution':<28} {'time (ms)':>10} {'peak RSS (KiB)':>15}  heaviest contributors")
+    for row in report:
+        parts = [f"{owner} {ms:.1f}ms" for owner, ms in list(row['breakdown_ms'].items())[:top]]
+        print(f"  {row['distribution']:<28} {row['cumulative_ms']:>10.1f} {row['rss_kib']:>15}  {', '.join(parts)}")
+
+
 def uninstall_packages(packages):
     """Uninstall the given list of packages via pip."""
     for pkg in packages:
@@ -116,11 +377,43 @@ def write_clean_requirements(unused, req_file: Path):
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Find installed packages that are not imported by the project."
+    )
+    parser.add_argument('--root', default='.',
+        help='Project directory to scan for imports')
+    parser.add_argument('--exclude', action='append', default=[],
+        help='Extra directory name to skip (repeatable)')
+    parser.add_argument('--jobs', type=int, default=None,
+        help='Worker processes for scanning (default: CPU count; 1 disables the pool)')
+    parser.add_argument('--cache', default='.import_cache.json',
+        help='Per-file import cache path')
+    parser.add_argument('--no-cache', action='store_true',
+        help='Do not read or write the import cache')
+    parser.add_argument('--import-cost', action='store_true',
+        help='Report the import time and memory of each used distribution instead of cleaning')
+    parser.add_argument('--runs', type=int, default=3,
+        help='Fresh-interpreter runs per distribution for --import-cost (best run is kept)')
+    parser.add_argument('--report', default=None,
+        help='Also write the --import-cost report as JSON to this path')
+    args = parser.parse_args()
+
     print("🔍 Scanning for unused packages...")
-    code_root = Path('.')  # customize if needed
+    code_root = Path(args.root)
+    excludes = DEFAULT_EXCLUDES | set(args.exclude)
+    cache_file = None if args.no_cache else Path(args.cache)
 
     installed = get_installed_packages()
-    imported = get_imported_modules(code_root)
+    imported = get_imported_modules(code_root, excludes, cache_file, args.jobs)
+
+    if args.import_cost:
+        report = import_cost_report(get_used_distributions(imported, installed), args.runs)
+        print_import_cost_report(report)
+        if args.report:
+            Path(args.report).write_text(json.dumps(report, indent=2), encoding='utf-8')
+            print(f"📄 Import cost report saved to: {args.report}")
+        return
+
     unused = find_unneeded_packages(imported, installed)
 
     print(f"\n📦 Unused packages ({len(unused)}):")
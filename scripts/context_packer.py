@@ -0,0 +1,289 @@
+# Path: scripts/context_packer.py
+# pylint: disable=logging-fstring-interpolation,line-too-long
+"""
+Pack the most relevant parts of the RAG chunks into a prompt-sized context block.
+
+Each chunk is split into sections (summary, docstrings, code). Sections are scored
+against the query with TF-IDF term overlap plus a bonus when the query names the
+pattern, then a greedy knapsack picks the best value-per-token subset that fits the
+token budget. A chunk's header line is charged once, with its first section.
+
+Usage:
+    python scripts/context_packer.py "How do I implement the Builder pattern?" --budget 1500
+"""
+import argparse
+import heapq
+import json
+import logging
+import math
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from summary_index_generator import estimate_tokens
+
+# --- Directory setup ---
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+
+# Leaves room for the question and the answer inside the Modelfiles' num_ctx of 4096
+DEFAULT_BUDGET = 2048
+# Relative value of each section type per unit of relevance
+SECTION_WEIGHTS = {'summary': 3.0, 'docstrings': 2.0, 'code': 1.0}
+# Added to every section of a chunk whose pattern the query names
+PATTERN_BONUS = 5.0
+# Sections scoring below this fraction of the best section are left out even if they fit,
+# since a smaller prompt is cheaper than one padded with barely related text
+MIN_RELATIVE_SCORE = 0.15
+# Sections rendered in this order within a chunk
+SECTION_ORDER = ('summary', 'docstrings', 'code')
+
+WORD_RE = re.compile(r'[a-z][a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be between by can do does for from how i in is it me of on or '
+    'pattern patterns python show the this to use using what when whats which with you your'.split()
+)
+
+
+def setup_logging():
+    """Sets up logging with a basic configuration."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(levelname)s: %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+logger = setup_logging()
+
+
+def terms(text: str) -> List[str]:
+    """Lowercase content words of text, with identifiers split on '_' and case."""
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text).replace('_', ' ').lower()
+    return [w for w in WORD_RE.findall(text) if w not in STOPWORDS]
+
+
+@dataclass
+class Section:
+    """One packable piece of a chunk."""
+    chunk: str
+    kind: str
+    text: str
+    tokens: int = 0
+    score: float = 0.0
+
+
+@dataclass
+class Chunk:
+    """A parsed chunk file: its header and sections."""
+    name: str
+    file: str
+    pattern: str
+    sections: Dict[str, Section] = field(default_factory=dict)
+
+    @property
+    def header(self) -> str:
+        """Heading rendered once before the chunk's selected sections."""
+        return f"\n### {self.pattern} ({self.file})\n"
+
+
+def parse_chunk(path: Path) -> Optional[Chunk]:
+    """Split a chunk Markdown file into front matter, code, summary and docstrings."""
+    text = path.read_text(encoding='utf-8')
+    front: Dict[str, str] = {}
+    body_start = 0
+    if text.startswith('---'):
+        end = text.find('\n---', 3)
+        if end != -1:
+            for line in text[3:end].splitlines():
+                if ':' in line:
+                    key, value = line.split(':', 1)
+                    front[key.strip()] = value.strip()
+            body_start = end + 4
+
+    summary_at = text.find('\n## Summary\n', body_start)
+    docs_at = text.find('\n## Docstrings\n', body_start)
+    if summary_at == -1:
+        logger.warning(f"Skipping {path.name}: no summary section")
+        return None
+
+    code_open = text.find('```python\n', body_start, summary_at)
+    code_close = text.rfind('```', body_start, summary_at)
+    code = text[code_open + len('```python\n'):code_close].strip() if code_open != -1 and code_close > code_open else ''
+    summary_end = docs_at if docs_at > summary_at else len(text)
+    summary = text[summary_at + len('\n## Summary\n'):summary_end].strip()
+    docstrings = text[docs_at + len('\n## Docstrings\n'):].strip() if docs_at != -1 else ''
+
+    file_rel = front.get('file', path.name)
+    chunk = Chunk(
+        name=front.get('chunk', path.name),
+        file=file_rel,
+        pattern=front.get('pattern') or Path(file_rel).stem.replace('_', ' ').title(),
+    )
+    rendered = {
+        'summary': f"{summary}\n" if summary else '',
+        'docstrings': f"Docstrings:\n{docstrings}\n" if docstrings else '',
+        'code': f"```python\n{code}\n```\n" if code else '',
+    }
+    for kind, body in rendered.items():
+        if body:
+            chunk.sections[kind] = Section(chunk.name, kind, body, estimate_tokens(body))
+    return chunk
+
+
+def load_chunks(chunks_dir: Path) -> List[Chunk]:
+    """Parse every chunk in chunks_dir."""
+    chunks = [parse_chunk(p) for p in sorted(chunks_dir.glob('*.md'))]
+    return [c for c in chunks if c is not None]
+
+
+def score_sections(query: str, chunks: List[Chunk]) -> None:
+    """Set Section.score for every section from its relevance to the query."""
+    query_terms = set(terms(query))
+    docs = [(s, set(terms(s.text))) for c in chunks for s in c.sections.values()]
+    # Document frequency over sections, so words present everywhere carry little weight
+    df: Dict[str, int] = {}
+    for _, words in docs:
+        for w in words & query_terms:
+            df[w] = df.get(w, 0) + 1
+    idf = {w: math.log(1 + len(docs) / df[w]) for w in df}
+
+    for chunk in chunks:
+        pattern_terms = set(terms(chunk.pattern))
+        named = bool(pattern_terms) and pattern_terms <= query_terms
+        for section in chunk.sections.values():
+            words = set(terms(section.text))
+            relevance = sum(idf[w] for w in query_terms & words)
+            score = SECTION_WEIGHTS.get(section.kind, 1.0) * relevance
+            if named:
+                score += PATTERN_BONUS * SECTION_WEIGHTS.get(section.kind, 1.0)
+            section.score = score
+
+
+def select_sections(chunks: List[Chunk], budget: int) -> List[Section]:
+    """
+    Greedy knapsack: take sections by score per token (the header cost of a new
+    chunk included) while they fit, skipping weakly relevant ones, then compare against the single most valuable
+    section that fits on its own and keep whichever set scores higher.
+    """
+    by_name = {c.name: c for c in chunks}
+    scored = [s for c in chunks for s in c.sections.values() if s.score > 0]
+    floor = max((s.score for s in scored), default=0.0) * MIN_RELATIVE_SCORE
+    candidates = [s for s in scored if s.score >= floor]
+
+    def cost(section: Section, opened: set) -> int:
+        extra = 0 if section.chunk in opened else estimate_tokens(by_name[section.chunk].header)
+        return section.tokens + extra
+
+    # Max-heap on value density. Opening a chunk makes its other sections cheaper, so
+    # their density rises: they are re-pushed with the new density at that moment, and
+    # the older, lower entries are recognised as superseded and skipped when popped.
+    heap = [(-s.score / cost(s, set()), i) for i, s in enumerate(candidates)]
+    heapq.heapify(heap)
+    in_chunk: Dict[str, List[int]] = {}
+    for i, s in enumerate(candidates):
+        in_chunk.setdefault(s.chunk, []).append(i)
+    chosen: List[Section] = []
+    taken: set = set()
+    opened: set = set()
+    used = 0
+    while heap:
+        density, i = heapq.heappop(heap)
+        section = candidates[i]
+        c = cost(section, opened)
+        if i in taken or -section.score / c != density:
+            continue
+        if used + c > budget:
+            continue
+        chosen.append(section)
+        taken.add(i)
+        used += c
+        if section.chunk not in opened:
+            opened.add(section.chunk)
+            for j in in_chunk[section.chunk]:
+                # Sections skipped earlier for size get another chance at the lower cost
+                if j not in taken:
+                    heapq.heappush(heap, (-candidates[j].score / cost(candidates[j], opened), j))
+
+    single = [s for s in candidates if cost(s, set()) <= budget]
+    if single:
+        top = max(single, key=lambda s: s.score)
+        if top.score > sum(s.score for s in chosen):
+            chosen = [top]
+    return chosen
+
+
+def render_context(chunks: List[Chunk], selected: List[Section]) -> str:
+    """Render the selected sections, grouped by chunk in order of best score."""
+    by_chunk: Dict[str, List[Section]] = {}
+    for section in selected:
+        by_chunk.setdefault(section.chunk, []).append(section)
+    order = sorted(by_chunk, key=lambda name: -max(s.score for s in by_chunk[name]))
+    by_name = {c.name: c for c in chunks}
+    parts = []
+    for name in order:
+        kinds = {s.kind: s for s in by_chunk[name]}
+        parts.append(by_name[name].header + ''.join(kinds[k].text for k in SECTION_ORDER if k in kinds))
+    return ''.join(parts).lstrip('\n')
+
+
+def pack_context(query: str, chunks: List[Chunk], budget: int = DEFAULT_BUDGET) -> str:
+    """Return a context block of the sections most relevant to query within budget tokens."""
+    score_sections(query, chunks)
+    return render_context(chunks, select_sections(chunks, budget))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Pack the chunk sections most relevant to a query into a token budget.'
+    )
+    parser.add_argument('query', help='Question the context is for')
+    parser.add_argument(
+        '--budget',
+        type=int, default=DEFAULT_BUDGET,
+        help=f'Token budget for the context block (default: {DEFAULT_BUDGET})'
+    )
+    parser.add_argument(
+        '--chunks',
+        default=str(project_root / 'chunks'),
+        help='Directory containing Markdown chunks'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the selection and its token counts as JSON instead of the context block'
+    )
+    args = parser.parse_args()
+
+    chunks_dir = Path(args.chunks)
+    if not chunks_dir.is_dir():
+        logger.error(f'Provided chunks path is not a directory: {chunks_dir}')
+        sys.exit(1)
+
+    chunks = load_chunks(chunks_dir)
+    score_sections(args.query, chunks)
+    selected = select_sections(chunks, args.budget)
+    context = render_context(chunks, selected)
+    logger.info(
+        f'Selected {len(selected)} section(s) from {len({s.chunk for s in selected})} chunk(s), '
+        f'~{estimate_tokens(context)} of {args.budget} tokens'
+    )
+    if args.json:
+        print(json.dumps({
+            'query': args.query,
+            'budget': args.budget,
+            'tokens': estimate_tokens(context),
+            'sections': [
+                {'chunk': s.chunk, 'section': s.kind, 'tokens': s.tokens, 'score': round(s.score, 3)}
+                for s in selected
+            ],
+            'context': context,
+        }, indent=2))
+    else:
+        print(context)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+# Path: scripts/eval_retrieval.py
+# pylint: disable=broad-exception-caught,logging-fstring-interpolation,line-too-long,import-outside-toplevel
+"""
+Evaluate retrieval backends over chunks/ and summary_index.json on a labeled query set.
+
+Each backend ranks chunk files for a query. For every backend that is available in
+this environment the harness reports quality (recall@k and MRR against the expected
+chunks of each query) next to cost (p50/p99 query latency, memory retained by the
+built index and peak memory while querying), so retrieval changes can be judged on
+both at once. Backends whose dependencies or services are missing are skipped.
+
+The default query set, scripts/retrieval_queries.json, starts from the README's
+example questions; each entry is {"query": ..., "expected": [chunk file names]}.
+
+Usage:
+    python scripts/eval_retrieval.py [--k 1 3 5] [--repeat 5] [--backend NAME] [--json]
+"""
+import argparse
+import json
+import logging
+import math
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from context_packer import load_chunks, score_sections, terms
+from ollama_pool import DEFAULT_HOST, normalize_host
+
+# --- Directory setup ---
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+
+DEFAULT_QUERIES = script_dir / 'retrieval_queries.json'
+DEFAULT_K = (1, 3, 5)
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def setup_logging():
+    """Sets up logging with a basic configuration."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(levelname)s: %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+logger = setup_logging()
+
+
+# A retriever maps a query to chunk file names, best first
+Retriever = Callable[[str], List[str]]
+
+
+def build_index_bm25(chunks_dir: Path, index_path: Path, _args) -> Optional[Retriever]:
+    """BM25 over each summary_index.json entry's pattern name, file path and summary."""
+    if not index_path.is_file():
+        return None
+    entries = json.loads(index_path.read_text(encoding='utf-8'))
+    docs = [
+        (entry['chunk'], Counter(terms(f"{entry.get('pattern', '')} {entry.get('file', '')} {entry.get('summary', '')}")))
+        for entry in entries
+    ]
+    lengths = {name: sum(tf.values()) for name, tf in docs}
+    avg_len = sum(lengths.values()) / max(len(docs), 1)
+    df: Counter = Counter()
+    for _, tf in docs:
+        df.update(tf.keys())
+    idf = {w: math.log(1 + (len(docs) - n + 0.5) / (n + 0.5)) for w, n in df.items()}
+
+    def retrieve(query: str) -> List[str]:
+        query_terms = set(terms(query))
+        scores = []
+        for name, tf in docs:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[name] / avg_len)
+            score = sum(idf[w] * tf[w] * (BM25_K1 + 1) / (tf[w] + norm) for w in query_terms if w in tf)
+            if score > 0:
+                scores.append((score, name))
+        return [name for _, name in sorted(scores, key=lambda s: (-s[0], s[1]))]
+
+    return retrieve
+
+
+def build_context_packer(chunks_dir: Path, _index_path: Path, _args) -> Optional[Retriever]:
+    """context_packer's section scoring, ranking chunks by the sum of their section scores."""
+    chunks = load_chunks(chunks_dir)
+    if not chunks:
+        return None
+
+    def retrieve(query: str) -> List[str]:
+        score_sections(query, chunks)
+        totals = [(sum(s.score for s in c.sections.values()), c.name) for c in chunks]
+        return [name for score, name in sorted(totals, key=lambda s: (-s[0], s[1])) if score > 0]
+
+    return retrieve
+
+
+def build_ollama_embed(chunks_dir: Path, _index_path: Path, args) -> Optional[Retriever]:
+    """Cosine similarity of Ollama embeddings of each chunk's summary and docstrings."""
+    try:
+        import ollama
+    except ImportError:
+        return None
+    client = ollama.Client(host=normalize_host(args.host))
+    chunks = load_chunks(chunks_dir)
+    texts = [
+        ''.join(c.sections[k].text for k in ('summary', 'docstrings') if k in c.sections) or c.pattern
+        for c in chunks
+    ]
+    try:
+        vectors = client.embed(model=args.embed_model, input=texts)['embeddings']
+    except Exception as e:
+        logger.info(f"Embedding backend unavailable ({e})")
+        return None
+
+    def unit(vector: List[float]) -> List[float]:
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    matrix = [(c.name, unit(v)) for c, v in zip(chunks, vectors)]
+
+    def retrieve(query: str) -> List[str]:
+        q = unit(client.embed(model=args.embed_model, input=query)['embeddings'][0])
+        scores = [(sum(a * b for a, b in zip(q, v)), name) for name, v in matrix]
+        return [name for _, name in sorted(scores, key=lambda s: (-s[0], s[1]))]
+
+    return retrieve
+
+
+BACKENDS: Dict[str, Callable[[Path, Path, argparse.Namespace], Optional[Retriever]]] = {
+    'index-bm25': build_index_bm25,
+    'context-packer': build_context_packer,
+    'ollama-embed': build_ollama_embed,
+}
+
+
+@dataclass
+class BackendReport:
+    """Quality and cost figures for one backend."""
+    backend: str
+    queries: int
+    recall: Dict[int, float] = field(default_factory=dict)
+    mrr: float = 0.0
+    p50_ms: float = 0.0
+    p99_ms: float = 0.0
+    build_ms: float = 0.0
+    index_kib: float = 0.0
+    query_peak_kib: float = 0.0
+    misses: List[str] = field(default_factory=list)
+
+
+def load_queries(path: Path) -> List[dict]:
+    """Load and check a labeled query set."""
+    queries = json.loads(path.read_text(encoding='utf-8'))
+    for item in queries:
+        if not item.get('query') or not item.get('expected'):
+            raise ValueError(f"Query entries need 'query' and 'expected': {item}")
+    return queries
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def score_rankings(queries: List[dict], rankings: List[List[str]], ks: List[int]) -> tuple:
+    """Return ({k: mean recall@k}, MRR, queries with no expected chunk in the top max(k))."""
+    recall = {k: 0.0 for k in ks}
+    reciprocal = 0.0
+    misses = []
+    for item, ranked in zip(queries, rankings):
+        expected = set(item['expected'])
+        for k in ks:
+            recall[k] += len(expected & set(ranked[:k])) / len(expected)
+        first = next((i for i, name in enumerate(ranked, 1) if name in expected), None)
+        reciprocal += 1 / first if first else 0.0
+        if not expected & set(ranked[:max(ks)]):
+            misses.append(item['query'])
+    n = max(len(queries), 1)
+    return {k: v / n for k, v in recall.items()}, reciprocal / n, misses
+
+
+def evaluate_backend(
+    name: str,
+    factory: Callable,
+    queries: List[dict],
+    chunks_dir: Path,
+    index_path: Path,
+    args: argparse.Namespace,
+) -> Optional[BackendReport]:
+    """Build one backend and measure it over the query set, or None if it is unavailable."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        retrieve = factory(chunks_dir, index_path, args)
+    finally:
+        build_ms = (time.perf_counter() - started) * 1000
+        index_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    if retrieve is None:
+        logger.info(f"Skipping backend '{name}': not available here")
+        return None
+
+    # Latency is timed without tracemalloc, which would inflate it
+    latencies = []
+    rankings: List[List[str]] = []
+    for _ in range(args.repeat):
+        rankings = []
+        for item in queries:
+            t0 = time.perf_counter()
+            rankings.append(retrieve(item['query']))
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    tracemalloc.start()
+    peak = 0
+    for item in queries:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        retrieve(item['query'])
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    recall, mrr, misses = score_rankings(queries, rankings, args.k)
+    return BackendReport(
+        backend=name,
+        queries=len(queries),
+        recall=recall,
+        mrr=mrr,
+        p50_ms=percentile(latencies, 50),
+        p99_ms=percentile(latencies, 99),
+        build_ms=build_ms,
+        index_kib=index_bytes / 1024,
+        query_peak_kib=peak / 1024,
+        misses=misses,
+    )
+
+
+def print_reports(reports: List[BackendReport], ks: List[int]) -> None:
+    """Print one table row per backend, then the queries each backend missed."""
+    header = ['backend'] + [f'R@{k}' for k in ks] + ['MRR', 'p50 ms', 'p99 ms', 'build ms', 'index KiB', 'query KiB']
+    rows = [
+        [r.backend] + [f'{r.recall[k]:.3f}' for k in ks] + [
+            f'{r.mrr:.3f}', f'{r.p50_ms:.3f}', f'{r.p99_ms:.3f}',
+            f'{r.build_ms:.1f}', f'{r.index_kib:.1f}', f'{r.query_peak_kib:.1f}',
+        ]
+        for r in reports
+    ]
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    for row in [header] + rows:
+        print('  '.join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths))))
+    for r in reports:
+        if r.misses:
+            print(f"\n{r.backend} missed {len(r.misses)} quer{'y' if len(r.misses) == 1 else 'ies'} in the top {max(ks)}:")
+            for query in r.misses:
+                print(f"  - {query}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Report recall@k, MRR, latency and memory of each available retrieval backend.'
+    )
+    parser.add_argument('--queries', default=str(DEFAULT_QUERIES),
+        help='Labeled query set (JSON list of {"query", "expected"})')
+    parser.add_argument('--chunks', default=str(project_root / 'chunks'),
+        help='Directory containing Markdown chunks')
+    parser.add_argument('--index', default=str(project_root / 'summary_index.json'),
+        help='Path of the summary JSON index')
+    parser.add_argument('--backend', action='append', choices=sorted(BACKENDS),
+        help='Only evaluate this backend (repeatable; default: all available)')
+    parser.add_argument('--k', type=int, nargs='+', default=list(DEFAULT_K),
+        help='Cut-offs for recall@k')
+    parser.add_argument('--repeat', type=int, default=5,
+        help='Times each query is timed, for stable latency percentiles')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+        help='Ollama host for the embedding backend')
+    parser.add_argument('--embed-model', default='nomic-embed-text',
+        help='Ollama embedding model for the embedding backend')
+    parser.add_argument('--json', action='store_true',
+        help='Print the reports as JSON')
+    args = parser.parse_args()
+
+    chunks_dir = Path(args.chunks)
+    if not chunks_dir.is_dir():
+        logger.error(f'Provided chunks path is not a directory: {chunks_dir}')
+        sys.exit(1)
+    queries = load_queries(Path(args.queries))
+    args.k = sorted(set(args.k))
+
+    reports = []
+    for name in args.backend or BACKENDS:
+        report = evaluate_backend(name, BACKENDS[name], queries, chunks_dir, Path(args.index), args)
+        if report:
+            reports.append(report)
+    if not reports:
+        logger.error('No retrieval backend is available.')
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps([vars(r) for r in reports], indent=2))
+    else:
+        logger.info(f"Evaluated {len(reports)} backend(s) on {len(queries)} queries")
+        print_reports(reports, args.k)
+
+
+if __name__ == '__main__':
+    main()
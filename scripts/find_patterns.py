@@ -0,0 +1,100 @@
+# Path: scripts/find_patterns.py
+# pylint: disable=logging-fstring-interpolation,line-too-long
+"""
+Filter patterns by their structure using the precomputed facet postings.
+
+Each FACET=VALUE filter is a lookup in summary_facets.json (written next to
+summary_index.json by summary_index_generator.py); the filters are intersected, so
+no chunk or source file is parsed. Facets: category, uses, base, class, import,
+has_tests.
+
+Usage:
+    python scripts/find_patterns.py category=behavioral uses=abc
+    python scripts/find_patterns.py has_tests=true --details
+    python scripts/find_patterns.py --list
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from summary_index_generator import facets_path_for
+
+# --- Directory setup ---
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+
+
+def setup_logging():
+    """Sets up logging with a basic configuration."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(levelname)s: %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+logger = setup_logging()
+
+
+def lookup(facets: Dict[str, Dict[str, List[str]]], filters: List[str]) -> List[str]:
+    """Chunks matching every FACET=VALUE filter (all indexed chunks if there are none)."""
+    result = None
+    for item in filters:
+        facet, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Expected FACET=VALUE, got '{item}'")
+        if facet not in facets:
+            raise ValueError(f"Unknown facet '{facet}'; known: {', '.join(sorted(facets))}")
+        postings = set(facets[facet].get(value, ()))
+        result = postings if result is None else result & postings
+    if result is None:
+        result = {chunk for postings in facets.get('category', {}).values() for chunk in postings}
+    return sorted(result)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='List the pattern chunks matching FACET=VALUE filters, using the facet index.'
+    )
+    parser.add_argument('filters', nargs='*', help='FACET=VALUE filters, all of which must match')
+    parser.add_argument('--index', default=str(project_root / 'summary_index.json'),
+        help='Summary JSON index whose facet postings are used')
+    parser.add_argument('--list', action='store_true',
+        help='List the facets and their values instead of filtering')
+    parser.add_argument('--details', action='store_true',
+        help='Also print each match\'s file, pattern and summary from the index')
+    args = parser.parse_args()
+
+    index_path = Path(args.index)
+    facets_path = facets_path_for(index_path)
+    if not facets_path.is_file():
+        logger.error(f"No facet index at {facets_path}; run summary_index_generator.py first")
+        sys.exit(1)
+    facets = json.loads(facets_path.read_text(encoding='utf-8'))
+
+    if args.list:
+        for facet, postings in facets.items():
+            print(f"{facet}: " + ', '.join(f"{value} ({len(chunks)})" for value, chunks in postings.items()))
+        return
+
+    try:
+        matches = lookup(facets, args.filters)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(2)
+
+    if args.details:
+        entries = {e['chunk']: e for e in json.loads(index_path.read_text(encoding='utf-8'))}
+        for chunk in matches:
+            entry = entries.get(chunk, {})
+            print(f"{chunk}\t{entry.get('file', '')}\t{entry.get('pattern', '')}\t{entry.get('summary', '').splitlines()[0] if entry.get('summary') else ''}")
+    else:
+        print('\n'.join(matches))
+    logger.info(f"{len(matches)} match(es)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,22 @@
 # Path: scripts/generate_lessons.py
-# pylint: disable=broad-exception-caught,logging-fstring-interpolation,line-too-long
+# pylint: disable=broad-exception-caught,logging-fstring-interpolation,line-too-long,import-outside-toplevel
 """Generate lessons from the patterns folder."""
 import argparse
+import ast
+import functools
 import logging
 import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Tuple, List
-import httpx
+
+from ollama_pool import EndpointPool, load_endpoints
+from rag_chunker import chunk_name_for
+from run_journal import DONE, FAILED, JOURNAL_NAME, STARTED, RunJournal, atomic_write_text
+from shards import parse_shard, select_shard
+from summary_index_generator import estimate_tokens, locate_sections
 
 # --- Directory setup ---
 script_dir = Path(__file__).resolve().parent
@@ -76,25 +85,59 @@ def is_valid_lesson(text: str) -> bool:
     return all(re.search(pat, text, re.MULTILINE) for pat in REQUIRED_SECTIONS)
 
 
-def call_ollama_model(model: str, system_prompt: str, user_prompt: str) -> Optional[str]:
-    """Call the Ollama model and return the output."""
+@functools.lru_cache(maxsize=None)
+def load_httpx():
+    """
+    Import httpx on first use, or return None if it is not installed.
+    Deferred so runs that never reach the model (--help, dry runs, fully
+    incremental or validation-only runs) do not pay its import cost.
+    """
+    try:
+        import httpx
+    except ImportError:
+        return None
+    return httpx
+
+
+def call_ollama_model(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    pool: Optional[EndpointPool] = None
+) -> Optional[str]:
+    """
+    Call the Ollama model on the least-loaded endpoint of pool (a default
+    single-endpoint pool if none is given) and return the output. The endpoint's
+    own model, if set, overrides model.
+    """
+    httpx = load_httpx()
+    if httpx is None:
+        logging.error("The httpx package is required to call Ollama.")
+        return None
+    pool = pool or EndpointPool(load_endpoints([]))
     try:
-        response = httpx.post(
-            "http://localhost:11434/api/chat",
-            json={
-                "model": model,
-                "stream": True,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user",   "content": user_prompt},
-                ],
-            },
-            timeout=120.0
-        )
+        # Only transport errors and 5xx responses count against the endpoint's health
+        with pool.lease() as endpoint:
+            response = httpx.post(
+                f"{endpoint.host}/api/chat",
+                json={
+                    "model": endpoint.model or model,
+                    "stream": True,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user",   "content": user_prompt},
+                    ],
+                },
+                timeout=120.0
+            )
+            if response.status_code >= 500:
+                response.raise_for_status()
+            lines = list(response.iter_lines())
+        # A 4xx (such as an unknown model) is the request's fault, not the endpoint's
         response.raise_for_status()
 
         full_output = []
-        for line in response.iter_lines():
+        for line in lines:
             if not line or line.strip() == '':
                 continue
             try:
@@ -111,68 +154,279 @@ def call_ollama_model(model: str, system_prompt: str, user_prompt: str) -> Optio
         return None
 
 
-def extract_title_and_category(path: Path) -> Tuple[str, str]:
-    """Extract the title and category of a file in the patterns directory."""
-    parts = path.relative_to(script_dir.parent / 'patterns').parts
+def extract_title_and_category(path: Path, source_dir: Optional[Path] = None) -> Tuple[str, str]:
+    """Extract the title and category of a file in the patterns (or source_dir) directory."""
+    parts = path.relative_to(source_dir or script_dir.parent / 'patterns').parts
     category = parts[0].capitalize() if parts else 'General'
     name = path.stem.replace('_', ' ').title()
     return name, category
 
 
-def generate_lessons(
-    source_dir: Path,
-    output_dir: Path,
-    model: str = "lesson-planner:latest"
-) -> None:
-    """Generate lessons from Python files."""
-    # Prepare output
-    if not output_dir.exists():
-        output_dir.mkdir(parents=True)
-    failures: List[Path] = []
+def build_full_prompt(name: str, category: str, code: str) -> str:
+    """User prompt carrying the complete pattern source."""
+    return f"""
+Below is the full implementation of the Python '{name}' pattern from the '{category}' category:
 
-    # Walk source patterns
-    py_files = sorted(source_dir.rglob("*.py"))
-    logging.info(f"Found {len(py_files)} Python pattern files in {source_dir}.")
+```python
+{code}
+```
 
-    for file_path in py_files:
-        name, category = extract_title_and_category(file_path)
-        filename = f"{category.lower()}_{file_path.stem}.md"
-        out_path = output_dir / filename
+Please generate a Markdown-based educational lesson as described in the system prompt.
+"""
 
-        # Skip if lesson already exists
-        if out_path.exists():
-            logging.info(f"Skipping existing lesson: {out_path.name}")
+
+# Function bodies with more statements than this are elided to '...' in skeletons
+SKELETON_MAX_BODY = 2
+
+
+def code_skeleton(code: str) -> str:
+    """
+    Return a skeleton of the code for compact prompts: no comments or docstrings
+    (the chunk already carries the docstrings), no embedded unittest classes, and
+    long function bodies elided. Short bodies and the __main__ demo are kept since
+    they show how the pattern is wired together. Falls back to the original code
+    if it does not parse.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code
+    ellipsis = ast.Expr(ast.Constant(...))
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
             continue
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            body = body[1:]
+        body = [
+            child for child in body
+            if not (isinstance(child, ast.ClassDef) and any(
+                isinstance(base, ast.Attribute) and base.attr == 'TestCase' for base in child.bases))
+        ]
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and len(body) > SKELETON_MAX_BODY:
+            body = [ellipsis]
+        # Keep bodies syntactically valid once the docstring is gone
+        node.body = body or [ellipsis]
+    return ast.unparse(tree)
+
+
+def build_compact_prompt(name: str, category: str, code: str, chunk_path: Path) -> Optional[str]:
+    """
+    User prompt built from an existing chunk: its summary and docstrings plus a
+    comment-stripped skeleton of the code. Returns None if the chunk is missing or
+    lacks a summary, so the caller can fall back to the full prompt.
+    """
+    if not chunk_path.is_file():
+        return None
+    data = chunk_path.read_bytes()
+    sections = locate_sections(data)
+    if 'summary' not in sections:
+        return None
 
-        logging.info(f"Generating lesson for {name} ({category})")
-        code = file_path.read_text(encoding="utf-8")
-        user_prompt = f"""
-Below is the full implementation of the Python '{name}' pattern from the '{category}' category:
+    def section(key: str) -> str:
+        span = sections.get(key)
+        return data[span['offset']:span['offset'] + span['length']].decode('utf-8') if span else ''
+
+    return f"""
+Summary of the Python '{name}' pattern from the '{category}' category:
+{section('summary')}
+
+Docstrings of its classes and functions:
+{section('docstrings')}
+
+Its code, without comments or docstrings:
 
 ```python
-{code}
+{code_skeleton(code)}
 ```
 
 Please generate a Markdown-based educational lesson as described in the system prompt.
 """
-        lesson = call_ollama_model(model, SYSTEM_PROMPT, user_prompt)
+
+
+def report_prompt_stats(stats: List[dict], mode: str, model: str, stats_file: Optional[Path]) -> None:
+    """Log prompt-token savings and lesson validity; optionally append them to stats_file."""
+    if not stats:
+        return
+    sent = sum(s['prompt_tokens'] for s in stats)
+    full = sum(s['full_prompt_tokens'] for s in stats)
+    valid = sum(1 for s in stats if s['valid'])
+    reduction = 100.0 * (full - sent) / full if full else 0.0
+    logging.info(
+        f"Prompt tokens ({mode}): {sent} sent vs {full} for full source ({reduction:.1f}% less); "
+        f"valid lessons {valid}/{len(stats)} attempts ({100.0 * valid / len(stats):.1f}%)"
+    )
+    if stats_file:
+        record = {
+            'ts': round(time.time(), 3), 'mode': mode, 'model': model, 'attempts': len(stats),
+            'valid': valid, 'prompt_tokens': sent, 'full_prompt_tokens': full,
+        }
+        with stats_file.open('a', encoding='utf-8') as fh:
+            fh.write(json.dumps(record) + '\n')
+
+
+def validate_lessons(source_dir: Path, output_dir: Path) -> List[Path]:
+    """Return the source files whose lesson is missing or fails validation."""
+    failures: List[Path] = []
+    for file_path in sorted(source_dir.rglob("*.py")):
+        out_path = output_dir / lesson_name_for(file_path, source_dir)
+        if not out_path.exists():
+            logging.warning(f"Missing lesson: {out_path.name}")
+            failures.append(file_path)
+        elif not is_valid_lesson(out_path.read_text(encoding="utf-8")):
+            logging.warning(f"Invalid lesson: {out_path.name}")
+            failures.append(file_path)
+    if failures:
+        logging.warning(f"{len(failures)} lesson(s) missing or invalid.")
+    else:
+        logging.info("All lessons are present and valid.")
+    return failures
+
+
+def lesson_name_for(file_path: Path, source_dir: Path) -> str:
+    """Lesson file name for a source file, e.g. 'creational_borg.md'."""
+    _, category = extract_title_and_category(file_path, source_dir)
+    return f"{category.lower()}_{file_path.stem}.md"
+
+
+def generate_lesson(
+    file_path: Path,
+    source_dir: Path,
+    output_dir: Path,
+    model: str = "lesson-planner:latest",
+    pool: Optional[EndpointPool] = None,
+    retries: int = 1,
+    chunks_dir: Optional[Path] = None,
+    stats: Optional[List[dict]] = None
+) -> bool:
+    """
+    Generate, validate and atomically write the lesson for one source file.
+    Prompt sizes and validity of each attempt are appended to stats if given.
+    Returns False if no attempt produced a valid lesson.
+    """
+    name, category = extract_title_and_category(file_path, source_dir)
+    out_path = output_dir / lesson_name_for(file_path, source_dir)
+    rel = file_path.relative_to(source_dir)
+    key = rel.as_posix()
+
+    logging.info(f"Generating lesson for {name} ({category})")
+    code = file_path.read_text(encoding="utf-8")
+    user_prompt = full_prompt = build_full_prompt(name, category, code)
+    if chunks_dir is not None:
+        compact = build_compact_prompt(name, category, code, chunks_dir / chunk_name_for(rel))
+        if compact is None:
+            logging.info(f"No usable chunk for {key}; sending the full source")
+        else:
+            user_prompt = compact
+    for _ in range(max(retries, 1)):
+        lesson = call_ollama_model(model, SYSTEM_PROMPT, user_prompt, pool)
+        valid = bool(lesson) and is_valid_lesson(lesson)
+        if stats is not None:
+            stats.append({
+                'prompt_tokens': estimate_tokens(user_prompt),
+                'full_prompt_tokens': estimate_tokens(full_prompt),
+                'valid': valid,
+            })
 
         # Validate before saving
-        if lesson and is_valid_lesson(lesson):
-            out_path.write_text(lesson, encoding="utf-8")
+        if valid:
+            atomic_write_text(out_path, lesson)
             logging.info(f"✅ Wrote lesson: {out_path.name}")
-        else:
-            logging.warning(f"❌ Invalid or empty lesson for {file_path.stem}")
-            failures.append(file_path)
+            return True
+        logging.warning(f"❌ Invalid or empty lesson for {file_path.stem}")
+    return False
+
+
+def generate_lessons(
+    source_dir: Path,
+    output_dir: Path,
+    model: str = "lesson-planner:latest",
+    dry_run: bool = False,
+    pool: Optional[EndpointPool] = None,
+    retries: int = 1,
+    resume: bool = False,
+    retry_failed: bool = False,
+    chunks_dir: Optional[Path] = None,
+    stats_file: Optional[Path] = None,
+    shard: Optional[Tuple[int, int]] = None
+) -> None:
+    """
+    Generate lessons from Python files, fanning requests out over the
+    endpoints of pool with one worker per endpoint slot.
+
+    Progress is journaled in output_dir; resume continues the last run and
+    retry_failed reprocesses only the lessons that failed or were interrupted.
+    With chunks_dir, prompts are built from each file's existing chunk instead
+    of its full source where possible. With shard (i, N), only slice i of N of
+    the source files is processed.
+    """
+    # Prepare output
+    if not output_dir.exists():
+        output_dir.mkdir(parents=True)
+    pool = pool or EndpointPool(load_endpoints([]))
+    journal = RunJournal(output_dir / JOURNAL_NAME)
+    fail_log = output_dir / 'failed_lessons.log'
+
+    # Walk source patterns
+    py_files = sorted(source_dir.rglob("*.py"))
+    logging.info(f"Found {len(py_files)} Python pattern files in {source_dir}.")
+    py_files = select_shard(py_files, source_dir, shard)
+
+    by_key = {f.relative_to(source_dir).as_posix(): f for f in py_files}
+    if retry_failed:
+        keys = set(journal.incomplete())
+        if fail_log.exists():
+            # Older runs only left the failure log, which lists source paths
+            logged = {Path(line.strip()).resolve() for line in fail_log.read_text(encoding='utf-8').splitlines() if line.strip()}
+            keys.update(k for k, f in by_key.items() if f.resolve() in logged)
+        py_files = [by_key[k] for k in sorted(keys) if k in by_key]
+        logging.info(f"Retrying {len(py_files)} failed or incomplete lesson(s).")
+    elif resume and journal.planned:
+        py_files = [by_key[k] for k in journal.remaining() if k in by_key]
+        logging.info(f"Resuming: {len(py_files)} of {len(journal.planned)} planned lesson(s) not finished.")
+    if not dry_run:
+        journal.begin_run([f.relative_to(source_dir).as_posix() for f in py_files])
+    # One entry per model call; list.append is atomic, so workers share it safely
+    stats: List[dict] = []
+
+    def generate_one(file_path: Path) -> bool:
+        """Generate and validate one lesson; returns False if it failed."""
+        name, category = extract_title_and_category(file_path, source_dir)
+        filename = lesson_name_for(file_path, source_dir)
+        out_path = output_dir / filename
+        key = file_path.relative_to(source_dir).as_posix()
+
+        # Skip if lesson already exists, unless a failed or interrupted attempt left it
+        if out_path.exists() and not retry_failed and journal.state(key) not in (STARTED, FAILED):
+            logging.info(f"Skipping existing lesson: {out_path.name}")
+            return True
+
+        if dry_run:
+            logging.info(f"Would generate lesson for {name} ({category})")
+            return True
+
+        journal.record(key, STARTED)
+        if generate_lesson(file_path, source_dir, output_dir, model, pool, retries, chunks_dir, stats):
+            journal.record(key, DONE, output=filename)
+            return True
+        journal.record(key, FAILED, attempts=max(retries, 1))
+        return False
+
+    with journal, ThreadPoolExecutor(max_workers=pool.capacity) as executor:
+        outcomes = list(executor.map(generate_one, py_files))
+    failures: List[Path] = [f for f, ok in zip(py_files, outcomes) if not ok]
+    if len(pool.endpoints) > 1 and not dry_run:
+        logging.info("Endpoint usage:\n" + pool.summary())
+    report_prompt_stats(stats, 'compact' if chunks_dir is not None else 'full', model, stats_file)
 
     # Log failures
     if failures:
-        fail_log = output_dir / 'failed_lessons.log'
-        with fail_log.open('w', encoding='utf-8') as lf:
-            for p in failures:
-                lf.write(p.as_posix() + '\n')
+        atomic_write_text(fail_log, ''.join(p.as_posix() + '\n' for p in failures))
         logging.warning(f"{len(failures)} lessons failed; see {fail_log}")
     else:
+        if fail_log.exists() and not dry_run:
+            fail_log.unlink()
         logging.info("All lessons generated successfully.")
 
 
@@ -200,12 +454,79 @@ def main() -> None:
         default='lesson-planner:latest',
         help='Ollama model to use (default: lesson-planner:latest)'
     )
+    parser.add_argument(
+        '--endpoint',
+        action='append', default=[],
+        help='Ollama endpoint as HOST[,model=NAME][,weight=N][,concurrency=N]; repeat for a pool'
+    )
+    parser.add_argument(
+        '--endpoints-file',
+        default=None,
+        help='JSON list of endpoints ({"host", "model", "weight", "concurrency"})'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int, default=1,
+        help='Attempts per lesson before it is logged as failed'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='List the lessons that would be generated without calling the model'
+    )
+    parser.add_argument(
+        '--compact-prompt',
+        action='store_true',
+        help='Build prompts from existing chunks (summary, docstrings, comment-free code) instead of full sources'
+    )
+    parser.add_argument(
+        '--chunks',
+        default=str(project_root / 'chunks'),
+        help='Directory of Markdown chunks used by --compact-prompt'
+    )
+    parser.add_argument(
+        '--prompt-stats',
+        default=None,
+        help='Append prompt-token and validity figures for this run to a JSON-lines file'
+    )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard, default=None, metavar='I/N',
+        help='Only process slice I of N (1-based) of the source files, partitioned by path hash'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue the last run from its journal, skipping lessons it finished'
+    )
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Regenerate only the lessons that failed or were interrupted'
+    )
+    parser.add_argument(
+        '--validate-only',
+        action='store_true',
+        help='Check existing lessons for required sections without generating anything'
+    )
     args = parser.parse_args()
 
+    if args.validate_only:
+        failures = validate_lessons(Path(args.source), Path(args.output))
+        raise SystemExit(1 if failures else 0)
+
     generate_lessons(
         source_dir=Path(args.source),
         output_dir=Path(args.output),
-        model=args.model
+        model=args.model,
+        dry_run=args.dry_run,
+        pool=EndpointPool(load_endpoints(args.endpoint, args.endpoints_file)),
+        retries=args.retries,
+        resume=args.resume,
+        retry_failed=args.retry_failed,
+        chunks_dir=Path(args.chunks) if args.compact_prompt else None,
+        stats_file=Path(args.prompt_stats) if args.prompt_stats else None,
+        shard=args.shard
     )
 
 if __name__ == '__main__':
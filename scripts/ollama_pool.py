@@ -0,0 +1,185 @@
+# Path: scripts/ollama_pool.py
+# pylint: disable=logging-fstring-interpolation
+"""
+A pool of Ollama endpoints shared by the generation scripts.
+
+Each endpoint has its own host, optional model override, weight and number of
+concurrent request slots. Requests are routed to the least-loaded healthy endpoint
+(in-flight requests divided by weight). Endpoints that fail repeatedly are drained
+for a cool-down period, then receive a single probe request before rejoining.
+
+Endpoint specs look like:
+    http://gpu1:11434
+    http://gpu2:11434,model=falcon3:7b,weight=2,concurrency=2
+or a JSON file holding a list of {"host", "model", "weight", "concurrency"} objects.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+DEFAULT_HOST = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
+# Consecutive failures before an endpoint is drained
+MAX_FAILURES = 3
+# Seconds a drained endpoint is left alone before it is probed again
+COOLDOWN = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_host(host: str) -> str:
+    """Add the http:// scheme and drop a trailing slash, as the ollama client does."""
+    host = host.strip().rstrip('/')
+    return host if '://' in host else f'http://{host}'
+
+
+@dataclass
+class Endpoint:
+    """One Ollama server and its live load and health counters."""
+    host: str
+    model: Optional[str] = None
+    weight: float = 1.0
+    concurrency: int = 1
+    in_flight: int = 0
+    completed: int = 0
+    failures: int = 0
+    drained_until: float = 0.0
+    probing: bool = False
+
+    def available(self, now: float) -> bool:
+        """True if the endpoint may take another request right now."""
+        if self.drained_until > now or self.probing:
+            return False
+        if self.drained_until:
+            # Cool-down over: allow exactly one probe request
+            return self.in_flight == 0
+        return self.in_flight < self.concurrency
+
+    def load(self) -> float:
+        """Weighted load used to pick the least-loaded endpoint."""
+        return (self.in_flight + 1) / self.weight
+
+    def __str__(self) -> str:
+        return self.host if not self.model else f"{self.host} ({self.model})"
+
+
+def parse_endpoint(spec: str) -> Endpoint:
+    """Parse 'HOST[,model=NAME][,weight=N][,concurrency=N]' into an Endpoint."""
+    host, *options = [part.strip() for part in spec.split(',')]
+    endpoint = Endpoint(host=normalize_host(host))
+    for option in options:
+        key, sep, value = option.partition('=')
+        if not sep:
+            raise ValueError(f"Expected key=value in endpoint spec, got '{option}'")
+        if key == 'model':
+            endpoint.model = value
+        elif key == 'weight':
+            endpoint.weight = float(value)
+        elif key == 'concurrency':
+            endpoint.concurrency = int(value)
+        else:
+            raise ValueError(f"Unknown endpoint option '{key}'")
+    if endpoint.weight <= 0 or endpoint.concurrency < 1:
+        raise ValueError(f"Endpoint {host} needs weight > 0 and concurrency >= 1")
+    return endpoint
+
+
+def load_endpoints(specs: List[str], endpoints_file: Optional[str] = None) -> List[Endpoint]:
+    """Build endpoints from --endpoint specs and/or a JSON file; defaults to DEFAULT_HOST."""
+    endpoints = [parse_endpoint(spec) for spec in specs]
+    if endpoints_file:
+        for item in json.loads(Path(endpoints_file).read_text(encoding='utf-8')):
+            spec = ','.join(
+                [item['host']] + [f"{k}={item[k]}" for k in ('model', 'weight', 'concurrency') if item.get(k)]
+            )
+            endpoints.append(parse_endpoint(spec))
+    return endpoints or [Endpoint(host=normalize_host(DEFAULT_HOST))]
+
+
+class EndpointPool:
+    """Thread-safe least-loaded routing with failure draining across endpoints."""
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        max_failures: int = MAX_FAILURES,
+        cooldown: float = COOLDOWN
+    ) -> None:
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self._endpoints = endpoints
+        self._max_failures = max_failures
+        self._cooldown = cooldown
+        self._cond = threading.Condition()
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        """The pooled endpoints."""
+        return list(self._endpoints)
+
+    @property
+    def capacity(self) -> int:
+        """Total concurrent request slots, a sensible worker count for callers."""
+        return sum(e.concurrency for e in self._endpoints)
+
+    def acquire(self) -> Endpoint:
+        """Block until an endpoint has a free slot, then reserve it."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready = [e for e in self._endpoints if e.available(now)]
+                if ready:
+                    endpoint = min(ready, key=lambda e: (e.load(), e.completed / e.weight))
+                    if endpoint.drained_until:
+                        endpoint.probing = True
+                    endpoint.in_flight += 1
+                    return endpoint
+                # Wake on release, or when the next drained endpoint may be probed
+                waits = [e.drained_until - now for e in self._endpoints if e.drained_until > now]
+                self._cond.wait(timeout=min(waits) if waits else None)
+
+    def release(self, endpoint: Endpoint, ok: bool) -> None:
+        """Return a slot and record whether the request reached a working server."""
+        with self._cond:
+            endpoint.in_flight -= 1
+            endpoint.probing = False
+            if ok:
+                if endpoint.drained_until:
+                    logger.info(f"Endpoint {endpoint} recovered")
+                endpoint.completed += 1
+                endpoint.failures = 0
+                endpoint.drained_until = 0.0
+            else:
+                endpoint.failures += 1
+                if endpoint.failures >= self._max_failures:
+                    endpoint.drained_until = time.monotonic() + self._cooldown
+                    logger.warning(
+                        f"Draining endpoint {endpoint} for {self._cooldown:.0f}s "
+                        f"after {endpoint.failures} consecutive failures"
+                    )
+            self._cond.notify_all()
+
+    @contextmanager
+    def lease(self) -> Iterator[Endpoint]:
+        """Acquire an endpoint for one request; an exception counts as a failure."""
+        endpoint = self.acquire()
+        ok = False
+        try:
+            yield endpoint
+            ok = True
+        finally:
+            self.release(endpoint, ok)
+
+    def summary(self) -> str:
+        """One line per endpoint with its completed requests and health."""
+        now = time.monotonic()
+        return '\n'.join(
+            f"  {e}: {e.completed} completed, "
+            f"{'drained' if e.drained_until > now else 'healthy'}"
+            for e in self._endpoints
+        )
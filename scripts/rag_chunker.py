@@ -1,16 +1,21 @@
 # Path: scripts/rag_chunker.py
-# pylint: disable=broad-exception-caught,logging-fstring-interpolation,line-too-long
+# pylint: disable=broad-exception-caught,logging-fstring-interpolation,line-too-long,import-outside-toplevel
 """Script to generate a Markdown summary of python design patterns for us in RAG systems."""
 import sys
 import argparse
+import functools
 import json
 import logging
 import time
 import subprocess
 from typing import Optional, Tuple, List
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import ollama
+
+from ollama_pool import EndpointPool, load_endpoints
+from run_journal import DONE, FAILED, JOURNAL_NAME, STARTED, RunJournal, atomic_write_text
+from shards import parse_shard, select_shard
 
 # --- Directory setup ---
 script_dir = Path(__file__).resolve().parent
@@ -27,6 +32,21 @@ def setup_logging():
 
 logger = setup_logging()
 
+
+@functools.lru_cache(maxsize=None)
+def load_ollama():
+    """
+    Import the ollama client on first use, or return None if it is not installed.
+    Deferred because ollama pulls in pydantic and httpx, which dominate startup time
+    for runs that never call the model (--help, dry runs, fully incremental runs).
+    """
+    try:
+        import ollama
+    except ImportError:
+        return None
+    return ollama
+
+
 # System prompt for structured JSON output
 def get_system_prompt() -> str:
     """Returns a system prompt for the AI to use to generate a structured JSON output."""
@@ -38,26 +58,39 @@ def get_system_prompt() -> str:
     )
 
 
+@functools.lru_cache(maxsize=None)
+def get_client(host: str):
+    """Return a cached ollama client for one endpoint host."""
+    return load_ollama().Client(host=host)
+
+
 def annotate_code(
     code: str,
-    model: str
+    model: str,
+    pool: Optional[EndpointPool] = None
 ) -> Optional[Tuple[str, List[str]]]:
     """
     Call Ollama chat API once to annotate the Python code.
+    The request goes to the least-loaded endpoint of pool (a default single-endpoint
+    pool if none is given); the endpoint's own model, if set, overrides model.
     Returns a tuple (summary, docstrings) on success, or None on failure.
     """
-    if ollama is None or not hasattr(ollama, 'chat'):
+    ollama = load_ollama()
+    if ollama is None or not hasattr(ollama, 'Client'):
         logger.error("Ollama package with chat API is required.")
         return None
+    pool = pool or EndpointPool(load_endpoints([]))
 
     try:
-        resp = ollama.chat(
-            model=model,
-            messages=[
-                {"role": "system", "content": get_system_prompt()},
-                {"role": "user",   "content": code},
-            ]
-        )
+        # Only transport errors inside the lease count against the endpoint's health
+        with pool.lease() as endpoint:
+            resp = get_client(endpoint.host).chat(
+                model=endpoint.model or model,
+                messages=[
+                    {"role": "system", "content": get_system_prompt()},
+                    {"role": "user",   "content": code},
+                ]
+            )
         content = resp.get('message', {}).get('content', '').strip()
         if not content.startswith('{'):
             start = content.find('{')
@@ -85,7 +118,7 @@ def write_chunk(
     Write the annotated chunk to Markdown and return its path.
     """
     rel = file_path.relative_to(source_dir)
-    chunk_name = rel.with_suffix('').as_posix().replace('/', '_').replace('\\', '_') + '.md'
+    chunk_name = chunk_name_for(rel)
     out_path = output_dir / chunk_name
 
     front = f"---\nfile: {rel.as_posix()}\nchunk: {chunk_name}\n---\n\n"
@@ -93,7 +126,7 @@ def write_chunk(
     summary_md = f"## Summary\n{summary}\n\n"
     doc_md = "## Docstrings\n" + ''.join(f"- {d}\n" for d in docstrings) + "\n"
 
-    out_path.write_text(front + code_block + summary_md + doc_md, encoding='utf-8')
+    atomic_write_text(out_path, front + code_block + summary_md + doc_md)
     logger.info(f"Wrote chunk: {out_path}")
     return out_path
 
@@ -113,7 +146,99 @@ def validate_chunk(md_path: Path) -> list:
     return missing
 
 
-def generate_index(chunks_dir: Path, index_file: Path):
+def chunk_name_for(rel: Path) -> str:
+    """Chunk file name for a source path relative to the source directory."""
+    return rel.with_suffix('').as_posix().replace('/', '_').replace('\\', '_') + '.md'
+
+
+def annotate_file(
+    file_path: Path,
+    source_dir: Path,
+    output_dir: Path,
+    model: str,
+    pool: Optional[EndpointPool] = None,
+    retries: int = 3,
+    delay: float = 1.0) -> bool:
+    """
+    Annotate one source file and write its chunk, retrying until the chunk
+    validates. Returns False if every attempt failed.
+    """
+    rel = file_path.relative_to(source_dir)
+    logger.info(f"Processing {rel}")
+    attempt = 1
+    while attempt <= retries:
+        result = annotate_code(file_path.read_text(encoding='utf-8'), model, pool)
+        if result:
+            summary, docstrings = result
+            md_path = write_chunk(file_path, summary, docstrings, output_dir, source_dir)
+            missing = validate_chunk(md_path)
+            if not missing:
+                return True
+            logger.warning(f"{rel} attempt {attempt}: missing {missing}")
+        else:
+            logger.warning(f"{rel} attempt {attempt}: no annotation result")
+        attempt += 1
+        time.sleep(delay)
+
+    logger.error(f"Failed to process {file_path} after {retries} attempts")
+    return False
+
+
+def validate_existing(py_files: List[Path], source_dir: Path, output_dir: Path) -> int:
+    """
+    Validate the existing chunk of every source file. Returns 0 if all are present
+    and complete, 1 otherwise.
+    """
+    problems = 0
+    for file_path in py_files:
+        rel = file_path.relative_to(source_dir)
+        chunk_name = chunk_name_for(rel)
+        md_path = output_dir / chunk_name
+        if not md_path.exists():
+            logger.warning(f"Missing chunk: {chunk_name}")
+            problems += 1
+            continue
+        missing = validate_chunk(md_path)
+        if missing:
+            logger.warning(f"{chunk_name}: missing {missing}")
+            problems += 1
+    if problems:
+        logger.warning(f"{problems} chunk(s) missing or incomplete.")
+    else:
+        logger.info("All chunks are present and complete.")
+    return 1 if problems else 0
+
+
+def select_targets(
+    py_files: List[Path],
+    source_dir: Path,
+    journal: RunJournal,
+    failures_log: Path,
+    resume: bool,
+    retry_failed: bool) -> List[Path]:
+    """
+    Pick the files to process: everything (the default), what the last run left
+    unfinished (resume), or exactly the failed and interrupted files (retry_failed).
+    """
+    by_key = {f.relative_to(source_dir).as_posix(): f for f in py_files}
+    if retry_failed:
+        keys = set(journal.incomplete())
+        if failures_log.exists():
+            keys.update(line.strip() for line in failures_log.read_text(encoding='utf-8').splitlines() if line.strip())
+        targets = [by_key[k] for k in sorted(keys) if k in by_key]
+        logger.info(f"Retrying {len(targets)} failed or incomplete file(s).")
+        return targets
+    if resume:
+        if not journal.planned:
+            logger.info("No previous run in the journal; processing all files.")
+            return py_files
+        targets = [by_key[k] for k in journal.remaining() if k in by_key]
+        logger.info(f"Resuming: {len(targets)} of {len(journal.planned)} planned file(s) not finished.")
+        return targets
+    return py_files
+
+
+def generate_index(chunks_dir: Path, index_file: Path, source_dir: Path):
     """
     Invoke the summary_index_generator to build the JSON index.
     """
@@ -125,7 +250,8 @@ def generate_index(chunks_dir: Path, index_file: Path):
         sys.executable,
         str(index_script),
         str(chunks_dir),
-        str(index_file)
+        str(index_file),
+        '--source', str(source_dir)
     ], check=False)
     if result.returncode == 0:
         logger.info(f"Summary index created at {index_file}")
@@ -156,13 +282,38 @@ def main():
         type=float, default=1.0,
         help='Seconds to wait between retries')
     parser.add_argument('--index',
-        default=str(project_root / 'summary_index.json'),
-        help='Path for the summary JSON index')
+        default=None,
+        help='Path for the summary JSON index (default: summary_index.json, or OUTPUT/summary_index.json with --shard)')
+    parser.add_argument('--shard',
+        type=parse_shard, default=None, metavar='I/N',
+        help='Only process slice I of N (1-based) of the source files, partitioned by path hash')
+    parser.add_argument('--endpoint',
+        action='append', default=[],
+        help='Ollama endpoint as HOST[,model=NAME][,weight=N][,concurrency=N]; repeat for a pool')
+    parser.add_argument('--endpoints-file',
+        default=None,
+        help='JSON list of endpoints ({"host", "model", "weight", "concurrency"})')
+    parser.add_argument('--dry-run',
+        action='store_true',
+        help='List the files that would be annotated without calling the model')
+    parser.add_argument('--resume',
+        action='store_true',
+        help='Continue the last run from its journal, skipping files it finished')
+    parser.add_argument('--retry-failed',
+        action='store_true',
+        help='Reprocess only the files that failed or were interrupted')
+    parser.add_argument('--validate-only',
+        action='store_true',
+        help='Check existing chunks for missing sections without generating anything')
     args = parser.parse_args()
 
     source_dir = Path(args.source)
     output_dir = Path(args.output)
-    index_file = Path(args.index)
+    if args.index:
+        index_file = Path(args.index)
+    else:
+        # A shard's partial index must not overwrite the canonical one
+        index_file = output_dir / 'summary_index.json' if args.shard else project_root / 'summary_index.json'
     failures_log = output_dir / 'failed_chunks.log'
 
     # Ensure the output directory exists; do not delete existing files
@@ -170,51 +321,61 @@ def main():
 
     py_files = sorted(source_dir.rglob('*.py'))
     logger.info(f"Found {len(py_files)} Python files to process in {source_dir}.")
+    py_files = select_shard(py_files, source_dir, args.shard)
 
-    failures = []
-    for file_path in py_files:
+    if args.validate_only:
+        sys.exit(validate_existing(py_files, source_dir, output_dir))
+
+    pool = EndpointPool(load_endpoints(args.endpoint, args.endpoints_file))
+    journal = RunJournal(output_dir / JOURNAL_NAME)
+    targets = select_targets(py_files, source_dir, journal, failures_log, args.resume, args.retry_failed)
+    if not args.dry_run:
+        journal.begin_run([f.relative_to(source_dir).as_posix() for f in targets])
+
+    def process_file(file_path: Path) -> bool:
+        """Annotate one file with retries; returns False if it ultimately failed."""
         rel = file_path.relative_to(source_dir)
-        chunk_name = rel.with_suffix('').as_posix().replace('/', '_').replace('\\', '_') + '.md'
+        key = rel.as_posix()
+        chunk_name = chunk_name_for(rel)
         md_path = output_dir / chunk_name
 
-        if md_path.exists():
+        # A chunk left behind by a failed or interrupted attempt is not trusted
+        if md_path.exists() and not args.retry_failed and journal.state(key) not in (STARTED, FAILED):
             logger.info(f"Skipping existing chunk: {chunk_name}")
-            continue
+            return True
+
+        if args.dry_run:
+            logger.info(f"Would process {rel}")
+            return True
 
-        logger.info(f"Processing {rel}")
-        attempt = 1
-        success = False
-        while attempt <= args.retries:
-            result = annotate_code(file_path.read_text(encoding='utf-8'), args.model)
-            if result:
-                summary, docstrings = result
-                md_path = write_chunk(file_path, summary, docstrings, output_dir, source_dir)
-                missing = validate_chunk(md_path)
-                if not missing:
-                    success = True
-                    break
-                else:
-                    logger.warning(f"Attempt {attempt}: missing {missing}")
-            else:
-                logger.warning(f"Attempt {attempt}: no annotation result")
-            attempt += 1
-            time.sleep(args.delay)
-
-        if not success:
-            failures.append(file_path.relative_to(source_dir))
-            logger.error(f"Failed to process {file_path} after {args.retries} attempts")
+        journal.record(key, STARTED)
+        if annotate_file(file_path, source_dir, output_dir, args.model, pool, args.retries, args.delay):
+            journal.record(key, DONE, output=chunk_name)
+            return True
+        journal.record(key, FAILED, attempts=args.retries)
+        return False
+
+    # One worker per endpoint slot so every GPU box stays busy
+    with journal, ThreadPoolExecutor(max_workers=pool.capacity) as executor:
+        outcomes = list(executor.map(process_file, targets))
+    failures = [f.relative_to(source_dir) for f, ok in zip(targets, outcomes) if not ok]
+    if len(pool.endpoints) > 1 and not args.dry_run:
+        logger.info("Endpoint usage:\n" + pool.summary())
 
     # Write failures log if any
     if failures:
-        with failures_log.open('w', encoding='utf-8') as lf:
-            for f in failures:
-                lf.write(f"{f.as_posix()}\n")
+        atomic_write_text(failures_log, ''.join(f"{f.as_posix()}\n" for f in failures))
         logger.warning(f"{len(failures)} file(s) failed; see {failures_log}")
     else:
+        if failures_log.exists() and not args.dry_run:
+            failures_log.unlink()
         logger.info("All files processed successfully.")
 
+    if args.dry_run:
+        return
+
     # Generate summary index
-    generate_index(output_dir, index_file)
+    generate_index(output_dir, index_file, source_dir)
 
     sys.exit(1 if failures else 0)
 
@@ -0,0 +1,125 @@
+# Path: scripts/run_journal.py
+"""
+Crash-safe bookkeeping for the generation scripts.
+
+A RunJournal is an append-only JSON-lines file next to the outputs. Each run starts
+with a 'run' record listing the files it plans to process, and every file then moves
+through 'started' -> 'done' or 'failed'. Each record is flushed and fsynced before
+the next step, so after a crash the journal tells exactly which files finished,
+which failed and which were cut off mid-way. Outputs are written with
+atomic_write_text, so a file on disk is always either complete or absent.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+JOURNAL_NAME = '.run_journal.jsonl'
+
+STARTED = 'started'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = 'utf-8') -> None:
+    """Write text to a temp file in the same directory, fsync it, then rename it over path."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, newline='') as fh:
+            fh.write(text)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def read_journal(path: Path) -> Tuple[List[str], Dict[str, dict]]:
+    """
+    Replay a journal. Returns (files planned by the last run, latest record per file).
+    A torn final line from a crash is ignored.
+    """
+    planned: List[str] = []
+    states: Dict[str, dict] = {}
+    if not path.is_file():
+        return planned, states
+    with path.open(encoding='utf-8') as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('event') == 'run':
+                planned = record.get('files', [])
+            elif record.get('event') == 'file':
+                states[record['key']] = record
+    return planned, states
+
+
+class RunJournal:
+    """Append-only, thread-safe record of per-file state transitions."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.planned, self.states = read_journal(path)
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def state(self, key: str) -> Optional[str]:
+        """Latest recorded state of key, or None if it was never journaled."""
+        record = self.states.get(key)
+        return record['state'] if record else None
+
+    def incomplete(self) -> List[str]:
+        """Files whose latest state is 'failed' or a 'started' that never finished."""
+        return sorted(k for k, r in self.states.items() if r['state'] in (STARTED, FAILED))
+
+    def remaining(self) -> List[str]:
+        """Files of the last run's plan that have not reached 'done', in plan order."""
+        return [k for k in self.planned if self.state(k) != DONE]
+
+    def begin_run(self, files: List[str], compact: bool = True) -> None:
+        """
+        Record the start of a run and the files it plans to process. With compact,
+        the journal is first rewritten to hold only the latest record per file.
+        """
+        with self._lock:
+            if compact and self.path.exists():
+                lines = ''.join(json.dumps(r) + '\n' for r in self.states.values())
+                atomic_write_text(self.path, lines)
+            self.planned = list(files)
+        self._append({'event': 'run', 'files': self.planned})
+
+    def record(self, key: str, state: str, **extra) -> None:
+        """Durably append a state transition for key."""
+        record = {'event': 'file', 'key': key, 'state': state, **extra}
+        self._append(record)
+        with self._lock:
+            self.states[key] = record
+
+    def _append(self, record: dict) -> None:
+        record = {'ts': round(time.time(), 3), **record}
+        with self._lock:
+            if self._fh is None:
+                self._fh = self.path.open('a', encoding='utf-8')
+            self._fh.write(json.dumps(record) + '\n')
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def __enter__(self) -> 'RunJournal':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
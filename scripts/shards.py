@@ -0,0 +1,227 @@
+# Path: scripts/shards.py
+# pylint: disable=logging-fstring-interpolation,line-too-long
+"""
+Split a build across machines or processes and merge the results.
+
+rag_chunker.py and generate_lessons.py accept --shard i/N (1-based) and then only
+process the source files whose path hashes into slice i of N. The hash is taken
+over the path relative to the source directory, so every machine computes the same
+disjoint partition regardless of where the checkout lives or its Python hash seed.
+
+Each shard writes into its own directory, for example:
+
+    python scripts/rag_chunker.py --shard 1/2 --output build/shard-1/chunks
+    python scripts/generate_lessons.py --shard 1/2 --output build/shard-1/docs
+    (and the same with 2/2 into build/shard-2 elsewhere)
+
+The merge command then combines the shards' chunks, lessons, failure logs and
+summary indexes into the canonical chunks/, docs/ and summary_index.json:
+
+    python scripts/shards.py merge build/shard-1 build/shard-2
+    python scripts/shards.py plan 4      # show which files each of 4 shards gets
+"""
+import argparse
+import hashlib
+import json
+import logging
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import build_doc_index
+from run_journal import atomic_write_text
+from summary_index_generator import build_entry, save_json
+
+# --- Directory setup ---
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+
+CHUNK_FAILURES = 'failed_chunks.log'
+LESSON_FAILURES = 'failed_lessons.log'
+# Written by the docs index builder, never copied between shards
+DOCS_GENERATED = {'index.md'}
+
+
+def setup_logging():
+    """Sets up logging with a basic configuration."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(levelname)s: %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+logger = setup_logging()
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse 'i/N' (1 <= i <= N) into (i, N); raises argparse.ArgumentTypeError otherwise."""
+    index, sep, count = spec.partition('/')
+    try:
+        i, n = int(index), int(count)
+    except ValueError:
+        i, n = 0, 0
+    if not sep or n < 1 or not 1 <= i <= n:
+        raise argparse.ArgumentTypeError(f"Expected a shard as i/N with 1 <= i <= N, got '{spec}'")
+    return i, n
+
+
+def shard_of(key: str, count: int) -> int:
+    """1-based shard that owns key, stable across machines and interpreter runs."""
+    digest = hashlib.sha256(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def select_shard(files: List[Path], source_dir: Path, shard: Optional[Tuple[int, int]]) -> List[Path]:
+    """Keep the files of files (in their order) owned by shard; all of them if shard is None."""
+    if shard is None:
+        return files
+    i, n = shard
+    selected = [f for f in files if shard_of(f.relative_to(source_dir).as_posix(), n) == i]
+    logger.info(f"Shard {i}/{n}: {len(selected)} of {len(files)} file(s).")
+    return selected
+
+
+def collect_outputs(src_dirs: List[Path], skip: frozenset = frozenset()) -> Dict[str, Path]:
+    """
+    Map each Markdown file name found in the shards' output directories to its source.
+    Checked before anything is copied: two shards producing different content for one
+    name means they were not built from the same partition.
+    """
+    found: Dict[str, Path] = {}
+    for src_dir in src_dirs:
+        if not src_dir.is_dir():
+            continue
+        for src in sorted(src_dir.glob('*.md')):
+            if src.name in skip:
+                continue
+            if src.name in found and found[src.name].read_bytes() != src.read_bytes():
+                raise ValueError(f"{src.name} differs between shards {found[src.name].parent} and {src.parent}")
+            found.setdefault(src.name, src)
+    return found
+
+
+def copy_outputs(found: Dict[str, Path], dest_dir: Path) -> List[Path]:
+    """Copy the collected files into dest_dir, each through a temp file and rename."""
+    copied = []
+    for name, src in sorted(found.items()):
+        dest = dest_dir / name
+        tmp = dest.with_name(f'.{name}.tmp')
+        shutil.copy2(src, tmp)
+        tmp.replace(dest)
+        copied.append(dest)
+    return copied
+
+
+def merge_failure_logs(logs: List[Path], dest: Path) -> int:
+    """Write the union of the shards' failure logs to dest (removing it if none failed)."""
+    lines = set()
+    for log in logs:
+        if log.is_file():
+            lines.update(line.strip() for line in log.read_text(encoding='utf-8').splitlines() if line.strip())
+    if lines:
+        atomic_write_text(dest, ''.join(f"{line}\n" for line in sorted(lines)))
+    elif dest.exists():
+        dest.unlink()
+    return len(lines)
+
+
+def merge_indexes(index_path: Path, shard_indexes: List[Path], chunk_files: List[Path]) -> List[Dict[str, Any]]:
+    """
+    Merge the shards' summary index entries into index_path. Entries for chunks
+    copied by this merge replace the existing ones; a chunk without a matching shard
+    entry (or whose hash no longer matches) is indexed from the copied file.
+    """
+    try:
+        merged = {e['chunk']: e for e in json.loads(index_path.read_text(encoding='utf-8'))}
+    except (OSError, ValueError):
+        merged = {}
+    from_shards: Dict[str, Dict[str, Any]] = {}
+    for path in shard_indexes:
+        if path.is_file():
+            for entry in json.loads(path.read_text(encoding='utf-8')):
+                from_shards[entry['chunk']] = entry
+
+    for chunk in chunk_files:
+        entry = from_shards.get(chunk.name)
+        if entry is None or entry.get('sha256') != hashlib.sha256(chunk.read_bytes()).hexdigest():
+            entry = build_entry(chunk)
+        merged[entry['chunk']] = entry
+
+    index = [merged[name] for name in sorted(merged)]
+    save_json(index, index_path)
+    return index
+
+
+def merge_shards(shard_dirs: List[Path], chunks_dir: Path, docs_dir: Path, index_path: Path) -> int:
+    """
+    Combine shard directories (each holding chunks/, docs/ and summary_index.json,
+    all optional) into the canonical outputs. Returns the number of failed files.
+    """
+    chunks_dir.mkdir(parents=True, exist_ok=True)
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    found_chunks = collect_outputs([s / 'chunks' for s in shard_dirs])
+    found_lessons = collect_outputs([s / 'docs' for s in shard_dirs], frozenset(DOCS_GENERATED))
+    chunks = copy_outputs(found_chunks, chunks_dir)
+    lessons = copy_outputs(found_lessons, docs_dir)
+    logger.info(f"Merged {len(chunks)} chunk(s) and {len(lessons)} lesson(s) from {len(shard_dirs)} shard(s).")
+
+    failed = merge_failure_logs([s / 'chunks' / CHUNK_FAILURES for s in shard_dirs], chunks_dir / CHUNK_FAILURES)
+    failed += merge_failure_logs([s / 'docs' / LESSON_FAILURES for s in shard_dirs], docs_dir / LESSON_FAILURES)
+    if failed:
+        logger.warning(f"{failed} file(s) failed across shards; see {CHUNK_FAILURES} and {LESSON_FAILURES}.")
+
+    if chunks:
+        index = merge_indexes(index_path, [s / 'chunks' / 'summary_index.json' for s in shard_dirs]
+                              + [s / 'summary_index.json' for s in shard_dirs], chunks)
+        logger.info(f"Summary index saved to: {index_path} ({len(index)} entries)")
+    if lessons:
+        build_doc_index.build_index(docs_dir, docs_dir / 'index.md')
+    return failed
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Plan and merge sharded chunk and lesson builds.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    plan = commands.add_parser('plan', help='List the source files each shard would process')
+    plan.add_argument('count', type=int, help='Number of shards')
+    plan.add_argument('--source', default=str(project_root / 'patterns'),
+        help='Directory of Python source patterns')
+
+    merge = commands.add_parser('merge', help='Combine shard outputs into the canonical outputs')
+    merge.add_argument('shards', nargs='+',
+        help='Shard directories, each with chunks/, docs/ and/or summary_index.json')
+    merge.add_argument('--chunks', default=str(project_root / 'chunks'),
+        help='Canonical chunks directory')
+    merge.add_argument('--docs', default=str(project_root / 'docs'),
+        help='Canonical docs directory')
+    merge.add_argument('--index', default=str(project_root / 'summary_index.json'),
+        help='Canonical summary JSON index')
+    args = parser.parse_args()
+
+    if args.command == 'plan':
+        source_dir = Path(args.source)
+        files = sorted(source_dir.rglob('*.py'))
+        for i in range(1, max(args.count, 1) + 1):
+            print(f"Shard {i}/{args.count}:")
+            for f in select_shard(files, source_dir, (i, args.count)):
+                print(f"  {f.relative_to(source_dir).as_posix()}")
+        return
+
+    shard_dirs = [Path(s) for s in args.shards]
+    missing = [s for s in shard_dirs if not s.is_dir()]
+    if missing:
+        logger.error(f"Not a directory: {', '.join(map(str, missing))}")
+        sys.exit(1)
+    try:
+        failed = merge_shards(shard_dirs, Path(args.chunks), Path(args.docs), Path(args.index))
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,29 @@
 """Script to generate a summary index file based on the contents of Markdown files."""
 # pylint: disable=logging-fstring-interpolation
 import argparse
+import ast
+import hashlib
 import json
 import logging
 import re
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Tuple
+
+# --- Directory setup ---
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+DEFAULT_SOURCE = project_root / 'patterns'
+
+FRONT_MATTER_RE = re.compile(rb'\A---\r?\n(.*?)\r?\n---[ \t]*\r?\n', re.DOTALL)
+CODE_OPEN_RE = re.compile(rb'^```python[ \t]*\r?\n', re.MULTILINE)
+CODE_CLOSE_RE = re.compile(rb'^```[ \t]*$', re.MULTILINE)
+SUMMARY_RE = re.compile(rb'^## Summary[ \t]*\r?\n', re.MULTILINE)
+DOCSTRINGS_RE = re.compile(rb'^## Docstrings[ \t]*\r?\n', re.MULTILINE)
+
+# Standard-library modules whose use is recorded as a facet
+USAGE_MODULES = ('abc', 'threading', 'copy')
+# Structure fields turned into facet postings (facet name -> entry field)
+FACET_FIELDS = {'base': 'bases', 'uses': 'uses', 'import': 'imports'}
 
 
 def setup_logging():
@@ -44,38 +62,239 @@ def extract_summary(text: str) -> str:
     return ""
 
 
-def build_summary_index(chunk_dir: Path) -> List[Dict[str, str]]:
-    """Builds a summary index from markdown chunk files."""
-    index: List[Dict[str, str]] = []
-    for file in sorted(chunk_dir.glob("*.md")):
-        text = file.read_text(encoding='utf-8')
-        front = parse_front_matter(text)
-        summary = extract_summary(text)
-
-        # Determine file path and chunk
-        file_rel = front.get("file", file.name)
-        chunk_name = front.get("chunk", file.stem)
-
-        # Derive pattern name: use front matter if present, else infer from file name
-        pattern = front.get("pattern", "")
-        if not pattern:
-            # e.g., 'structural/global_object.py' -> 'global_object' -> 'Global Object'
-            stem = Path(file_rel).stem
-            pattern = stem.replace('_', ' ').title()
-
-        entry = {
-            "file": file_rel,
-            "chunk": chunk_name,
-            "pattern": pattern,
-            "summary": summary
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _trimmed(data: bytes, start: int, end: int) -> Tuple[int, int]:
+    """Shrink [start, end) past surrounding whitespace; returns (offset, length)."""
+    while start < end and data[start:start + 1].isspace():
+        start += 1
+    while end > start and data[end - 1:end].isspace():
+        end -= 1
+    return start, end - start
+
+
+def _last_match(pattern: re.Pattern, data: bytes, start: int) -> Optional[re.Match]:
+    """Last match of pattern in data at or after start (headings may appear in code)."""
+    match = None
+    for match in pattern.finditer(data, start):
+        pass
+    return match
+
+
+def locate_sections(data: bytes) -> Dict[str, Dict[str, int]]:
+    """
+    Find the byte span of each chunk section body (without fences or headings).
+
+    Returns {'front_matter'|'code'|'summary'|'docstrings': {'offset', 'length', 'tokens'}}
+    for the sections present, so readers can mmap a chunk and slice one section
+    with data[offset:offset + length].
+    """
+    spans: Dict[str, Tuple[int, int]] = {}
+    body_start = 0
+    front = FRONT_MATTER_RE.match(data)
+    if front:
+        spans['front_matter'] = _trimmed(data, *front.span(1))
+        body_start = front.end()
+
+    summary = _last_match(SUMMARY_RE, data, body_start)
+    docstrings = _last_match(DOCSTRINGS_RE, data, summary.end() if summary else body_start)
+    code_limit = summary.start() if summary else (docstrings.start() if docstrings else len(data))
+
+    code_open = CODE_OPEN_RE.search(data, body_start, code_limit)
+    if code_open:
+        code_close = _last_match(CODE_CLOSE_RE, data[:code_limit], code_open.end())
+        if code_close:
+            spans['code'] = _trimmed(data, code_open.end(), code_close.start())
+    if summary:
+        spans['summary'] = _trimmed(data, summary.end(), docstrings.start() if docstrings else len(data))
+    if docstrings:
+        spans['docstrings'] = _trimmed(data, docstrings.end(), len(data))
+
+    return {
+        name: {
+            'offset': offset,
+            'length': length,
+            'tokens': estimate_tokens(data[offset:offset + length].decode('utf-8', errors='replace')),
         }
-        index.append(entry)
+        for name, (offset, length) in spans.items()
+    }
+
+
+def _dotted_name(node: ast.expr) -> str:
+    """'abc.ABC' for an attribute chain, the bare name for a Name, 'Generic' for Generic[T]."""
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    return ast.unparse(node)
+
+
+def analyze_source(path: Path) -> Dict[str, Any]:
+    """
+    Static structure of one pattern module: its classes with their bases and methods,
+    top-level imports, which of USAGE_MODULES it uses, lines of code (non-blank,
+    non-comment) and whether it embeds unittest tests.
+    """
+    source = path.read_text(encoding='utf-8')
+    tree = ast.parse(source, filename=str(path))
+
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            imports.add(node.module)
+    roots = {name.split('.')[0] for name in imports}
+
+    classes = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            classes.append({
+                'name': node.name,
+                'bases': [_dotted_name(base) for base in node.bases],
+                'metaclass': next((_dotted_name(k.value) for k in node.keywords if k.arg == 'metaclass'), None),
+                'methods': [
+                    item.name for item in node.body
+                    if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                ],
+            })
+    bases = sorted({b for c in classes for b in c['bases']} | {c['metaclass'] for c in classes if c['metaclass']})
+
+    loc = sum(
+        1 for line in source.splitlines()
+        if line.strip() and not line.lstrip().startswith('#')
+    )
+    return {
+        'classes': classes,
+        'bases': bases,
+        'functions': [
+            node.name for node in tree.body
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ],
+        'imports': sorted(imports),
+        'uses': [name for name in USAGE_MODULES if name in roots],
+        'loc': loc,
+        'has_tests': 'unittest' in roots or any(b.split('.')[-1] == 'TestCase' for b in bases),
+    }
+
+
+def build_facets(index: List[Dict[str, Any]]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Precompute facet postings (facet -> value -> sorted chunk names) from index entries,
+    e.g. facets['category']['behavioral'] or facets['uses']['abc']. Intersecting two
+    postings answers queries like "behavioral patterns using abc" without parsing files.
+    """
+    facets: Dict[str, Dict[str, set]] = {name: {} for name in ('category', 'has_tests', 'class', *FACET_FIELDS)}
+    for entry in index:
+        chunk = entry.get('chunk', '')
+        if entry.get('category'):
+            facets['category'].setdefault(entry['category'], set()).add(chunk)
+        structure = entry.get('structure')
+        if not structure:
+            continue
+        facets['has_tests'].setdefault(str(structure['has_tests']).lower(), set()).add(chunk)
+        for cls in structure['classes']:
+            facets['class'].setdefault(cls['name'], set()).add(chunk)
+        for facet, field in FACET_FIELDS.items():
+            for value in structure.get(field, []):
+                facets[facet].setdefault(value, set()).add(chunk)
+    return {
+        facet: {value: sorted(chunks) for value, chunks in sorted(postings.items())}
+        for facet, postings in facets.items()
+    }
+
+
+def facets_path_for(index_path: Path) -> Path:
+    """Facet postings live next to the index they were built from."""
+    return index_path.with_name('summary_facets.json')
+
+
+def build_summary_index(chunk_dir: Path, source_dir: Path = DEFAULT_SOURCE) -> List[Dict[str, Any]]:
+    """
+    Builds a summary index from markdown chunk files.
+
+    Besides the summary, each entry records the chunk's size, a content hash and the
+    byte offset, length and token estimate of every section, plus the static
+    structure of its source module when that is found under source_dir.
+    """
+    return [build_entry(file, source_dir) for file in sorted(chunk_dir.glob("*.md"))]
+
+
+def build_entry(file: Path, source_dir: Path = DEFAULT_SOURCE) -> Dict[str, Any]:
+    """Builds the index entry for one chunk file."""
+    data = file.read_bytes()
+    text = data.decode('utf-8')
+    front = parse_front_matter(text)
+    summary = extract_summary(text)
+
+    # Determine file path and chunk
+    file_rel = front.get("file", file.name)
+    chunk_name = front.get("chunk", file.stem)
+
+    # Derive pattern name: use front matter if present, else infer from file name
+    pattern = front.get("pattern", "")
+    if not pattern:
+        # e.g., 'structural/global_object.py' -> 'global_object' -> 'Global Object'
+        stem = Path(file_rel).stem
+        pattern = stem.replace('_', ' ').title()
+
+    entry = {
+        "file": file_rel,
+        "chunk": chunk_name,
+        "pattern": pattern,
+        "category": Path(file_rel).parts[0] if len(Path(file_rel).parts) > 1 else "",
+        "summary": summary,
+        "bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "sections": locate_sections(data)
+    }
+    entry["tokens"] = sum(section["tokens"] for section in entry["sections"].values())
+
+    source = source_dir / file_rel
+    if source.suffix == '.py' and source.is_file():
+        try:
+            entry["structure"] = analyze_source(source)
+        except (SyntaxError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not analyze {source}: {e}")
+    return entry
+
+
+def patch_summary_index(
+    index_path: Path,
+    chunk_files: List[Path],
+    source_dir: Path = DEFAULT_SOURCE
+) -> List[Dict[str, Any]]:
+    """
+    Update index_path in place for just the given chunk files: entries of chunks
+    that no longer exist are dropped and the others are rebuilt. Falls back to a
+    full rebuild from the chunks' directory if the index is missing or unreadable.
+    """
+    try:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        chunk_dir = chunk_files[0].parent if chunk_files else index_path.parent
+        index = build_summary_index(chunk_dir, source_dir)
+        save_json(index, index_path)
+        return index
+
+    names = {f.name for f in chunk_files} | {f.stem for f in chunk_files}
+    index = [entry for entry in index if entry.get("chunk") not in names]
+    index.extend(build_entry(f, source_dir) for f in chunk_files if f.is_file())
+    index.sort(key=lambda entry: entry.get("chunk", ""))
+    save_json(index, index_path)
     return index
 
 
-def save_json(index: List[Dict[str, str]], output_path: Path):
-    """Saves the summary index as a JSON file."""
-    output_path.write_text(json.dumps(index, indent=2), encoding='utf-8')
+def save_json(index: List[Dict[str, Any]], output_path: Path):
+    """
+    Saves the summary index as a JSON file, and its facet postings next to it,
+    replacing any previous ones atomically.
+    """
+    for path, data in ((output_path, index), (facets_path_for(output_path), build_facets(index))):
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2), encoding='utf-8')
+        tmp_path.replace(path)
 
 
 def main():
@@ -89,12 +308,16 @@ def main():
     parser.add_argument(
         "output", help="Path to save the JSON index"
     )
+    parser.add_argument(
+        "--source", default=str(DEFAULT_SOURCE),
+        help="Directory of the Python pattern sources analysed for structure"
+    )
     args = parser.parse_args()
 
     chunk_dir = Path(args.input).resolve()
     output_path = Path(args.output).resolve()
 
-    index = build_summary_index(chunk_dir)
+    index = build_summary_index(chunk_dir, Path(args.source).resolve())
     save_json(index, output_path)
     logger.info(f"Summary index saved to: {output_path} ({len(index)} entries)")
 
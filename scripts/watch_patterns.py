@@ -0,0 +1,275 @@
+# Path: scripts/watch_patterns.py
+# pylint: disable=broad-exception-caught,logging-fstring-interpolation,line-too-long
+"""
+Watch the patterns folder and rebuild only what a change affects.
+
+After each debounced batch of edits, every changed pattern gets a fresh chunk and
+lesson, the matching summary_index.json entries are patched in place and the docs
+index is refreshed. Deleted patterns have their chunk, lesson and index entries
+removed. Uses inotify on Linux (through libc, no extra packages) and falls back to
+polling file modification times elsewhere.
+
+Usage:
+    python scripts/watch_patterns.py [--debounce 0.5] [--poll]
+"""
+import argparse
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+import build_doc_index
+import generate_lessons
+import rag_chunker
+from ollama_pool import EndpointPool, load_endpoints
+from summary_index_generator import patch_summary_index
+
+# --- Directory setup ---
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+
+# inotify event masks (see inotify(7))
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def setup_logging():
+    """Sets up logging with a basic configuration."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(levelname)s: %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+logger = setup_logging()
+
+
+class PollingWatcher:
+    """Detects changed .py files by comparing mtime/size snapshots of the tree."""
+
+    def __init__(self, root: Path, interval: float = 1.0) -> None:
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d != '__pycache__']
+            for name in filenames:
+                if name.endswith('.py'):
+                    path = Path(dirpath) / name
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        """Block up to timeout seconds (forever if None) for changes; return changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {p for p in current.keys() | self._snapshot.keys()
+                       if current.get(p) != self._snapshot.get(p)}
+            self._snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            pause = self.interval if deadline is None else min(self.interval, max(deadline - time.monotonic(), 0))
+            time.sleep(pause)
+
+    def close(self) -> None:
+        """Nothing to release for polling."""
+
+
+class InotifyWatcher:
+    """Recursive inotify watch of a directory tree through libc."""
+
+    def __init__(self, root: Path) -> None:
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError('inotify is only available on Linux')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs: Dict[int, Path] = {}
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d != '__pycache__']
+            self._add_watch(Path(dirpath))
+
+    def _add_watch(self, path: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            logger.warning(f"Could not watch {path}: {os.strerror(ctypes.get_errno())}")
+            return
+        self._dirs[wd] = path
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        """Block up to timeout seconds (forever if None) for events; return changed .py paths."""
+        changed: Set[Path] = set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return changed
+        data = os.read(self._fd, 64 * 1024)
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', errors='replace')
+            offset += length
+            parent = self._dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = parent / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # New sub-package: watch it and pick up files created before the watch
+                    for dirpath, dirnames, filenames in os.walk(path):
+                        self._add_watch(Path(dirpath))
+                        changed.update(Path(dirpath) / f for f in filenames if f.endswith('.py'))
+                        dirnames[:] = [d for d in dirnames if d != '__pycache__']
+                continue
+            if name.endswith('.py') and mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        """Close the inotify descriptor."""
+        os.close(self._fd)
+
+
+def make_watcher(root: Path, force_poll: bool = False, interval: float = 1.0):
+    """Return an inotify watcher where possible, otherwise a polling one."""
+    if not force_poll:
+        try:
+            watcher = InotifyWatcher(root)
+            logger.info(f"Watching {root} with inotify")
+            return watcher
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify unavailable ({e}); falling back to polling")
+    logger.info(f"Watching {root} by polling every {interval:.1f}s")
+    return PollingWatcher(root, interval)
+
+
+def rebuild(changed: Set[Path], args, pool: EndpointPool) -> None:
+    """Rebuild the chunk and lesson of each changed file, then patch the indexes."""
+    source_dir = Path(args.source).resolve()
+    chunks_dir = Path(args.chunks)
+    docs_dir = Path(args.docs)
+    touched_chunks = []
+    for path in sorted(changed):
+        try:
+            rel = path.resolve().relative_to(source_dir)
+        except ValueError:
+            continue
+        chunk_path = chunks_dir / rag_chunker.chunk_name_for(rel)
+        lesson_path = docs_dir / generate_lessons.lesson_name_for(source_dir / rel, source_dir)
+        if not path.exists():
+            logger.info(f"{rel} was removed; dropping its chunk and lesson")
+            for stale in (chunk_path, lesson_path):
+                if stale.exists():
+                    stale.unlink()
+            touched_chunks.append(chunk_path)
+            continue
+        source = source_dir / rel
+        started = time.monotonic()
+        if not rag_chunker.annotate_file(source, source_dir, chunks_dir, args.model, pool, args.retries, args.delay):
+            # Leave the index entry alone rather than patch it from a stale or missing chunk
+            logger.error(f"Could not rebuild the chunk for {rel}; its index entry is unchanged")
+            continue
+        touched_chunks.append(chunk_path)
+        if not args.no_lessons and not generate_lessons.generate_lesson(
+                source, source_dir, docs_dir, args.lesson_model, pool, args.retries):
+            logger.error(f"Could not rebuild the lesson for {rel}")
+        logger.info(f"Rebuilt {rel} in {time.monotonic() - started:.1f}s")
+
+    if touched_chunks:
+        patch_summary_index(Path(args.index), touched_chunks, source_dir)
+        logger.info(f"Patched {args.index} ({len(touched_chunks)} entr{'y' if len(touched_chunks) == 1 else 'ies'})")
+    if not args.no_lessons:
+        build_doc_index.build_index(docs_dir, docs_dir / 'index.md')
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Watch the patterns folder and rebuild the affected chunk, lesson and indexes on change.'
+    )
+    parser.add_argument('--source', default=str(project_root / 'patterns'),
+        help='Directory of Python source patterns')
+    parser.add_argument('--chunks', default=str(project_root / 'chunks'),
+        help='Directory of Markdown chunks')
+    parser.add_argument('--docs', default=str(project_root / 'docs'),
+        help='Directory of Markdown lessons')
+    parser.add_argument('--index', default=str(project_root / 'summary_index.json'),
+        help='Path of the summary JSON index')
+    parser.add_argument('--model', default='pattern-rag-gen:latest',
+        help='Ollama model for chunk annotations')
+    parser.add_argument('--lesson-model', default='lesson-planner:latest',
+        help='Ollama model for lessons')
+    parser.add_argument('--endpoint', action='append', default=[],
+        help='Ollama endpoint as HOST[,model=NAME][,weight=N][,concurrency=N]; repeat for a pool')
+    parser.add_argument('--endpoints-file',
+        help='JSON file listing Ollama endpoints')
+    parser.add_argument('--retries', type=int, default=3,
+        help='Max model attempts per chunk or lesson')
+    parser.add_argument('--delay', type=float, default=1.0,
+        help='Seconds to wait between chunk retries')
+    parser.add_argument('--debounce', type=float, default=0.5,
+        help='Quiet period in seconds before a batch of changes is rebuilt')
+    parser.add_argument('--poll', action='store_true',
+        help='Poll for changes even where inotify is available')
+    parser.add_argument('--interval', type=float, default=1.0,
+        help='Polling interval in seconds')
+    parser.add_argument('--no-lessons', action='store_true',
+        help='Only rebuild chunks and the summary index')
+    args = parser.parse_args()
+
+    source_dir = Path(args.source)
+    if not source_dir.is_dir():
+        logger.error(f'Provided source path is not a directory: {source_dir}')
+        sys.exit(1)
+    Path(args.chunks).mkdir(parents=True, exist_ok=True)
+    Path(args.docs).mkdir(parents=True, exist_ok=True)
+
+    pool = EndpointPool(load_endpoints(args.endpoint, args.endpoints_file))
+    watcher = make_watcher(source_dir, args.poll, args.interval)
+    try:
+        while True:
+            changed = watcher.wait(None)
+            # Debounce: editors often write a file several times in quick succession
+            while True:
+                more = watcher.wait(args.debounce)
+                if not more:
+                    break
+                changed |= more
+            logger.info(f"{len(changed)} file(s) changed")
+            try:
+                rebuild(changed, args, pool)
+            except Exception as e:
+                logger.error(f"Rebuild failed: {e}")
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.")
+    finally:
+        watcher.close()
+
+
+if __name__ == '__main__':
+    main()